@@ -0,0 +1,23 @@
+"""Add composite (user_id, created_at, id) index for keyset pagination"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261017_0003"
+down_revision = "20251206_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_items_user_created_id",
+        "items",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_user_created_id", table_name="items")
@@ -0,0 +1,35 @@
+"""Add weighted full-text search_vector to items"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.add_column("items", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True))
+        op.create_index(
+            "ix_items_search_vector",
+            "items",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+        )
+    else:
+        op.add_column("items", sa.Column("search_vector", sa.Text(), nullable=True))
+    # Existing rows are populated by `python -m scripts.backfill_search_index --apply`.
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_items_search_vector", table_name="items")
+    op.drop_column("items", "search_vector")
@@ -0,0 +1,28 @@
+"""Add the SQLite FTS5 items_fts search index"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261017_0005"
+down_revision = "20261017_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+        "item_id UNINDEXED, user_id UNINDEXED, title, description, text_content, "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    # Existing rows are indexed by `python -m scripts.backfill_search_index --apply`.
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS items_fts")
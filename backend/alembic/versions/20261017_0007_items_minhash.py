@@ -0,0 +1,41 @@
+"""Add items.minhash and the item_lsh_bands near-duplicate index"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+
+def _uuid_type(bind):
+    if bind.dialect.name == "postgresql":
+        return postgresql.UUID(as_uuid=True)
+    return sa.String(length=36)
+
+
+def upgrade() -> None:
+    uuid_type = _uuid_type(op.get_bind())
+    op.add_column("items", sa.Column("minhash", sa.LargeBinary(), nullable=True))
+    op.create_table(
+        "item_lsh_bands",
+        sa.Column("item_id", uuid_type, nullable=False),
+        sa.Column("band", sa.SmallInteger(), nullable=False),
+        sa.Column("user_id", uuid_type, nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("item_id", "band"),
+    )
+    op.create_index("ix_item_lsh_bands_user_bucket", "item_lsh_bands", ["user_id", "bucket"])
+    # Existing rows are fingerprinted by `python -m scripts.backfill_minhash --apply`.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_lsh_bands_user_bucket", table_name="item_lsh_bands")
+    op.drop_table("item_lsh_bands")
+    op.drop_column("items", "minhash")
@@ -0,0 +1,22 @@
+"""Add items.image_hash, the perceptual hash behind image duplicate clusters"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("items", sa.Column("image_hash", sa.BigInteger(), nullable=True))
+    op.create_index("ix_items_user_image_hash", "items", ["user_id", "image_hash"])
+    # Existing images are hashed by `python -m scripts.backfill_image_hashes --apply`.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_user_image_hash", table_name="items")
+    op.drop_column("items", "image_hash")
@@ -0,0 +1,61 @@
+"""Add tags.name_normalized with a unique (user_id, name_normalized) index"""
+from __future__ import annotations
+
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column("tags", sa.Column("name_normalized", sa.String(length=64), nullable=True))
+
+    tags = sa.table(
+        "tags",
+        sa.column("id"),
+        sa.column("user_id"),
+        sa.column("name"),
+        sa.column("name_normalized"),
+        sa.column("created_at"),
+    )
+    item_tags = sa.table("item_tags", sa.column("item_id"), sa.column("tag_id"))
+
+    # Normalize in Python: SQL lower() is ASCII-only on SQLite.
+    groups = defaultdict(list)
+    rows = bind.execute(sa.select(tags.c.id, tags.c.user_id, tags.c.name).order_by(tags.c.created_at, tags.c.id))
+    for tag_id, user_id, name in rows:
+        groups[(user_id, name.strip().lower())].append(tag_id)
+
+    for (_, normalized), tag_ids in groups.items():
+        keeper, duplicates = tag_ids[0], tag_ids[1:]
+        bind.execute(tags.update().where(tags.c.id == keeper).values(name_normalized=normalized))
+        # Case variants created before the index existed are folded into the oldest tag.
+        for duplicate in duplicates:
+            linked = sa.select(item_tags.c.item_id).where(item_tags.c.tag_id == keeper)
+            bind.execute(
+                item_tags.delete().where(item_tags.c.tag_id == duplicate, item_tags.c.item_id.in_(linked))
+            )
+            bind.execute(item_tags.update().where(item_tags.c.tag_id == duplicate).values(tag_id=keeper))
+            bind.execute(tags.delete().where(tags.c.id == duplicate))
+
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.alter_column("name_normalized", existing_type=sa.String(length=64), nullable=False)
+    op.create_index(
+        "uq_tags_user_name_normalized",
+        "tags",
+        ["user_id", "name_normalized"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_tags_user_name_normalized", table_name="tags")
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.drop_column("name_normalized")
@@ -0,0 +1,26 @@
+"""Add tags.item_count, the maintained number of items per tag"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tags",
+        sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE tags SET item_count = "
+        "(SELECT count(*) FROM item_tags WHERE item_tags.tag_id = tags.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tags", "item_count")
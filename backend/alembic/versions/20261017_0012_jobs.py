@@ -0,0 +1,56 @@
+"""Add the jobs table behind the background worker queue"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261017_0012"
+down_revision = "20261017_0011"
+branch_labels = None
+depends_on = None
+
+job_status_enum = sa.Enum("queued", "running", "done", "dead", name="jobstatus")
+
+
+def _uuid_type(bind):
+    if bind.dialect.name == "postgresql":
+        return postgresql.UUID(as_uuid=True)
+    return sa.String(length=36)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    uuid_type = _uuid_type(bind)
+    if bind.dialect.name == "postgresql":
+        job_status_enum.create(bind, checkfirst=True)
+    op.create_table(
+        "jobs",
+        sa.Column("id", uuid_type, primary_key=True),
+        sa.Column("user_id", uuid_type, nullable=True),
+        sa.Column("kind", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.SmallInteger(), nullable=False),
+        sa.Column("status", job_status_enum, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("locked_by", sa.String(length=128), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index("ix_jobs_claim", "jobs", ["status", "run_at", "priority"])
+    op.create_index("ix_jobs_user_status", "jobs", ["user_id", "status"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.drop_index("ix_jobs_user_status", table_name="jobs")
+    op.drop_index("ix_jobs_claim", table_name="jobs")
+    op.drop_table("jobs")
+    if bind.dialect.name == "postgresql":
+        job_status_enum.drop(bind, checkfirst=True)
@@ -0,0 +1,47 @@
+"""Key items_fts rows by a rowid derived from the item id"""
+from __future__ import annotations
+
+import uuid
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "20261017_0013"
+down_revision = "20261017_0012"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _rowid(item_id: str) -> int:
+    # Same mapping as app.models.items_fts_rowid.
+    return uuid.UUID(item_id).int >> 65
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    rows = bind.execute(
+        sa.text("SELECT item_id, user_id, title, description, text_content FROM items_fts")
+    ).all()
+    bind.execute(sa.text("DELETE FROM items_fts"))
+    insert = sa.text(
+        "INSERT INTO items_fts (rowid, item_id, user_id, title, description, text_content) "
+        "VALUES (:rowid, :item_id, :user_id, :title, :description, :text_content)"
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(
+            insert,
+            [
+                {"rowid": _rowid(row.item_id), **row._mapping}
+                for row in rows[start : start + BATCH_SIZE]
+            ],
+        )
+
+
+def downgrade() -> None:
+    # Derived rowids remain valid FTS rowids; nothing to undo.
+    pass
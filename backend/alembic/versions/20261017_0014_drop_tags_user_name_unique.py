@@ -0,0 +1,20 @@
+"""Drop the (user_id, name) unique constraint made redundant by uq_tags_user_name_normalized"""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261017_0014"
+down_revision = "20261017_0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.drop_constraint("uq_tag_user_name", type_="unique")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.create_unique_constraint("uq_tag_user_name", ["user_id", "name"])
@@ -1,24 +1,48 @@
 import logging
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+import orjson
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..core import storage
+from ..core import etags, storage
+from ..core.config import get_settings
+from ..core.responses import ORJSON_OPTIONS, ORJSONResponse
 from ..core.security import get_current_user
-from ..database import get_db
-from ..services import file_processing, ingestion_service, items_service
+from ..database import SessionLocal, get_db
+from ..services import (
+    count_service,
+    dedup_service,
+    facets_service,
+    file_processing,
+    image_hash_service,
+    import_service,
+    ingest_queue,
+    ingestion_service,
+    items_service,
+    semantic_service,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 logger = logging.getLogger(__name__)
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_KIND_HEADER = "X-Total-Count-Kind"
+FULL_FIELDS = tuple(schemas.ItemOut.model_fields)
+ITEM_FIELDS = frozenset(FULL_FIELDS)
+SUMMARY_FIELDS = tuple(schemas.ItemSummaryOut.model_fields)
 
-@router.get("/", response_model=List[schemas.ItemOut])
+
+@router.get("/", response_model=List[Union[schemas.ItemOut, schemas.ItemSummaryOut, schemas.ItemSparseOut]])
 def list_items(
-    q: str | None = Query(None, description="Case-insensitive keyword search across title, description, and extracted text"),
+    q: str | None = Query(None, description="Keyword search across title, description, and extracted text (web-search syntax on Postgres)"),
     item_type: models.ItemType | None = Query(None, alias="type", description="Restrict results to a specific item type"),
     status_filter: models.ItemStatus | None = Query(None, alias="status", description="Filter by ingestion or processing status"),
     origin_domain: str | None = Query(None, description="Filter by normalized source domain (e.g., pinterest.com)"),
@@ -27,33 +51,290 @@ def list_items(
     created_from: datetime | None = Query(None, description="ISO-8601 timestamp; include items created at or after this moment"),
     created_to: datetime | None = Query(None, description="ISO-8601 timestamp; include items created at or before this moment"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of items to return"),
-    offset: int = Query(0, ge=0, description="How many newest items to skip before returning results"),
+    offset: int = Query(0, ge=0, description="How many newest items to skip before returning results (legacy; prefer cursor)"),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header; overrides offset"),
+    sort: schemas.ItemSort = Query(schemas.ItemSort.newest, description="newest (default) or relevance, which ranks `q` matches when full-text search is available"),
+    view: schemas.ItemView = Query(schemas.ItemView.full, description="full (default) or summary, the slim grid projection without extracted text"),
+    fields: str | None = Query(None, description="Comma-separated sparse fieldset (e.g. `title,thumbnail_path,tags`); `id` is always included"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    etag: str = Depends(etags.user_etag),
+):
+    """Return the authenticated user's items ordered newest-first with flexible search and filter controls.
+
+    When a full page is returned, the ``X-Next-Cursor`` response header carries the cursor for the next page.
+    ``X-Total-Count`` reports how many items match the filters; ``X-Total-Count-Kind`` is ``exact`` or
+    ``estimate`` (planner-based, used for large keyword searches on Postgres).
+    Responses carry an ETag; a matching ``If-None-Match`` gets ``304`` without running the query.
+    ``view=summary`` (``ItemSummaryOut``) and ``fields=`` (``ItemSparseOut``) return slimmer objects than
+    ``ItemOut`` and skip loading unused columns.
+    """
+    projection: tuple[str, ...] | None = None
+    if fields:
+        projection = _parse_fields(fields)
+    elif view == schemas.ItemView.summary:
+        projection = SUMMARY_FIELDS
+    try:
+        results = items_service.list_items(
+            db,
+            current_user,
+            search=q,
+            item_type=item_type,
+            status=status_filter,
+            origin_domain=origin_domain,
+            tag_name=tag,
+            tag_names=tags,
+            created_from=created_from,
+            created_to=created_to,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            sort=sort,
+            fields=projection,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    total = count_service.count_items(
+        db,
+        current_user,
+        search=q,
+        item_type=item_type,
+        status=status_filter,
+        origin_domain=origin_domain,
+        tag_names=items_service.collect_tag_filters(tag, tags),
+        created_from=created_from,
+        created_to=created_to,
+    )
+    headers: dict[str, str] = {
+        **etags.etag_headers(etag),
+        TOTAL_COUNT_HEADER: str(total.total),
+        TOTAL_COUNT_KIND_HEADER: "exact" if total.exact else "estimate",
+    }
+    if len(results) == limit and not (q and sort == schemas.ItemSort.relevance):
+        headers[NEXT_CURSOR_HEADER] = items_service.encode_cursor(results[-1])
+    trim_extra = projection == SUMMARY_FIELDS
+    content = [_item_row(item, projection or FULL_FIELDS, trim_extra=trim_extra) for item in results]
+    return ORJSONResponse(content, headers=headers)
+
+
+@router.get("/facets", response_model=schemas.ItemFacets)
+def item_facets(
+    q: str | None = Query(None, description="Keyword search, as for the item list"),
+    item_type: models.ItemType | None = Query(None, alias="type"),
+    status_filter: models.ItemStatus | None = Query(None, alias="status"),
+    origin_domain: str | None = Query(None),
+    tag: str | None = Query(None),
+    tags: List[str] | None = Query(None),
+    created_from: datetime | None = Query(None),
+    created_to: datetime | None = Query(None),
+    top: int = Query(facets_service.DEFAULT_TOP, ge=1, le=100, description="How many origin domains and tags to return"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
 ):
-    """Return the authenticated user's items ordered newest-first with flexible search and filter controls."""
-    return items_service.list_items(
+    """Count the items matching the list filters by type, status, origin domain, tag and month."""
+    return facets_service.item_facets(
         db,
         current_user,
         search=q,
         item_type=item_type,
         status=status_filter,
         origin_domain=origin_domain,
-        tag_name=tag,
-        tag_names=tags,
+        tag_names=items_service.collect_tag_filters(tag, tags),
         created_from=created_from,
         created_to=created_to,
-        limit=limit,
-        offset=offset,
+        top=top,
     )
 
 
+@router.get("/duplicates/images", response_model=List[schemas.ImageDuplicateCluster])
+def image_duplicate_clusters(
+    radius: int | None = Query(None, ge=0, le=32, description="Maximum differing hash bits (defaults to IMAGE_DUPLICATE_RADIUS)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
+):
+    """Group the user's items whose stored images are near-identical, largest group first."""
+    clusters = image_hash_service.duplicate_clusters(db, current_user, radius=radius)
+    return [schemas.ImageDuplicateCluster(items=members) for members in clusters]
+
+
+@router.get("/export")
+def export_items(
+    q: str | None = Query(None, description="Keyword search, as for the item list"),
+    item_type: models.ItemType | None = Query(None, alias="type"),
+    status_filter: models.ItemStatus | None = Query(None, alias="status"),
+    origin_domain: str | None = Query(None),
+    tag: str | None = Query(None),
+    tags: List[str] | None = Query(None),
+    created_from: datetime | None = Query(None),
+    created_to: datetime | None = Query(None),
+    cursor: str | None = Query(None, description="Resume after the line that carried this cursor"),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Stream every matching item (with tags) newest-first as NDJSON.
+
+    Each line is ``{"cursor": ..., "item": {...}}``; pass the last received ``cursor`` back to
+    resume an interrupted export.
+    """
+    if cursor:
+        try:
+            items_service.decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    filters = dict(
+        search=q,
+        item_type=item_type,
+        status=status_filter,
+        origin_domain=origin_domain,
+        tag_names=items_service.collect_tag_filters(tag, tags),
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+    )
+
+    def _lines() -> Iterator[bytes]:
+        # The stream outlives the request-scoped session, so it reads through its own.
+        with SessionLocal() as db:
+            for item in items_service.iter_items(db, current_user, **filters):
+                line = {"cursor": items_service.encode_cursor(item), "item": _item_row(item, FULL_FIELDS)}
+                yield orjson.dumps(line, option=ORJSON_OPTIONS) + b"\n"
+
+    return StreamingResponse(
+        _lines(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="brain-export.ndjson"'},
+    )
+
+
+@router.post("/import", response_model=schemas.ItemImportResult)
+async def import_items(
+    request: Request,
+    batch_size: int | None = Query(None, ge=1, le=10_000, description="Rows per INSERT batch (defaults to IMPORT_BATCH_SIZE)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Create items from a streamed NDJSON body (one item per line, export envelopes accepted).
+
+    Lines are inserted in batches; invalid lines, and lines longer than IMPORT_MAX_LINE_BYTES, are reported by
+    line number without stopping the import.
+    """
+    settings = get_settings()
+    importer = import_service.ItemImporter(db, current_user)
+    splitter = import_service.LineSplitter(settings.IMPORT_MAX_LINE_BYTES)
+    size = batch_size or settings.IMPORT_BATCH_SIZE
+    pending: list[tuple[int, bytes | None]] = []
+    async for chunk in request.stream():
+        for line_number, raw in splitter.feed(chunk):
+            if raw is None or raw.strip():
+                pending.append((line_number, raw))
+            if len(pending) >= size:
+                await run_in_threadpool(importer.import_lines, pending)
+                pending = []
+    pending.extend(splitter.finish())
+    if pending:
+        await run_in_threadpool(importer.import_lines, pending)
+    result = importer.result()
+    logger.info(
+        "Items imported",
+        extra={"user_id": str(current_user.id), "created_count": result.created, "error_count": result.error_count},
+    )
+    return result
+
+
+@router.get("/batch", response_model=List[schemas.ItemBatchEntry])
+def get_items_batch(
+    ids: List[str] = Query(..., description="Item ids, repeated or comma-separated; at most a few hundred per call"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
+):
+    """Fetch several items at once, in the requested order, marking ids that were not found."""
+    item_ids: list[UUID] = []
+    for raw in ids:
+        for part in raw.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                item_ids.append(UUID(part))
+            except ValueError as exc:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid item id: {part}") from exc
+    return _batch_entries(db, current_user, item_ids)
+
+
+@router.post("/batch", response_model=List[schemas.ItemBatchEntry])
+def post_items_batch(
+    payload: schemas.ItemBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Same as ``GET /items/batch`` for id lists too long for a query string."""
+    return _batch_entries(db, current_user, payload.ids)
+
+
+@router.post("/tags/batch", response_model=schemas.ItemTagBatchResult)
+def batch_update_item_tags(
+    payload: schemas.ItemTagBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Add, remove or replace tags on a list of items or on every item matching a filter."""
+    filters = None
+    if payload.filter is not None:
+        filters = {
+            "search": payload.filter.q,
+            "item_type": payload.filter.type,
+            "status": payload.filter.status,
+            "origin_domain": payload.filter.origin_domain,
+            "tag_names": items_service.collect_tag_filters(None, payload.filter.tags),
+            "created_from": payload.filter.created_from,
+            "created_to": payload.filter.created_to,
+        }
+    try:
+        matched, added, removed = items_service.batch_update_tags(
+            db,
+            current_user,
+            action=payload.action.value,
+            tag_names=payload.tags,
+            item_ids=payload.ids,
+            filters=filters,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    logger.info(
+        "Batch tag update",
+        extra={"user_id": str(current_user.id), "action": payload.action.value, "matched": matched},
+    )
+    return schemas.ItemTagBatchResult(matched=matched, added=added, removed=removed)
+
+
 @router.post("/url", response_model=schemas.ItemOut, status_code=status.HTTP_201_CREATED)
 def create_item_from_url(
     payload: schemas.UrlIngestionRequest,
+    response: Response,
+    async_ingest: bool | None = Query(
+        None,
+        alias="async",
+        description="Queue the fetch and answer 202 with a PENDING_PROCESSING item (default: INGEST_ASYNC)",
+    ),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    if get_settings().INGEST_ASYNC if async_ingest is None else async_ingest:
+        try:
+            item = ingestion_service.queue_url(db, current_user, payload)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        if not get_settings().JOB_QUEUE_ENABLED:
+            ingest_queue.enqueue(item.id, current_user.id)
+        logger.info(
+            "URL item queued",
+            extra={"user_id": str(current_user.id), "item_id": str(item.id)},
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{get_settings().API_V1_PREFIX}/items/{item.id}/ingest"
+        return item
     item = ingestion_service.ingest_url(db, current_user, payload)
     logger.info(
         "URL item created",
@@ -98,19 +379,38 @@ def upload_item(
             else:
                 result = file_processing.process_pdf_upload(file, guard=guard)
 
-            item_payload = schemas.ItemCreate(
-                title=_derive_upload_title(title, file, result),
-                description=description,
-                type=result.item_type,
-                status=result.status,
-                file_path=result.file_path,
-                thumbnail_path=result.thumbnail_path,
-                text_content=result.text_content,
-                original_filename=result.original_filename,
-                content_type=result.content_type,
-                file_size_bytes=result.file_size_bytes,
-            )
-            item = items_service.create_item(db, current_user, item_payload)
+            item_title = _derive_upload_title(title, file, result)
+            duplicate = None
+            if dedup_service.mode() != "off":
+                duplicate = dedup_service.find_duplicate(
+                    db,
+                    current_user.id,
+                    title=item_title,
+                    description=description,
+                    text_content=result.text_content,
+                )
+            existing = None
+            if duplicate and dedup_service.mode() == "merge":
+                existing = items_service.get_item(db, current_user, duplicate.item_id)
+            if existing is not None:
+                guard.cleanup()
+                item = ingestion_service.merge_duplicate(db, current_user, existing, tag_values)
+                tag_values = []
+            else:
+                item_payload = schemas.ItemCreate(
+                    title=item_title,
+                    description=description,
+                    type=result.item_type,
+                    status=result.status,
+                    file_path=result.file_path,
+                    thumbnail_path=result.thumbnail_path,
+                    text_content=result.text_content,
+                    original_filename=result.original_filename,
+                    content_type=result.content_type,
+                    file_size_bytes=result.file_size_bytes,
+                    extra=dedup_service.duplicate_extra(duplicate) or None,
+                )
+                item = items_service.create_item(db, current_user, item_payload)
     except file_processing.UploadTooLargeError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     except file_processing.UploadProcessingError as exc:
@@ -136,6 +436,7 @@ def get_item(
     item_id: UUID,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
 ):
     item = items_service.get_item(db, current_user, item_id)
     if not item:
@@ -143,17 +444,90 @@ def get_item(
     return item
 
 
+@router.get("/{item_id}/ingest", response_model=schemas.ItemIngestStatus)
+async def get_ingest_status(
+    item_id: UUID,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for a queued save to finish before answering"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Progress of an asynchronous URL save; ``wait`` turns polling into a long poll.
+
+    The handler is async so a long poll waits on the event loop; only the
+    database reads go to the threadpool.
+    """
+    item = await run_in_threadpool(items_service.get_item, db, current_user, item_id)
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    progress = ingestion_service.ingest_state(item) or {}
+    if wait and progress.get("state") in ingestion_service.INGEST_ACTIVE_STATES:
+        await ingest_queue.wait_for_item(db, item, wait)
+        progress = ingestion_service.ingest_state(item) or {}
+    return schemas.ItemIngestStatus(
+        id=item.id,
+        status=item.status,
+        state=progress.get("state"),
+        error=progress.get("error"),
+        updated_at=item.updated_at,
+    )
+
+
+@router.get("/{item_id}/similar", response_model=List[schemas.SemanticHit])
+def similar_items(
+    item_id: UUID,
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of similar items to return"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
+):
+    """Items whose text is closest to this one ("more like this"), best match first."""
+    if not semantic_service.is_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Semantic search is disabled")
+    item = items_service.get_item(db, current_user, item_id)
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    hits = semantic_service.similar_items(db, current_user, item, limit=limit)
+    return [schemas.SemanticHit(score=score, item=hit) for hit, score in hits]
+
+
 @router.post("/{item_id}/refresh", response_model=schemas.ItemOut)
 def refresh_item(
     item_id: UUID,
+    response: Response,
     force_download: bool = Query(False, description="Force re-download of media even if already present"),
     update_text: bool = Query(False, description="Overwrite title/description/text_content using refreshed metadata"),
+    async_refresh: bool | None = Query(
+        None,
+        alias="async",
+        description="Queue a refresh_item job and answer 202 with the item as it is now (default: JOB_QUEUE_ENABLED)",
+    ),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     item = items_service.get_item(db, current_user, item_id)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    queue_enabled = get_settings().JOB_QUEUE_ENABLED
+    if queue_enabled if async_refresh is None else async_refresh:
+        if not queue_enabled:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Queued refreshes need JOB_QUEUE_ENABLED")
+        try:
+            job = ingestion_service.queue_refresh(
+                db,
+                current_user,
+                item,
+                force_download=force_download,
+                update_text=update_text,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        logger.info(
+            "Item refresh queued",
+            extra={"user_id": str(current_user.id), "item_id": str(item.id), "job_id": str(job.id)},
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        db.refresh(item)
+        return item
     try:
         refreshed = ingestion_service.refresh_url_item(
             db,
@@ -236,6 +610,7 @@ def list_item_tags(
     item_id: UUID,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
 ):
     item = items_service.get_item(db, current_user, item_id)
     if not item:
@@ -243,6 +618,49 @@ def list_item_tags(
     return item.tags
 
 
+def _batch_entries(db: Session, user: models.User, item_ids: List[UUID]) -> list[dict]:
+    try:
+        found = items_service.get_items(db, user, item_ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    entries = []
+    for item_id in item_ids:
+        item = found.get(item_id)
+        if item is None:
+            entries.append({"id": item_id, "status": schemas.BatchItemStatus.not_found, "item": None})
+        else:
+            entries.append({"id": item_id, "status": schemas.BatchItemStatus.ok, "item": item})
+    return entries
+
+
+def _parse_fields(raw: str) -> tuple[str, ...]:
+    requested = ["id"]
+    for name in raw.split(","):
+        cleaned = name.strip()
+        if cleaned and cleaned not in requested:
+            requested.append(cleaned)
+    unknown = [name for name in requested if name not in ITEM_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown item fields: {', '.join(unknown)}",
+        )
+    return tuple(requested)
+
+
+def _item_row(item: models.Item, fields: tuple[str, ...], *, trim_extra: bool = False) -> dict:
+    """Plain dict of the loaded columns; ORJSONResponse encodes UUIDs, datetimes and enums."""
+    data = {}
+    for name in fields:
+        if name == "tags":
+            data[name] = [{"id": tag.id, "name": tag.name} for tag in item.tags]
+        elif name == "extra" and trim_extra and item.extra:
+            data[name] = {key: value for key, value in item.extra.items() if key in schemas.SUMMARY_EXTRA_KEYS}
+        else:
+            data[name] = getattr(item, name)
+    return data
+
+
 def _derive_upload_title(
     provided: str | None,
     upload: UploadFile,
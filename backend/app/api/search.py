@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..core import etags
+from ..core.security import get_current_user
+from ..database import get_db
+from ..services import semantic_service
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("/semantic", response_model=List[schemas.SemanticHit])
+def semantic_search(
+    q: str = Query(..., min_length=1, max_length=2000, description="Free text to match by meaning rather than exact keywords"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of items to return"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
+):
+    """Return the user's items ranked by similarity to ``q``, best match first."""
+    if not semantic_service.is_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Semantic search is disabled")
+    hits = semantic_service.search(db, current_user, q, limit=limit)
+    return [schemas.SemanticHit(score=score, item=item) for item, score in hits]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..core import etags
+from ..core.security import get_current_user
+from ..database import get_db
+from ..services import suggest_service
+
+router = APIRouter(prefix="/suggest", tags=["suggest"])
+
+
+@router.get("", response_model=schemas.SuggestResponse)
+def suggest(
+    prefix: str = Query(..., min_length=1, max_length=200, description="Text typed so far"),
+    limit: int = Query(8, ge=1, le=50, description="Maximum completions per kind"),
+    types: str | None = Query(
+        None,
+        description="Comma-separated kinds to complete: tags, domains, titles (default: all)",
+    ),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
+):
+    """Complete ``prefix`` as tags (by item count), origin domains and item titles."""
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else suggest_service.KINDS
+    try:
+        results = suggest_service.suggest(db, current_user, prefix, limit=limit, kinds=kinds)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return schemas.SuggestResponse.model_validate(results)
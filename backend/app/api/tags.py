@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
+from ..core import etags
 from ..core.security import get_current_user
 from ..database import get_db
 from ..services import tags_service
@@ -18,17 +19,12 @@ router = APIRouter(prefix="/tags", tags=["tags"])
 def list_tags(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
+    _etag: str = Depends(etags.user_etag),
 ):
-    summaries = []
-    for tag, item_count in tags_service.list_tags(db, current_user):
-        summaries.append(
-            schemas.TagSummary(
-                id=tag.id,
-                name=tag.name,
-                item_count=item_count,
-            )
-        )
-    return summaries
+    return [
+        schemas.TagSummary(id=tag.id, name=tag.name, item_count=tag.item_count)
+        for tag in tags_service.list_tags(db, current_user)
+    ]
 
 
 @router.post("/", response_model=schemas.TagOut, status_code=status.HTTP_201_CREATED)
@@ -44,6 +40,39 @@ def create_tag(
     return tag
 
 
+@router.patch("/{tag_id}", response_model=schemas.TagSummary)
+def rename_tag(
+    tag_id: UUID,
+    payload: schemas.TagUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    try:
+        tag = tags_service.rename_tag(db, current_user, tag_id, payload.name)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return schemas.TagSummary(id=tag.id, name=tag.name, item_count=tag.item_count)
+
+
+@router.post("/{tag_id}/merge", response_model=schemas.TagSummary)
+def merge_tags(
+    tag_id: UUID,
+    payload: schemas.TagMergeRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Fold the ``source_ids`` tags into this one: their items gain this tag and the sources are deleted."""
+    try:
+        tag = tags_service.merge_tags(db, current_user, tag_id, payload.source_ids)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return schemas.TagSummary(id=tag.id, name=tag.name, item_count=tag.item_count)
+
+
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_tag(
     tag_id: UUID,
@@ -0,0 +1,181 @@
+"""Negotiated response compression (brotli when installed, otherwise gzip).
+
+A plain ASGI middleware: responses under ``minimum_size`` bytes, already-encoded
+bodies and binary or streaming-event media types pass through untouched;
+streamed bodies are compressed chunk by chunk and flushed after each one.
+Brotli is an optional dependency (``requirements-brotli.txt``); without it
+clients asking for ``br`` fall back to gzip.
+"""
+
+from __future__ import annotations
+
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Prefixes of media types that are already compressed or must not be buffered.
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+)
+# Whole bodies at least this large are compressed on a worker thread.
+THREAD_MINIMUM_SIZE = 64 * 1024
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings the client accepts, honouring ``q=0`` exclusions."""
+    accepted: set[str] = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits 31: a gzip header and trailer around the deflate stream.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def encode(self, data: bytes, *, final: bool) -> bytes:
+        chunk = self._compressor.compress(data)
+        return chunk + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def encode(self, data: bytes, *, final: bool) -> bytes:
+        chunk = self._compressor.process(data)
+        return chunk + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":  # pragma: no cover
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            responder = _Responder(self.app, "br", lambda: _BrotliEncoder(self.brotli_quality), self.minimum_size)
+        elif "gzip" in accepted:
+            responder = _Responder(self.app, "gzip", lambda: _GzipEncoder(self.compresslevel), self.minimum_size)
+        else:
+            await self.app(scope, receive, self._vary(send))
+            return
+        await responder(scope, receive, send)
+
+    @staticmethod
+    def _vary(send: Send) -> Send:
+        # Identity responses still depend on Accept-Encoding for caches.
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            await send(message)
+
+        return _send
+
+
+class _Responder:
+    """Holds back ``http.response.start`` until the first body chunk decides whether to compress."""
+
+    def __init__(self, app: ASGIApp, coding: str, encoder_factory, minimum_size: int) -> None:
+        self.app = app
+        self.coding = coding
+        self.encoder_factory = encoder_factory
+        self.minimum_size = minimum_size
+        self.send: Send | None = None
+        self.start: Message | None = None
+        self.encoder: _GzipEncoder | _BrotliEncoder | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self._send)
+
+    async def _send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            content_type = headers.get("content-type", "")
+            self.passthrough = "content-encoding" in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            message["headers"] = headers.raw
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+            self.encoder = self.encoder_factory()
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.coding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = await self._encode_whole(body)
+                headers["Content-Length"] = str(len(body))
+                await self._flush_start()
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self._flush_start()
+        chunk = self.encoder.encode(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _encode_whole(self, body: bytes) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await run_in_threadpool(self.encoder.encode, body, final=True)
+        return self.encoder.encode(body, final=True)
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
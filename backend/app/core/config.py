@@ -34,6 +34,88 @@ class Settings(BaseSettings):
     THUMBNAIL_SIZE: int = Field(default=512, ge=64, le=2048)
     THUMBNAIL_QUALITY: int = Field(default=85, ge=10, le=95)
     PDF_TEXT_MAX_CHARS: int = Field(default=20_000, ge=1_000)
+    SEARCH_BACKEND: str = Field(
+        default="auto",
+        description="Keyword search backend: auto (by database), postgres, sqlite_fts, or like.",
+    )
+    FILTER_INDEX_ENABLED: bool = Field(
+        default=False,
+        description="Answer structured item filters from an in-process NumPy index per user.",
+    )
+    FILTER_INDEX_MAX_AGE_SECS: float = Field(default=60.0, ge=0.0)
+    COUNT_ESTIMATE_THRESHOLD: int = Field(
+        default=1000,
+        ge=0,
+        description="Keyword searches the Postgres planner expects to match more rows than this report an estimated X-Total-Count.",
+    )
+    SEMANTIC_SEARCH_ENABLED: bool = Field(default=True)
+    EMBEDDING_PROVIDER: str = Field(
+        default="hashing",
+        description="Embedding provider for semantic search; only the local 'hashing' vectorizer ships today.",
+    )
+    EMBEDDING_DIM: int = Field(default=512, ge=32, le=4096)
+    INDEX_ROOT: Path | None = Field(
+        default=None,
+        description="Directory for derived per-user indexes, kept out of the /assets mount (defaults to <STORAGE_ROOT>.index).",
+    )
+    DEDUP_MODE: str = Field(
+        default="flag",
+        description="Near-duplicate handling for URL saves and uploads: off, flag (extra.duplicate_of), or merge into the existing item.",
+    )
+    DEDUP_THRESHOLD: float = Field(default=0.8, ge=0.0, le=1.0)
+    IMAGE_DUPLICATE_RADIUS: int = Field(
+        default=6,
+        ge=0,
+        le=32,
+        description="Maximum differing dHash bits for two stored images to count as duplicates.",
+    )
+    INGEST_ASYNC: bool = Field(
+        default=False,
+        description="Default for POST /api/items/url: queue the fetch and answer 202 instead of waiting for it.",
+    )
+    INGEST_WORKERS: int = Field(default=2, ge=1, le=32, description="Background threads processing queued URL saves.")
+    INGEST_LEASE_SECS: float = Field(
+        default=300.0,
+        ge=1.0,
+        description="A queued save left processing this long (its process died) may be started again by another.",
+    )
+    JOB_QUEUE_ENABLED: bool = Field(
+        default=False,
+        description="Hand async URL saves to the jobs table (run `python -m app.worker`) instead of API-process threads.",
+    )
+    JOB_MAX_ATTEMPTS: int = Field(default=5, ge=1, le=100)
+    JOB_BACKOFF_BASE_SECS: float = Field(default=10.0, ge=0.0, description="First retry delay; doubles per attempt.")
+    JOB_BACKOFF_MAX_SECS: float = Field(default=3600.0, ge=0.0)
+    JOB_VISIBILITY_TIMEOUT_SECS: float = Field(
+        default=300.0,
+        ge=1.0,
+        description="A running job whose worker has not finished it by then is handed to another worker.",
+    )
+    JOB_MAX_RUNNING_PER_USER: int = Field(
+        default=2,
+        ge=1,
+        description="Jobs of one user running at once across all workers; keeps one bulk import from starving others.",
+    )
+    JOB_POLL_INTERVAL_SECS: float = Field(default=1.0, gt=0.0)
+    HTTP_MAX_CONNECTIONS: int = Field(default=100, ge=1)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, ge=0)
+    HTTP_KEEPALIVE_EXPIRY_SECS: float = Field(default=30.0, ge=0.0)
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = Field(
+        default=8,
+        ge=1,
+        description="Outbound requests to one host in flight at once per process (see core.http).",
+    )
+    IMPORT_BATCH_SIZE: int = Field(default=500, ge=1, le=10_000)
+    IMPORT_MAX_LINE_BYTES: int = Field(
+        default=4 * 1024 * 1024,
+        ge=1024,
+        description="Longer NDJSON import lines are reported as errors instead of being buffered.",
+    )
+    COMPRESSION_MIN_BYTES: int = Field(
+        default=1024,
+        ge=0,
+        description="Responses smaller than this are sent uncompressed.",
+    )
     LOG_LEVEL: str = Field(default="INFO")
     ENVIRONMENT: str = Field(default="development")
     APP_VERSION: str = Field(default="dev")
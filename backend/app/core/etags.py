@@ -0,0 +1,75 @@
+"""Conditional GET support built on the per-user ``users.data_version`` counter.
+
+Every item/tag write bumps the owner's ``data_version`` in the same transaction,
+so an ETag derived from that counter plus the request path and query is stable
+exactly as long as the user's data is. The tag is weak (``W/"..."``): the
+compression middleware sends the same representation as identity, gzip or
+brotli bytes, and a strong tag would claim they are byte-identical (breaking
+range requests and shared caches). ``user_etag`` is a FastAPI dependency: when
+``If-None-Match`` already carries the current tag it answers
+``304 Not Modified`` before the endpoint body runs any query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from ..models import User
+from .config import get_settings
+from .security import get_current_user
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(request: Request, user: User) -> str:
+    query = sorted(request.query_params.multi_items())
+    parts = [
+        get_settings().APP_VERSION,
+        str(user.id),
+        str(user.data_version or 0),
+        request.url.path,
+        repr(query),
+    ]
+    digest = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison (RFC 9110 8.8.3.2), as ``If-None-Match`` requires."""
+    if not header:
+        return False
+    opaque = _opaque_tag(etag)
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if _opaque_tag(candidate) == opaque:
+            return True
+    return False
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def user_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+) -> str:
+    """Return the request's ETag, short-circuiting with 304 when the client has it.
+
+    The headers are also set on the injected response; endpoints that build their
+    own ``Response`` must add ``etag_headers(etag)`` themselves.
+    """
+    etag = compute_etag(request, current_user)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    response.headers.update(etag_headers(etag))
+    return etag
@@ -0,0 +1,209 @@
+"""Process-wide HTTP clients for outbound fetches (pages, images, Twitter lookups, DeepSeek).
+
+``get``/``post`` are drop-in replacements for ``httpx.get``/``httpx.post`` that
+go through one shared ``httpx.Client``, so repeated fetches reuse pooled
+keep-alive connections instead of paying DNS, TCP and TLS setup every time.
+``get_async_client``/``arequest`` are the ``httpx.AsyncClient`` counterparts for
+async code.
+
+* Pool size and keep-alive come from ``HTTP_MAX_CONNECTIONS``,
+  ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` and ``HTTP_KEEPALIVE_EXPIRY_SECS``.
+* At most ``HTTP_MAX_CONNECTIONS_PER_HOST`` requests run against one host at a
+  time, so a burst of saves from one site cannot take the whole pool. Waiting
+  for a host slot counts against the request's pool timeout and raises
+  ``httpx.PoolTimeout`` like waiting for a pooled connection does. Slots of
+  the ``MAX_TRACKED_HOSTS`` most recently used hosts are kept; older idle ones
+  are dropped, so fetching many distinct sites does not grow memory.
+* HTTP/2 is negotiated when the optional ``h2`` package is installed
+  (``requirements-http2.txt``).
+* Cookies are never stored: the clients are shared by every user and site.
+
+Clients are created on first use and closed by ``aclose`` (FastAPI lifespan)
+or ``close`` (``python -m app.worker``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Callable, Generic, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import get_settings
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+MAX_TRACKED_HOSTS = 1024
+
+_Slot = TypeVar("_Slot")
+_lock = threading.Lock()
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+
+
+class _HostSlots(Generic[_Slot]):
+    """Per-host semaphores in LRU order; idle ones beyond ``MAX_TRACKED_HOSTS`` are evicted.
+
+    A host's semaphore is only dropped while no request holds or waits on it,
+    otherwise a fresh one would let more than the cap through.
+    """
+
+    def __init__(self, factory: Callable[[], _Slot]) -> None:
+        self._factory = factory
+        self._slots: OrderedDict[str, _Slot] = OrderedDict()
+        self._users: Counter[str] = Counter()
+
+    def checkout(self, host: str) -> _Slot:
+        with _lock:
+            self._users[host] += 1
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = self._factory()
+                self._evict_idle()
+            else:
+                self._slots.move_to_end(host)
+            return slot
+
+    def checkin(self, host: str) -> None:
+        with _lock:
+            self._users[host] -= 1
+            if self._users[host] <= 0:
+                del self._users[host]
+
+    def clear(self) -> None:
+        with _lock:
+            self._slots.clear()
+            self._users.clear()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _evict_idle(self) -> None:
+        excess = len(self._slots) - MAX_TRACKED_HOSTS
+        if excess <= 0:
+            return
+        idle = [host for host in self._slots if host not in self._users][:excess]
+        for host in idle:
+            del self._slots[host]
+
+
+_host_slots: _HostSlots[threading.BoundedSemaphore] = _HostSlots(
+    lambda: threading.BoundedSemaphore(get_settings().HTTP_MAX_CONNECTIONS_PER_HOST)
+)
+_async_host_slots: _HostSlots[asyncio.Semaphore] = _HostSlots(
+    lambda: asyncio.Semaphore(get_settings().HTTP_MAX_CONNECTIONS_PER_HOST)
+)
+
+
+def _client_options() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECS,
+        ),
+        "http2": HTTP2_AVAILABLE,
+        "cookies": CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+    }
+
+
+def get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(**_client_options())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = httpx.AsyncClient(**_client_options())
+    return _async_client
+
+
+def request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request through the shared client; takes ``httpx.request`` keyword arguments."""
+    client = get_client()
+    host = _host(url)
+    slot = _host_slots.checkout(host)
+    try:
+        if not slot.acquire(timeout=_slot_timeout(client, kwargs)):
+            raise httpx.PoolTimeout(f"Timed out waiting for a request slot to {host}")
+        try:
+            return client.request(method, url, **kwargs)
+        finally:
+            slot.release()
+    finally:
+        _host_slots.checkin(host)
+
+
+def get(url: str, **kwargs: Any) -> httpx.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> httpx.Response:
+    return request("POST", url, **kwargs)
+
+
+async def arequest(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Async ``request`` through the shared ``AsyncClient``."""
+    client = get_async_client()
+    host = _host(url)
+    slot = _async_host_slots.checkout(host)
+    try:
+        try:
+            await asyncio.wait_for(slot.acquire(), _slot_timeout(client, kwargs))
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"Timed out waiting for a request slot to {host}") from None
+        try:
+            return await client.request(method, url, **kwargs)
+        finally:
+            slot.release()
+    finally:
+        _async_host_slots.checkin(host)
+
+
+def close() -> None:
+    """Close the sync client; the next request opens a new one."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    _host_slots.clear()
+    if client is not None:
+        client.close()
+
+
+async def aclose() -> None:
+    """Close both clients (the async one must be closed from its event loop)."""
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    _async_host_slots.clear()
+    if client is not None:
+        await client.aclose()
+    close()
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _slot_timeout(client: httpx.Client | httpx.AsyncClient, kwargs: dict[str, Any]) -> float | None:
+    """The pool timeout of this request (``timeout=`` argument or the client default); None waits forever."""
+    if "timeout" in kwargs:
+        return httpx.Timeout(kwargs["timeout"]).pool
+    return client.timeout.pool
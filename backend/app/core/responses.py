@@ -0,0 +1,23 @@
+"""orjson-backed JSON responses.
+
+``ORJSONResponse`` is the application's default response class. Routes with a
+``response_model`` keep FastAPI's Pydantic fast path; hand-built payloads
+(dicts of UUIDs, datetimes and enums read straight off loaded rows) are encoded
+by orjson without going through ``jsonable_encoder``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import logging
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from uuid import UUID
 
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -124,3 +129,12 @@ class FileWriteGuard:
         else:
             self._paths.clear()
         return False
+
+
+class StorageStaticFiles(StaticFiles):
+    """Serve STORAGE_ROOT but never a dot-file or anything under a dot-directory."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in PurePosixPath(path).parts):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
@@ -4,21 +4,29 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from .api import auth, items, tags
+from .api import auth, items, search, suggest, tags
+from .core import http
+from .core.compression import CompressionMiddleware
 from .core.config import get_settings
 from .core.logging import configure_logging
-from .database import Base, get_db, get_engine
+from .core.responses import ORJSONResponse
+from .core.storage import StorageStaticFiles
+from .database import Base, SessionLocal, get_db, get_engine
 from .schemas import HealthStatus
+from .services import ingest_queue
 
 
 @asynccontextmanager
 async def _lifespan(_: FastAPI):
     Base.metadata.create_all(bind=get_engine())
+    with SessionLocal() as db:
+        ingest_queue.resume_pending(db)
     yield
+    ingest_queue.shutdown()
+    await http.aclose()
 
 
 def create_app() -> FastAPI:
@@ -30,23 +38,27 @@ def create_app() -> FastAPI:
         docs_url=f"{settings.API_V1_PREFIX}/docs",
         openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
         lifespan=_lifespan,
+        default_response_class=ORJSONResponse,
     )
 
+    application.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
     application.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ALLOW_ORIGINS,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["content-disposition"],
+        expose_headers=["content-disposition", "x-next-cursor", "x-total-count", "x-total-count-kind", "etag"],
     )
 
     application.include_router(auth.router, prefix=settings.API_V1_PREFIX)
     application.include_router(items.router, prefix=settings.API_V1_PREFIX)
     application.include_router(tags.router, prefix=settings.API_V1_PREFIX)
+    application.include_router(search.router, prefix=settings.API_V1_PREFIX)
+    application.include_router(suggest.router, prefix=settings.API_V1_PREFIX)
     application.mount(
         "/assets",
-        StaticFiles(directory=settings.STORAGE_ROOT, check_dir=False),
+        StorageStaticFiles(directory=settings.STORAGE_ROOT, check_dir=False),
         name="assets",
     )
 
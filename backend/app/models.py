@@ -12,13 +12,18 @@ from sqlalchemy import (
     Enum,
     ForeignKey,
     Index,
+    Integer,
     JSON,
+    LargeBinary,
+    MetaData,
+    SmallInteger,
     String,
+    Table,
     Text,
-    UniqueConstraint,
+    event,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship, validates
 
 from .database import Base
 
@@ -28,6 +33,11 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def normalize_tag_name(name: str) -> str:
+    """Case-insensitive identity of a tag name, stored in ``tags.name_normalized``."""
+    return name.strip().lower()
+
+
 class ItemType(str, enum.Enum):
     url = "url"
     tweet = "tweet"
@@ -44,6 +54,14 @@ class ItemStatus(str, enum.Enum):
     pending = "PENDING_PROCESSING"
 
 
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    # Out of attempts (or failed permanently); kept for inspection and manual retry.
+    dead = "dead"
+
+
 class User(Base):
     __tablename__ = "users"
     __table_args__ = (
@@ -56,6 +74,8 @@ class User(Base):
     username = Column(String(100), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
+    # Bumped in the same transaction as every item/tag write; HTTP ETags derive from it.
+    data_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -73,6 +93,16 @@ class Item(Base):
     __table_args__ = (
         Index("ix_items_type_created_at", "type", "created_at"),
         Index("ix_items_origin_domain", "origin_domain"),
+        Index("ix_items_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_items_user_image_hash", "user_id", "image_hash"),
+        # Title typeahead (suggest_service); needs the pg_trgm extension, see below.
+        Index(
+            "ix_items_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -88,7 +118,13 @@ class Item(Base):
     title = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
     text_content = Column(Text, nullable=True)
+    # Weighted full-text document maintained by services.search_service (Postgres only).
+    search_vector = deferred(Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True))
     extra = Column(JSON, nullable=True)
+    # MinHash signature maintained by services.dedup_service; empty when the text is too short.
+    minhash = deferred(Column(LargeBinary, nullable=True))
+    # 64-bit dHash of the stored image (signed), maintained by services.image_hash_service.
+    image_hash = deferred(Column(BigInteger, nullable=True))
     thumbnail_path = Column(Text, nullable=True)
     file_path = Column(Text, nullable=True)
     original_filename = Column(String(255), nullable=True)
@@ -104,19 +140,15 @@ class Item(Base):
     )
 
     user = relationship("User", back_populates="items")
-    tags = relationship(
-        "Tag",
-        secondary="item_tags",
-        back_populates="items",
-        lazy="selectin",
-    )
+    # Lazy by default: queries that serialize tags ask for selectinload explicitly.
+    tags = relationship("Tag", secondary="item_tags")
 
 
 class Tag(Base):
     __tablename__ = "tags"
     __table_args__ = (
-        UniqueConstraint("user_id", "name", name="uq_tag_user_name"),
         Index("ix_tags_name", "name"),
+        Index("uq_tags_user_name_normalized", "user_id", "name_normalized", unique=True),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -127,15 +159,22 @@ class Tag(Base):
         index=True,
     )
     name = Column(String(64), nullable=False)
+    # Set from ``name`` via normalize_tag_name; bulk inserts must pass it explicitly.
+    name_normalized = Column(String(64), nullable=False)
+    # Number of item_tags rows; maintained by tags_service on every link change.
+    item_count = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
     user = relationship("User", back_populates="tags")
-    items = relationship(
-        "Item",
-        secondary="item_tags",
-        back_populates="tags",
-        lazy="selectin",
-    )
+    # A tag can carry any number of items: never load them through the ORM. Use
+    # it in queries (``Tag.items.any()``); links are written via Item.tags or
+    # set-based statements in tags_service.
+    items = relationship("Item", secondary="item_tags", viewonly=True, lazy="raise")
+
+    @validates("name")
+    def _sync_name_normalized(self, _key: str, value: str) -> str:
+        self.name_normalized = normalize_tag_name(value)
+        return value
 
 
 class ItemTag(Base):
@@ -156,3 +195,94 @@ class ItemTag(Base):
         primary_key=True,
     )
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class ItemLshBand(Base):
+    """One LSH bucket of an item's MinHash signature (plus one for its canonical URL)."""
+
+    __tablename__ = "item_lsh_bands"
+    __table_args__ = (Index("ix_item_lsh_bands_user_bucket", "user_id", "bucket"),)
+
+    item_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("items.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    band = Column(SmallInteger, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    bucket = Column(BigInteger, nullable=False)
+
+
+class Job(Base):
+    """A unit of background work claimed by ``python -m app.worker`` (see services.job_queue)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "run_at", "priority"),
+        Index("ix_jobs_user_status", "user_id", "status"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    kind = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # Higher runs first.
+    priority = Column(SmallInteger, nullable=False, default=0)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.queued)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    # Earliest time a queued job may run (pushed back by retries).
+    run_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    # A running job whose lock expired is claimable again (visibility timeout).
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(128), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+# SQLite FTS5 index behind services.search_service.SqliteFtsSearchBackend. It lives in
+# its own MetaData because create_all cannot emit CREATE VIRTUAL TABLE; the DDL hooks
+# below create and drop it alongside the regular schema on SQLite only. Rows are keyed
+# by ``rowid = items_fts_rowid(item_id)`` so writes replace an item's row by rowid
+# instead of scanning the UNINDEXED item_id column.
+items_fts = Table(
+    "items_fts",
+    MetaData(),
+    Column("rowid", BigInteger),
+    Column("item_id", UUID(as_uuid=True)),
+    Column("user_id", UUID(as_uuid=True)),
+    Column("title", Text),
+    Column("description", Text),
+    Column("text_content", Text),
+)
+
+
+def items_fts_rowid(item_id: uuid.UUID) -> int:
+    """Stable positive 63-bit ``items_fts`` rowid derived from an item id."""
+    return item_id.int >> 65
+
+
+ITEMS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+    "item_id UNINDEXED, user_id UNINDEXED, title, description, text_content, "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+
+@event.listens_for(Base.metadata, "before_create")
+def _create_pg_trgm(target, connection, **_: object) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_items_fts(target, connection, **_: object) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(ITEMS_FTS_DDL)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_items_fts(target, connection, **_: object) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS items_fts")
@@ -1,14 +1,53 @@
 from __future__ import annotations
 
 from datetime import datetime
+from enum import Enum
 from typing import Any, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, constr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl, constr, field_validator, model_validator
 
 from .models import ItemStatus, ItemType
 
 
+class ItemSort(str, Enum):
+    newest = "newest"
+    relevance = "relevance"
+
+
+class ItemView(str, Enum):
+    full = "full"
+    summary = "summary"
+
+
+# extra keys the board cards read; everything else stays out of summary payloads.
+SUMMARY_EXTRA_KEYS = frozenset(
+    {
+        "author",
+        "avatar_url",
+        "timestamp",
+        "media_kind",
+        "video_url",
+        "video_type",
+        "poster_path",
+        "twitter_hls_only",
+        "primary_image_is_avatar",
+        "verified",
+        "is_verified",
+        "reply_count",
+        "replies",
+        "retweet_count",
+        "reposts",
+        "like_count",
+        "favorite_count",
+        "view_count",
+        "views",
+        # Progress of queued URL saves, so grids can show a spinner.
+        "ingest",
+    }
+)
+
+
 class ItemBase(BaseModel):
     type: ItemType = ItemType.url
     title: str
@@ -28,6 +67,11 @@ class ItemCreate(ItemBase):
     file_size_bytes: Optional[int] = Field(default=None, ge=0)
 
 
+class ItemImport(ItemCreate):
+    tags: List[constr(strip_whitespace=True, min_length=1, max_length=64)] = Field(default_factory=list)
+    created_at: Optional[datetime] = None
+
+
 class ItemUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -57,6 +101,14 @@ class TagCreate(BaseModel):
     name: constr(strip_whitespace=True, min_length=1, max_length=64)
 
 
+class TagUpdate(BaseModel):
+    name: constr(strip_whitespace=True, min_length=1, max_length=64)
+
+
+class TagMergeRequest(BaseModel):
+    source_ids: List[UUID] = Field(min_length=1, max_length=500)
+
+
 class ItemOut(ItemBase):
     id: UUID
     thumbnail_path: Optional[str]
@@ -72,16 +124,193 @@ class ItemOut(ItemBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ItemSummaryOut(BaseModel):
+    """Grid projection of an item: no extracted text and only card-relevant extra keys."""
+
+    id: UUID
+    type: ItemType
+    title: str
+    description: Optional[str] = None
+    source_url: Optional[HttpUrl] = None
+    origin_domain: Optional[str] = None
+    status: ItemStatus
+    thumbnail_path: Optional[str] = None
+    file_path: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    extra: Optional[dict[str, Any]] = None
+    tags: List[TagOut] = Field(default_factory=list)
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("extra")
+    @classmethod
+    def trim_extra(cls, value: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        if not value:
+            return value
+        return {key: val for key, val in value.items() if key in SUMMARY_EXTRA_KEYS}
+
+
+class ItemSparseOut(BaseModel):
+    """``fields=`` projection of an item: ``id`` plus only the requested ``ItemOut`` fields."""
+
+    id: UUID
+    type: Optional[ItemType] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    source_url: Optional[HttpUrl] = None
+    origin_domain: Optional[str] = None
+    status: Optional[ItemStatus] = None
+    extra: Optional[dict[str, Any]] = None
+    thumbnail_path: Optional[str] = None
+    file_path: Optional[str] = None
+    original_filename: Optional[str] = None
+    content_type: Optional[str] = None
+    file_size_bytes: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    text_content: Optional[str] = None
+    tags: Optional[List[TagOut]] = None
+
+
+class BatchItemStatus(str, Enum):
+    ok = "ok"
+    not_found = "not_found"
+
+
+class ItemBatchRequest(BaseModel):
+    ids: List[UUID] = Field(default_factory=list)
+
+
+class ItemBatchEntry(BaseModel):
+    id: UUID
+    status: BatchItemStatus
+    item: Optional[ItemOut] = None
+
+
+class ImageDuplicateCluster(BaseModel):
+    """Items whose stored images are perceptually identical, oldest first."""
+
+    items: List[ItemSummaryOut]
+
+
+class TagSuggestion(BaseModel):
+    id: UUID
+    name: str
+    item_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DomainSuggestion(BaseModel):
+    domain: str
+    item_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TitleSuggestion(BaseModel):
+    id: UUID
+    title: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SuggestResponse(BaseModel):
+    """Typeahead completions per kind, best first."""
+
+    tags: List[TagSuggestion] = Field(default_factory=list)
+    domains: List[DomainSuggestion] = Field(default_factory=list)
+    titles: List[TitleSuggestion] = Field(default_factory=list)
+
+
+class SemanticHit(BaseModel):
+    score: float
+    item: ItemOut
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ItemImportResult(BaseModel):
+    created: int
+    error_count: int
+    errors: List[ImportLineError] = Field(default_factory=list)
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ItemFacets(BaseModel):
+    type: List[FacetCount] = Field(default_factory=list)
+    status: List[FacetCount] = Field(default_factory=list)
+    origin_domain: List[FacetCount] = Field(default_factory=list)
+    tags: List[FacetCount] = Field(default_factory=list)
+    month: List[FacetCount] = Field(default_factory=list)
+
+
 class ItemTagsUpdate(BaseModel):
     tags: List[constr(strip_whitespace=True, min_length=1)] = Field(default_factory=list)
 
 
+class TagBatchAction(str, Enum):
+    add = "add"
+    remove = "remove"
+    replace = "replace"
+
+
+class ItemFilter(BaseModel):
+    """The ``GET /api/items`` filters as a JSON object."""
+
+    q: Optional[str] = None
+    type: Optional[ItemType] = None
+    status: Optional[ItemStatus] = None
+    origin_domain: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class ItemTagBatchRequest(BaseModel):
+    action: TagBatchAction
+    tags: List[constr(strip_whitespace=True, min_length=1, max_length=64)] = Field(default_factory=list, max_length=100)
+    ids: Optional[List[UUID]] = None
+    filter: Optional[ItemFilter] = None
+
+    @model_validator(mode="after")
+    def _exactly_one_target(self) -> "ItemTagBatchRequest":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter")
+        return self
+
+
+class ItemTagBatchResult(BaseModel):
+    matched: int
+    added: int
+    removed: int
+
+
 class UrlIngestionRequest(BaseModel):
     url: constr(strip_whitespace=True, min_length=1)
     title: Optional[str] = Field(default=None, max_length=500)
     tags: List[constr(strip_whitespace=True, min_length=1)] = Field(default_factory=list)
 
 
+class ItemIngestStatus(BaseModel):
+    """Progress of a URL save queued with ``POST /api/items/url?async=true``."""
+
+    id: UUID
+    status: ItemStatus
+    # queued, processing, done or failed; None for items that were never queued.
+    state: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: datetime
+
+
 class HealthStatus(BaseModel):
     status: str
     db: str
@@ -0,0 +1,117 @@
+"""Total-count support for item listings.
+
+Counts are exact when they are cheap: structured filters are answered from the
+filter index when it is enabled and otherwise with one ``COUNT`` over the
+indexed filters. Keyword searches on PostgreSQL first ask the planner for a row
+estimate (``EXPLAIN``) and only run the exact count when the estimate is at or
+below ``COUNT_ESTIMATE_THRESHOLD``. Results are cached per user, data version
+and filter signature and dropped by ``user_cache`` whenever that user's data
+changes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from .. import models
+from ..core.config import get_settings
+from . import filter_index, items_service, user_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 30.0
+
+_cache = user_cache.UserCache(max_entries=64, ttl_seconds=CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class ItemCount:
+    total: int
+    exact: bool
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <statement>`` keeping the statement's bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def count_items(
+    db: Session,
+    user: models.User,
+    *,
+    search: str | None = None,
+    item_type: models.ItemType | None = None,
+    status: models.ItemStatus | None = None,
+    origin_domain: str | None = None,
+    tag_names: Sequence[str] = (),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> ItemCount:
+    """Count the user's items matching the ``list_items`` filters, exactly when cheap."""
+    filters = dict(
+        item_type=item_type,
+        status=status,
+        origin_domain=origin_domain.strip().lower() if origin_domain else None,
+        tag_names=tuple(tag_names),
+        created_from=created_from,
+        created_to=created_to,
+    )
+    key = (search, *filters.values())
+    cached = _cache.get(user.id, key, version=user.data_version)
+    if cached is not None:
+        return cached
+
+    if not search and filter_index.is_enabled():
+        index = filter_index.get_index(db, user.id, version=user.data_version)
+        result = ItemCount(int(index.mask(**filters).sum()), True)
+    else:
+        query = items_service.filtered_items_query(db, user, search=search, **filters)
+        result = None
+        if search:
+            estimate = _planner_estimate(db, query)
+            if estimate is not None and estimate > get_settings().COUNT_ESTIMATE_THRESHOLD:
+                result = ItemCount(estimate, False)
+        if result is None:
+            total = query.with_entities(func.count(models.Item.id)).order_by(None).scalar()
+            result = ItemCount(int(total or 0), True)
+
+    _cache.set(user.id, key, result, version=user.data_version)
+    return result
+
+
+def reset_cache() -> None:
+    _cache.clear()
+
+
+def _planner_estimate(db: Session, query) -> int | None:
+    """Row estimate from the Postgres planner, or None where it is unavailable."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    statement = query.with_entities(models.Item.id).order_by(None).statement
+    plan = db.execute(_Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (LookupError, TypeError, ValueError):
+        logger.warning("Unexpected EXPLAIN output; falling back to an exact count")
+        return None
@@ -0,0 +1,303 @@
+"""Near-duplicate detection with MinHash signatures and an LSH band index.
+
+Each item gets a ``NUM_PERM``-value MinHash signature over word shingles of its
+title, description and extracted text (after dropping URLs and retweet
+wrappers), stored in ``items.minhash``. The signature is cut into ``BANDS``
+bands whose hashes go to ``item_lsh_bands``; a second item sharing any band
+bucket is a candidate, and candidates are confirmed by comparing signatures
+against ``DEDUP_THRESHOLD``. The canonical source URL (tracking parameters
+stripped, Twitter/X mirrors folded together) gets its own band, so re-saving
+the same link always matches.
+
+Lookups are one indexed ``SELECT`` on ``(user_id, bucket)`` plus a handful of
+signature comparisons, so ingest can check every new item.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+from urllib.parse import parse_qsl, urlencode, urlparse
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core import urls
+from ..core.config import get_settings
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+URL_BAND = BANDS
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 4
+MAX_TEXT_CHARS = 20_000
+MAX_CANDIDATES = 50
+# Upper bound on permutations x shingles hashed at once by ``signatures``.
+HASH_CHUNK = 64 * 65_536
+
+MODES = ("off", "flag", "merge")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+# Fixed seed: stored signatures are only comparable under the same permutations.
+_rng = np.random.default_rng(0x5EED_D0C5)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+_RETWEET_RE = re.compile(r"^\s*rt\s+@\w+:?\s*", re.IGNORECASE)
+
+TRACKING_PARAMS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "ref_url", "si"}
+)
+TWITTER_HOSTS = frozenset(
+    {"twitter.com", "x.com", "mobile.twitter.com", "vxtwitter.com", "fxtwitter.com", "fixupx.com", "fixvx.com"}
+)
+_STATUS_RE = re.compile(r"/status(?:es)?/(\d+)")
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    item_id: UUID
+    score: float
+
+
+@dataclass
+class Fingerprint:
+    signature: np.ndarray | None
+    buckets: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def minhash(self) -> bytes:
+        return b"" if self.signature is None else self.signature.tobytes()
+
+
+def mode() -> str:
+    value = get_settings().DEDUP_MODE.strip().lower()
+    return value if value in MODES else "flag"
+
+
+def canonical_url(raw: str | None) -> str | None:
+    """Scheme-less URL with tracking parameters dropped, for exact re-save matches."""
+    if not raw:
+        return None
+    try:
+        normalized = urls.normalize_url(raw)
+    except ValueError:
+        return None
+    parsed = urlparse(normalized.url)
+    host = normalized.domain.split("@")[-1].split(":")[0]
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if host in TWITTER_HOSTS:
+        status = _STATUS_RE.search(parsed.path)
+        if status:
+            return f"x.com/i/status/{status.group(1)}"
+        host = "x.com"
+    params = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parsed.path.rstrip("/")
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{host}{path}{query}"
+
+
+def shingle_hashes(*texts: str | None) -> np.ndarray:
+    """crc32 hashes of the distinct word shingles across ``texts``."""
+    seen: list[str] = []
+    for text in texts:
+        cleaned = _RETWEET_RE.sub("", text or "")
+        if cleaned and cleaned not in seen:
+            seen.append(cleaned)
+    combined = _URL_RE.sub(" ", "\n".join(seen)[:MAX_TEXT_CHARS])
+    tokens = _TOKEN_RE.findall(combined.lower())
+    shingles = {" ".join(tokens[index:index + SHINGLE_SIZE]) for index in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def signatures(shingle_sets: Sequence[np.ndarray]) -> list[np.ndarray | None]:
+    """MinHash signatures for many shingle sets, hashing them in large vectorized chunks.
+
+    Sets smaller than ``MIN_SHINGLES`` get ``None``: too little text to compare.
+    """
+    result: list[np.ndarray | None] = [None] * len(shingle_sets)
+    pending = [index for index, values in enumerate(shingle_sets) if len(values) >= MIN_SHINGLES]
+    max_values = max(1, HASH_CHUNK // NUM_PERM)
+    start = 0
+    while start < len(pending):
+        stop, total = start, 0
+        while stop < len(pending) and (stop == start or total + len(shingle_sets[pending[stop]]) <= max_values):
+            total += len(shingle_sets[pending[stop]])
+            stop += 1
+        chunk = pending[start:stop]
+        start = stop
+        values = np.concatenate([shingle_sets[index] for index in chunk])
+        offsets = np.cumsum([0] + [len(shingle_sets[index]) for index in chunk[:-1]])
+        # Universal hashing (a * x + b) mod p for every permutation at once; the
+        # minimum per item segment is its signature value.
+        hashed = ((_PERM_A[:, None] * values[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME).astype(np.uint32)
+        minimums = np.minimum.reduceat(hashed, offsets, axis=1)
+        for column, index in enumerate(chunk):
+            result[index] = np.ascontiguousarray(minimums[:, column])
+    return result
+
+
+def band_buckets(signature: np.ndarray) -> np.ndarray:
+    """One signed 64-bit FNV-1a hash per band; the band number is mixed in."""
+    bands = signature.reshape(BANDS, ROWS_PER_BAND).astype(np.uint64)
+    hashes = (_FNV_OFFSET ^ np.arange(BANDS, dtype=np.uint64)) * _FNV_PRIME
+    for row in range(ROWS_PER_BAND):
+        hashes = (hashes ^ bands[:, row]) * _FNV_PRIME
+    return hashes.view(np.int64)
+
+
+def url_bucket(canonical: str) -> int:
+    digest = hashlib.blake2b(f"url:{canonical}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def fingerprints(rows: Sequence) -> list[Fingerprint]:
+    """Fingerprints for objects with title/description/text_content/source_url attributes."""
+    shingle_sets = [shingle_hashes(row.title, row.description, row.text_content) for row in rows]
+    results = []
+    for row, signature in zip(rows, signatures(shingle_sets)):
+        buckets: dict[int, int] = {}
+        if signature is not None:
+            buckets.update(enumerate(band_buckets(signature).tolist()))
+        canonical = canonical_url(row.source_url)
+        if canonical:
+            buckets[URL_BAND] = url_bucket(canonical)
+        results.append(Fingerprint(signature=signature, buckets=buckets))
+    return results
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.count_nonzero(left == right)) / NUM_PERM
+
+
+def find_duplicate(
+    db: Session,
+    user_id: UUID,
+    *,
+    title: str | None,
+    description: str | None = None,
+    text_content: str | None = None,
+    source_url: str | None = None,
+    exclude_id: UUID | None = None,
+) -> DuplicateMatch | None:
+    """Best existing near-duplicate of the given content, or ``None``.
+
+    Re-saves of the same canonical URL win with score 1.0; otherwise the oldest
+    candidate at or above ``DEDUP_THRESHOLD`` with the highest score is returned.
+    """
+    probe = _Row(title=title, description=description, text_content=text_content, source_url=source_url)
+    fingerprint = fingerprints([probe])[0]
+    if not fingerprint.buckets:
+        return None
+    band_table = models.ItemLshBand
+    query = (
+        select(band_table.item_id, band_table.band, models.Item.created_at)
+        .join(models.Item, models.Item.id == band_table.item_id)
+        .where(band_table.user_id == user_id, band_table.bucket.in_(list(fingerprint.buckets.values())))
+    )
+    if exclude_id is not None:
+        query = query.where(band_table.item_id != exclude_id)
+    hits = db.execute(query).all()
+    if not hits:
+        return None
+
+    url_hits = sorted((created_at, item_id) for item_id, band, created_at in hits if band == URL_BAND)
+    if url_hits:
+        return DuplicateMatch(item_id=url_hits[0][1], score=1.0)
+    if fingerprint.signature is None:
+        return None
+
+    created = {item_id: created_at for item_id, _, created_at in hits}
+    candidates = sorted(created, key=lambda item_id: created[item_id])[:MAX_CANDIDATES]
+    stored = db.execute(
+        select(models.Item.id, models.Item.minhash).where(models.Item.id.in_(candidates))
+    ).all()
+    threshold = get_settings().DEDUP_THRESHOLD
+    best: DuplicateMatch | None = None
+    for item_id, minhash in sorted(stored, key=lambda row: created[row.id]):
+        if not minhash or len(minhash) != NUM_PERM * 4:
+            continue
+        score = similarity(fingerprint.signature, np.frombuffer(minhash, dtype=np.uint32))
+        if score >= threshold and (best is None or score > best.score):
+            best = DuplicateMatch(item_id=item_id, score=score)
+    return best
+
+
+def duplicate_extra(match: DuplicateMatch | None) -> dict[str, object]:
+    """``extra`` keys that flag an item as a near-duplicate of ``match``."""
+    if match is None:
+        return {}
+    return {"duplicate_of": str(match.item_id), "duplicate_score": round(match.score, 3)}
+
+
+def index_items(db: Session, item_ids: Iterable[UUID]) -> int:
+    """(Re)compute signatures and LSH bands for ``item_ids`` inside the caller's transaction."""
+    ids = list(item_ids)
+    if not ids or mode() == "off":
+        return 0
+    rows = db.execute(
+        select(
+            models.Item.id,
+            models.Item.user_id,
+            models.Item.title,
+            models.Item.description,
+            models.Item.text_content,
+            models.Item.source_url,
+        ).where(models.Item.id.in_(ids))
+    ).all()
+    if not rows:
+        return 0
+    prints = fingerprints(rows)
+    items = models.Item.__table__
+    db.execute(
+        # Derived data: keep updated_at as it was.
+        update(items)
+        .where(items.c.id == bindparam("b_id"))
+        .values(minhash=bindparam("b_minhash"), updated_at=items.c.updated_at),
+        [{"b_id": row.id, "b_minhash": fingerprint.minhash} for row, fingerprint in zip(rows, prints)],
+    )
+    remove_items(db, [row.id for row in rows])
+    bands = [
+        {"item_id": row.id, "band": band, "user_id": row.user_id, "bucket": bucket}
+        for row, fingerprint in zip(rows, prints)
+        for band, bucket in fingerprint.buckets.items()
+    ]
+    if bands:
+        db.execute(insert(models.ItemLshBand), bands)
+    return len(rows)
+
+
+def remove_items(db: Session, item_ids: Iterable[UUID]) -> None:
+    ids = list(item_ids)
+    if ids:
+        db.execute(delete(models.ItemLshBand).where(models.ItemLshBand.item_id.in_(ids)))
+
+
+@dataclass(frozen=True)
+class _Row:
+    title: str | None
+    description: str | None
+    text_content: str | None
+    source_url: str | None
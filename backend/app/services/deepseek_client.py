@@ -8,6 +8,7 @@ from typing import List
 
 import httpx
 
+from app.core import http
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -110,7 +111,7 @@ def generate_tags_for_text(text: str, *, max_tags: int = 6) -> DeepSeekTagResult
     }
 
     try:
-        response = httpx.post(endpoint, headers=headers, json=payload, timeout=90)
+        response = http.post(endpoint, headers=headers, json=payload, timeout=90)
         response.raise_for_status()
     except httpx.HTTPError as exc:
         logger.warning("DeepSeek request failed: %s", exc)
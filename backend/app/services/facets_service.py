@@ -0,0 +1,160 @@
+"""Facet counts for the search filters panel.
+
+Every facet is computed from a single statement: the filtered items query from
+``items_service`` becomes a CTE and one ``UNION ALL`` of small GROUP BYs (one per
+facet) runs over it. SQLite has no GROUPING SETS, and the union keeps the
+statement portable while still scanning the filtered rows once per facet inside
+one round trip. Results are cached per user, data version and filter signature
+and dropped by ``user_cache`` whenever that user's items or tags change.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import String, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import items_service, user_cache
+
+FACETS = ("type", "status", "origin_domain", "tags", "month")
+DEFAULT_TOP = 10
+CACHE_TTL_SECONDS = 60.0
+
+_cache = user_cache.UserCache(max_entries=32, ttl_seconds=CACHE_TTL_SECONDS)
+
+
+def item_facets(
+    db: Session,
+    user: models.User,
+    *,
+    search: str | None = None,
+    item_type: models.ItemType | None = None,
+    status: models.ItemStatus | None = None,
+    origin_domain: str | None = None,
+    tag_names: Sequence[str] = (),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    top: int = DEFAULT_TOP,
+) -> dict[str, list[dict[str, object]]]:
+    """Return ``{facet: [{"value", "count"}, ...]}`` for items matching the filters.
+
+    Type, status and month buckets are complete; origin domains and tags are cut
+    to the ``top`` most frequent values. Months are ``YYYY-MM`` strings, newest first.
+    """
+    normalized_domain = origin_domain.strip().lower() if origin_domain else None
+    key = (
+        search,
+        item_type,
+        status,
+        normalized_domain,
+        tuple(tag_names),
+        created_from,
+        created_to,
+        top,
+    )
+    cached = _cache.get(user.id, key, version=user.data_version)
+    if cached is not None:
+        return cached
+
+    filtered = (
+        items_service.filtered_items_query(
+            db,
+            user,
+            search=search,
+            item_type=item_type,
+            status=status,
+            origin_domain=normalized_domain,
+            tag_names=tag_names,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        .with_entities(
+            models.Item.id.label("id"),
+            models.Item.type.label("type"),
+            models.Item.status.label("status"),
+            models.Item.origin_domain.label("origin_domain"),
+            _month_expression(db).label("month"),
+        )
+        .cte("filtered_items")
+    )
+
+    def _grouped(facet: str, column):
+        return (
+            select(
+                literal(facet).label("facet"),
+                cast(column, String).label("value"),
+                func.count().label("count"),
+            )
+            .select_from(filtered)
+            .where(column.is_not(None))
+            .group_by(column)
+        )
+
+    # One bucket per tag, labelled with the name as the user wrote it.
+    tag_counts = (
+        select(
+            literal("tags").label("facet"),
+            models.Tag.name.label("value"),
+            func.count(func.distinct(filtered.c.id)).label("count"),
+        )
+        .select_from(
+            filtered.join(models.ItemTag, models.ItemTag.item_id == filtered.c.id).join(
+                models.Tag, models.Tag.id == models.ItemTag.tag_id
+            )
+        )
+        .group_by(models.Tag.id, models.Tag.name)
+    )
+    statement = union_all(
+        _grouped("type", filtered.c.type),
+        _grouped("status", filtered.c.status),
+        _grouped("origin_domain", filtered.c.origin_domain),
+        _grouped("month", filtered.c.month),
+        tag_counts,
+    )
+
+    buckets: dict[str, list[tuple[str, int]]] = {facet: [] for facet in FACETS}
+    for facet, value, count in db.execute(statement):
+        buckets[facet].append((value, int(count)))
+
+    result = {
+        "type": _enum_counts(buckets["type"], models.ItemType),
+        "status": _enum_counts(buckets["status"], models.ItemStatus),
+        "origin_domain": _top_counts(buckets["origin_domain"], top),
+        "tags": _top_counts(buckets["tags"], top),
+        "month": [
+            {"value": value, "count": count}
+            for value, count in sorted(buckets["month"], reverse=True)
+        ],
+    }
+    _cache.set(user.id, key, result, version=user.data_version)
+    return result
+
+
+def reset_cache() -> None:
+    _cache.clear()
+
+
+def _month_expression(db: Session):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", models.Item.created_at)
+    return func.to_char(func.date_trunc("month", models.Item.created_at), "YYYY-MM")
+
+
+def _enum_counts(rows, enum_cls) -> list[dict[str, object]]:
+    counts = []
+    for raw, count in rows:
+        # Enum columns persist member names; accept values too for hand-written rows.
+        member = enum_cls.__members__.get(raw)
+        if member is None:
+            member = enum_cls(raw)
+        counts.append({"value": member.value, "count": count})
+    counts.sort(key=lambda entry: (-entry["count"], entry["value"]))
+    return counts
+
+
+def _top_counts(rows, top: int) -> list[dict[str, object]]:
+    ranked = sorted(rows, key=lambda row: (-row[1], row[0]))[:top]
+    return [{"value": value, "count": count} for value, count in ranked]
@@ -0,0 +1,356 @@
+"""Optional in-process columnar index for the structured ``list_items`` filters.
+
+When ``FILTER_INDEX_ENABLED`` is set, each user's items are mirrored into NumPy
+arrays sorted newest-first (int64 timestamps, uint8 type/status codes, interned
+domain ids and one packed bitset per tag). Type/status/domain/date/tag filters
+and keyset/offset paging are then answered with vectorized masks, and only the
+resulting page of ids is hydrated from the database.
+
+Indexes are built lazily on first use and remember the ``users.data_version``
+they reflect. When a write in this process reports which items it changed
+(``user_cache.on_items_changed``), only those rows are re-read and spliced into
+the cached arrays on the next read, and the index moves to the new version.
+Changes without item ids (tag renames/merges, filter-wide tagging), more than
+``MAX_DELTA_ITEMS`` pending ids, or a request carrying a newer version than the
+index (a write from another process) mean a full rebuild, as does reaching
+``FILTER_INDEX_MAX_AGE_SECS``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import get_settings
+from . import user_cache
+
+logger = logging.getLogger(__name__)
+
+TYPE_CODES = {item_type: code for code, item_type in enumerate(models.ItemType)}
+STATUS_CODES = {item_status: code for code, item_status in enumerate(models.ItemStatus)}
+NO_DOMAIN = -1
+MAX_DELTA_ITEMS = 500
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime (naive values are treated as UTC) to integer microseconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass
+class UserFilterIndex:
+    ids: list[UUID]
+    created_us: np.ndarray
+    type_codes: np.ndarray
+    status_codes: np.ndarray
+    domain_ids: np.ndarray
+    domains: dict[str, int]
+    tag_bits: dict[str, np.ndarray]
+    positions: dict[UUID, int]
+    version: int | None = None
+    built_at: float = field(default_factory=time.monotonic)
+    # Items written since the arrays were filled; applied by ``get_index``.
+    stale_ids: frozenset[UUID] = frozenset()
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def mask(
+        self,
+        *,
+        item_type: models.ItemType | None = None,
+        status: models.ItemStatus | None = None,
+        origin_domain: str | None = None,
+        tag_names: Sequence[str] = (),
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> np.ndarray:
+        """Boolean row mask for the given filters (rows are in newest-first order)."""
+        selected = np.ones(self.size, dtype=bool)
+        if item_type is not None:
+            selected &= self.type_codes == TYPE_CODES[item_type]
+        if status is not None:
+            selected &= self.status_codes == STATUS_CODES[status]
+        if origin_domain:
+            domain_id = self.domains.get(origin_domain.strip().lower())
+            if domain_id is None:
+                return np.zeros(self.size, dtype=bool)
+            selected &= self.domain_ids == domain_id
+        if created_from is not None:
+            selected &= self.created_us >= to_epoch_us(created_from)
+        if created_to is not None:
+            selected &= self.created_us <= to_epoch_us(created_to)
+        if tag_names:
+            packed = []
+            for name in tag_names:
+                bits = self.tag_bits.get(name)
+                if bits is None:
+                    return np.zeros(self.size, dtype=bool)
+                packed.append(bits)
+            combined = np.bitwise_and.reduce(packed)
+            selected &= np.unpackbits(combined, count=self.size).astype(bool)
+        return selected
+
+    def start_after(self, created_at: datetime, item_id: UUID) -> int:
+        """Row position just past the keyset cursor ``(created_at, item_id)``."""
+        return _insertion_point(self.ids, -self.created_us, to_epoch_us(created_at), item_id)
+
+    def page(
+        self,
+        selected: np.ndarray,
+        *,
+        start: int = 0,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> list[UUID]:
+        positions = np.flatnonzero(selected[start:])[offset : offset + limit] + start
+        return [self.ids[position] for position in positions]
+
+
+_indexes: dict[UUID, UserFilterIndex] = {}
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return get_settings().FILTER_INDEX_ENABLED
+
+
+@user_cache.on_items_changed
+def invalidate(
+    user_id: UUID,
+    item_ids: frozenset[UUID] | None = None,
+    versions: tuple[int, int] | None = None,
+) -> None:
+    """Mark ``item_ids`` for re-reading, or drop the index when the change cannot be patched."""
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is None:
+            return
+        if (
+            item_ids is None
+            or versions is None
+            or versions[0] != index.version
+            or len(index.stale_ids) + len(item_ids) > MAX_DELTA_ITEMS
+        ):
+            del _indexes[user_id]
+        else:
+            index.stale_ids = index.stale_ids | item_ids
+            index.version = versions[1]
+
+
+def reset() -> None:
+    with _lock:
+        _indexes.clear()
+
+
+def get_index(db: Session, user_id: UUID, *, version: int | None = None) -> UserFilterIndex:
+    """The user's index, current as of ``version`` (the request's ``users.data_version``)."""
+    max_age = get_settings().FILTER_INDEX_MAX_AGE_SECS
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is not None:
+            stale, indexed_version = index.stale_ids, index.version
+    if (
+        index is None
+        or time.monotonic() - index.built_at > max_age
+        or (version is not None and (indexed_version is None or version > indexed_version))
+    ):
+        fresh = build_index(db, user_id)
+        patched = False
+    elif stale:
+        fresh = apply_changes(db, user_id, index, stale)
+        patched = True
+    else:
+        return index
+    with _lock:
+        current = _indexes.get(user_id)
+        if current is index:
+            if patched:
+                fresh.version = current.version
+                if current.version != indexed_version:
+                    # Writes reported while this thread was reading; re-applied on the next read.
+                    fresh.stale_ids = current.stale_ids
+            _indexes[user_id] = fresh
+    return fresh
+
+
+def build_index(db: Session, user_id: UUID) -> UserFilterIndex:
+    started = time.perf_counter()
+    # Read before the rows, so the rows are at least as new as the recorded version.
+    version = db.scalar(select(models.User.data_version).where(models.User.id == user_id))
+    rows = db.execute(
+        select(
+            models.Item.id,
+            models.Item.created_at,
+            models.Item.type,
+            models.Item.status,
+            models.Item.origin_domain,
+        )
+        .where(models.Item.user_id == user_id)
+        .order_by(models.Item.created_at.desc(), models.Item.id.desc())
+    ).all()
+
+    count = len(rows)
+    ids: list[UUID] = []
+    positions: dict[UUID, int] = {}
+    created_us = np.empty(count, dtype=np.int64)
+    type_codes = np.empty(count, dtype=np.uint8)
+    status_codes = np.empty(count, dtype=np.uint8)
+    domain_ids = np.empty(count, dtype=np.int32)
+    domains: dict[str, int] = {}
+    for position, (item_id, created_at, item_type, item_status, domain) in enumerate(rows):
+        ids.append(item_id)
+        positions[item_id] = position
+        created_us[position] = to_epoch_us(created_at)
+        type_codes[position] = TYPE_CODES[item_type]
+        status_codes[position] = STATUS_CODES[item_status]
+        domain_ids[position] = domains.setdefault(domain, len(domains)) if domain else NO_DOMAIN
+
+    tag_rows = db.execute(
+        select(models.ItemTag.item_id, models.Tag.name_normalized)
+        .join(models.Tag, models.Tag.id == models.ItemTag.tag_id)
+        .where(models.Tag.user_id == user_id)
+    ).all()
+    tag_members: dict[str, list[int]] = {}
+    for item_id, tag_name in tag_rows:
+        position = positions.get(item_id)
+        if position is not None:
+            tag_members.setdefault(tag_name, []).append(position)
+    tag_bits = {name: _packed_bitset(members, count) for name, members in tag_members.items()}
+
+    logger.debug(
+        "filter_index_built user_id=%s items=%s tags=%s elapsed_ms=%.1f",
+        user_id,
+        count,
+        len(tag_bits),
+        (time.perf_counter() - started) * 1000,
+    )
+    return UserFilterIndex(
+        ids=ids,
+        created_us=created_us,
+        type_codes=type_codes,
+        status_codes=status_codes,
+        domain_ids=domain_ids,
+        domains=domains,
+        tag_bits=tag_bits,
+        positions=positions,
+        version=version,
+    )
+
+
+def apply_changes(
+    db: Session,
+    user_id: UUID,
+    index: UserFilterIndex,
+    item_ids: frozenset[UUID],
+) -> UserFilterIndex:
+    """Copy of ``index`` with the rows of ``item_ids`` re-read (deleted items drop out)."""
+    started = time.perf_counter()
+    rows = db.execute(
+        select(
+            models.Item.id,
+            models.Item.created_at,
+            models.Item.type,
+            models.Item.status,
+            models.Item.origin_domain,
+        )
+        .where(models.Item.user_id == user_id, models.Item.id.in_(item_ids))
+        .order_by(models.Item.created_at.desc(), models.Item.id.desc())
+    ).all()
+    tag_rows = db.execute(
+        select(models.ItemTag.item_id, models.Tag.name_normalized)
+        .join(models.Tag, models.Tag.id == models.ItemTag.tag_id)
+        .where(models.Tag.user_id == user_id, models.ItemTag.item_id.in_(item_ids))
+    ).all()
+
+    removed = sorted(index.positions[item_id] for item_id in item_ids if item_id in index.positions)
+    ids = [item_id for item_id in index.ids if item_id not in item_ids] if removed else list(index.ids)
+    created_us = np.delete(index.created_us, removed)
+    negated = -created_us
+    # Rows arrive newest-first, so their insertion points never decrease and
+    # np.insert keeps rows that share one in the given order.
+    inserts = [
+        _insertion_point(ids, negated, to_epoch_us(created_at), item_id)
+        for item_id, created_at, _, _, _ in rows
+    ]
+    domains = dict(index.domains)
+    created_us = np.insert(created_us, inserts, [to_epoch_us(row[1]) for row in rows])
+    type_codes = np.insert(np.delete(index.type_codes, removed), inserts, [TYPE_CODES[row[2]] for row in rows])
+    status_codes = np.insert(
+        np.delete(index.status_codes, removed), inserts, [STATUS_CODES[row[3]] for row in rows]
+    )
+    domain_ids = np.insert(
+        np.delete(index.domain_ids, removed),
+        inserts,
+        [domains.setdefault(row[4], len(domains)) if row[4] else NO_DOMAIN for row in rows],
+    )
+    for position, (item_id, *_) in zip(reversed(inserts), reversed(rows)):
+        ids.insert(position, item_id)
+
+    count = len(ids)
+    row_tags: dict[str, set[UUID]] = {}
+    for item_id, tag_name in tag_rows:
+        row_tags.setdefault(tag_name, set()).add(item_id)
+    tag_bits: dict[str, np.ndarray] = {}
+    for name in index.tag_bits.keys() | row_tags.keys():
+        members = row_tags.get(name, set())
+        old = index.tag_bits.get(name)
+        bits = (
+            np.delete(np.unpackbits(old, count=index.size).astype(bool), removed)
+            if old is not None
+            else np.zeros(count - len(rows), dtype=bool)
+        )
+        bits = np.insert(bits, inserts, [row[0] in members for row in rows])
+        if bits.any():
+            tag_bits[name] = np.packbits(bits)
+
+    logger.debug(
+        "filter_index_patched user_id=%s items=%s changed=%s elapsed_ms=%.1f",
+        user_id,
+        count,
+        len(item_ids),
+        (time.perf_counter() - started) * 1000,
+    )
+    return UserFilterIndex(
+        ids=ids,
+        created_us=created_us,
+        type_codes=type_codes,
+        status_codes=status_codes,
+        domain_ids=domain_ids,
+        domains=domains,
+        tag_bits=tag_bits,
+        positions={item_id: position for position, item_id in enumerate(ids)},
+        version=index.version,
+        built_at=index.built_at,
+    )
+
+
+def _insertion_point(ids: Sequence[UUID], negated_created_us: np.ndarray, created_us: int, item_id: UUID) -> int:
+    """First row that sorts after ``(created_us, item_id)`` in newest-first, id-descending order."""
+    lo = int(np.searchsorted(negated_created_us, -created_us, side="left"))
+    hi = int(np.searchsorted(negated_created_us, -created_us, side="right"))
+    for position in range(lo, hi):
+        if ids[position].int < item_id.int:
+            return position
+    return hi
+
+
+def _packed_bitset(members: Iterable[int], size: int) -> np.ndarray:
+    bits = np.zeros(size, dtype=bool)
+    bits[list(members)] = True
+    return np.packbits(bits)
@@ -0,0 +1,250 @@
+"""Perceptual hashes of stored images and near-duplicate lookups over them.
+
+Every item whose ``file_path`` is an image gets a 64-bit difference hash (dHash:
+grayscale, resize to 9x8, one bit per horizontally adjacent pixel pair) stored
+signed in ``items.image_hash``. Re-encoded, resized or re-hosted copies of the
+same picture land within a few bits of each other.
+
+Hamming-radius lookups go through a per-user BK-tree built lazily from the
+hashes in the database, keyed by the user's ``data_version`` and dropped via
+``user_cache`` on writes. Exact copies
+are also caught at download time: ``reuse_stored_copy`` points a new item at an
+existing file with the same hash instead of keeping a second copy on disk.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Iterable, Iterator
+from uuid import UUID
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models
+from ..core import storage
+from ..core.config import get_settings
+from . import user_cache
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+CACHE_TTL_SECONDS = 300.0
+IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "webp", "bmp"})
+_SIGN_BIT = 1 << (HASH_BITS - 1)
+_BIT_WEIGHTS = 1 << np.arange(HASH_BITS - 1, -1, -1, dtype=np.uint64)
+_trees = user_cache.UserCache(max_entries=1, ttl_seconds=CACHE_TTL_SECONDS)
+
+
+def to_signed(value: int) -> int:
+    return value - (1 << HASH_BITS) if value & _SIGN_BIT else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def hamming(left: int, right: int) -> int:
+    return (to_unsigned(left) ^ to_unsigned(right)).bit_count()
+
+
+def dhash(image: Image.Image) -> int:
+    """Unsigned 64-bit difference hash of ``image``."""
+    small = image.convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int(np.sum(_BIT_WEIGHTS[bits], dtype=np.uint64))
+
+
+def hash_stored_image(relative_path: str | None) -> tuple[int, tuple[int, int]] | None:
+    """Signed dHash and pixel size of a stored image, or ``None`` if it is not one."""
+    if not relative_path or Path(relative_path).suffix.lstrip(".").lower() not in IMAGE_EXTENSIONS:
+        return None
+    try:
+        path = storage.resolve_storage_path(relative_path, create_parents=False)
+        with Image.open(path) as image:
+            image.seek(0)
+            return to_signed(dhash(image)), image.size
+    except (OSError, ValueError, UnidentifiedImageError) as exc:
+        logger.debug("Could not hash image %s: %s", relative_path, exc)
+        return None
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance."""
+
+    def __init__(self) -> None:
+        # Node: [hash, item ids, {distance: child node}]
+        self._root: list | None = None
+        self.size = 0
+
+    def add(self, value: int, item_id: UUID) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [item_id], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item_id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item_id], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list[tuple[UUID, int]]:
+        """Item ids whose hash is within ``radius`` bits of ``value``, nearest first."""
+        found: list[tuple[UUID, int]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((item_id, distance) for item_id in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        found.sort(key=lambda hit: hit[1])
+        return found
+
+    def __iter__(self) -> Iterator[tuple[int, list[UUID]]]:
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node[0], node[1]
+            stack.extend(node[2].values())
+
+
+def get_tree(db: Session, user_id: UUID, *, version: int | None = None) -> BKTree:
+    tree = _trees.get(user_id, "tree", version=version)
+    if tree is None:
+        tree = BKTree()
+        rows = db.execute(
+            select(models.Item.id, models.Item.image_hash).where(
+                models.Item.user_id == user_id,
+                models.Item.image_hash.is_not(None),
+            )
+        )
+        for item_id, image_hash in rows:
+            tree.add(image_hash, item_id)
+        _trees.set(user_id, "tree", tree, version=version)
+    return tree
+
+
+def reset_cache() -> None:
+    _trees.clear()
+
+
+def index_items(db: Session, item_ids: Iterable[UUID]) -> int:
+    """Hash the stored images of ``item_ids`` inside the caller's transaction."""
+    ids = list(item_ids)
+    if not ids:
+        return 0
+    rows = db.execute(select(models.Item.id, models.Item.file_path).where(models.Item.id.in_(ids))).all()
+    if not rows:
+        return 0
+    values = []
+    for item_id, file_path in rows:
+        hashed = hash_stored_image(file_path)
+        values.append({"b_id": item_id, "b_hash": hashed[0] if hashed else None})
+    items = models.Item.__table__
+    db.execute(
+        # Derived data: keep updated_at as it was.
+        update(items)
+        .where(items.c.id == bindparam("b_id"))
+        .values(image_hash=bindparam("b_hash"), updated_at=items.c.updated_at),
+        values,
+    )
+    return sum(1 for value in values if value["b_hash"] is not None)
+
+
+def reuse_stored_copy(db: Session, user_id: UUID, relative_path: str) -> str:
+    """Return an existing file of the user's with the same image, deleting ``relative_path``.
+
+    Only identical hashes whose stored copy is at least as large in both
+    dimensions are reused, so a sharper re-download is kept.
+    """
+    hashed = hash_stored_image(relative_path)
+    if hashed is None:
+        return relative_path
+    image_hash, (width, height) = hashed
+    candidates = db.scalars(
+        select(models.Item.file_path)
+        .where(
+            models.Item.user_id == user_id,
+            models.Item.image_hash == image_hash,
+            models.Item.file_path.is_not(None),
+            models.Item.file_path != relative_path,
+        )
+        .distinct()
+    ).all()
+    for candidate in candidates:
+        existing = hash_stored_image(candidate)
+        if existing is None or existing[0] != image_hash:
+            continue
+        existing_width, existing_height = existing[1]
+        if existing_width >= width and existing_height >= height:
+            storage.safe_remove_path(relative_path)
+            logger.info("Reused stored image %s instead of %s", candidate, relative_path)
+            return candidate
+    return relative_path
+
+
+def duplicate_clusters(
+    db: Session,
+    user: models.User,
+    *,
+    radius: int | None = None,
+) -> list[list[models.Item]]:
+    """Groups of the user's items whose images are within ``radius`` bits, largest first.
+
+    Items in a group are ordered oldest first; clusters are the connected
+    components of the "within radius" relation.
+    """
+    radius = get_settings().IMAGE_DUPLICATE_RADIUS if radius is None else radius
+    tree = get_tree(db, user.id, version=user.data_version)
+    parent: dict[UUID, UUID] = {}
+
+    def find(item_id: UUID) -> UUID:
+        parent.setdefault(item_id, item_id)
+        while parent[item_id] != item_id:
+            parent[item_id] = parent[parent[item_id]]
+            item_id = parent[item_id]
+        return item_id
+
+    for value, item_ids in tree:
+        for other_id, _ in tree.search(value, radius):
+            for item_id in item_ids:
+                root, other_root = find(item_id), find(other_id)
+                if root != other_root:
+                    parent[other_root] = root
+
+    groups: dict[UUID, list[UUID]] = {}
+    for item_id in parent:
+        groups.setdefault(find(item_id), []).append(item_id)
+    grouped_ids = [ids for ids in groups.values() if len(ids) > 1]
+    if not grouped_ids:
+        return []
+    items = (
+        db.query(models.Item)
+        .options(selectinload(models.Item.tags))
+        .filter(
+            models.Item.user_id == user.id,
+            models.Item.id.in_([item_id for ids in grouped_ids for item_id in ids]),
+        )
+        .all()
+    )
+    by_id = {item.id: item for item in items}
+    clusters = []
+    for ids in grouped_ids:
+        members = sorted((by_id[item_id] for item_id in ids if item_id in by_id), key=lambda item: (item.created_at, str(item.id)))
+        if len(members) > 1:
+            clusters.append(members)
+    clusters.sort(key=lambda members: (-len(members), members[0].created_at))
+    return clusters
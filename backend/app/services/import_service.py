@@ -0,0 +1,252 @@
+"""Bulk NDJSON import of items.
+
+Lines are parsed and validated one at a time so a bad line only produces an
+error entry, then written in batches: one multi-row ``INSERT`` for the items,
+one ``SELECT`` plus one ``INSERT ... ON CONFLICT DO NOTHING`` to resolve tags by
+normalized name, one multi-row ``INSERT`` for ``item_tags`` and one batched
+``UPDATE`` of the tags' ``item_count``. Each batch is its own
+transaction. The batch insert runs inside a savepoint; when it fails, it is
+rolled back and the batch's lines are retried one by one, each in its own
+savepoint, so only the lines the database rejects are reported and the stream
+keeps going. Lines may be bare item objects or the ``{"cursor", "item"}`` envelopes
+written by the NDJSON export. ``LineSplitter`` cuts the request body into lines
+without holding more than ``IMPORT_MAX_LINE_BYTES`` of any one line; longer
+lines are reported as errors.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import Counter
+from typing import Sequence
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from . import (
+    dedup_service,
+    image_hash_service,
+    items_service,
+    search_service,
+    semantic_service,
+    tags_service,
+    user_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 1000
+LINE_TOO_LONG = "Line is longer than IMPORT_MAX_LINE_BYTES"
+
+ITEM_COLUMNS = (
+    "type",
+    "source_url",
+    "origin_domain",
+    "title",
+    "description",
+    "text_content",
+    "extra",
+    "thumbnail_path",
+    "file_path",
+    "original_filename",
+    "content_type",
+    "file_size_bytes",
+    "status",
+)
+
+
+class ItemImporter:
+    """Accumulates import results for one request; ``import_lines`` handles one batch."""
+
+    def __init__(self, db: Session, user: models.User) -> None:
+        self.db = db
+        self.user = user
+        self.created = 0
+        self.error_count = 0
+        self.errors: list[schemas.ImportLineError] = []
+
+    def import_lines(self, lines: Sequence[tuple[int, bytes | None]]) -> None:
+        """Import one batch of numbered lines; ``None`` stands for a line ``LineSplitter`` cut off."""
+        rows: list[tuple[int, dict, list[str]]] = []
+        for line_number, raw in lines:
+            if raw is None:
+                self._error(line_number, LINE_TOO_LONG)
+                continue
+            try:
+                row, tag_names = parse_line(raw)
+            except ValueError as exc:
+                self._error(line_number, str(exc))
+                continue
+            rows.append((line_number, row, tag_names))
+        if not rows:
+            return
+        try:
+            item_ids = self._insert_rows(rows)
+            if item_ids:
+                self._index(item_ids)
+                user_cache.record_change(self.db, self.user.id, item_ids)
+            self.db.commit()
+        except SQLAlchemyError as exc:
+            self.db.rollback()
+            logger.warning("Import batch failed: %s", exc)
+            for line_number, _, _ in rows:
+                self._error(line_number, "Database error while inserting this batch")
+            return
+        self.created += len(item_ids)
+
+    def result(self) -> schemas.ItemImportResult:
+        return schemas.ItemImportResult(
+            created=self.created,
+            error_count=self.error_count,
+            errors=self.errors,
+        )
+
+    def _error(self, line_number: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(schemas.ImportLineError(line=line_number, error=message))
+
+    def _insert_rows(self, rows: list[tuple[int, dict, list[str]]]) -> list[uuid.UUID]:
+        """Insert ``rows`` as one batch, falling back to one savepoint per line on a database error."""
+        try:
+            with self.db.begin_nested():
+                return self._insert(rows)
+        except SQLAlchemyError as exc:
+            logger.warning("Import batch failed, retrying its %s lines one by one: %s", len(rows), exc)
+        item_ids: list[uuid.UUID] = []
+        for line in rows:
+            try:
+                with self.db.begin_nested():
+                    item_ids.extend(self._insert([line]))
+            except SQLAlchemyError as exc:
+                logger.info("Import line %s failed: %s", line[0], exc)
+                self._error(line[0], "Database error while inserting this line")
+        return item_ids
+
+    def _insert(self, rows: list[tuple[int, dict, list[str]]]) -> list[uuid.UUID]:
+        db = self.db
+        now = models.utcnow()
+        item_rows = []
+        for _, row, _ in rows:
+            created_at = row.get("created_at") or now
+            item_rows.append(
+                {
+                    **row,
+                    "id": uuid.uuid4(),
+                    "user_id": self.user.id,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+        db.execute(insert(models.Item), item_rows)
+
+        tag_ids = self._resolve_tags({name for _, _, names in rows for name in names})
+        links = [
+            {"item_id": item["id"], "tag_id": tag_ids[key], "created_at": now}
+            for item, (_, _, names) in zip(item_rows, rows)
+            for key in dict.fromkeys(models.normalize_tag_name(name) for name in names)
+        ]
+        if links:
+            db.execute(insert(models.ItemTag), links)
+            tags_service.adjust_item_counts(db, Counter(link["tag_id"] for link in links))
+        return [item["id"] for item in item_rows]
+
+    def _index(self, item_ids: list[uuid.UUID]) -> None:
+        # Outside the savepoints: semantic vectors are queued for after the
+        # commit and would outlive a rolled-back savepoint.
+        db = self.db
+        search_service.index_items(db, item_ids)
+        semantic_service.index_items(db, item_ids)
+        dedup_service.index_items(db, item_ids)
+        image_hash_service.index_items(
+            db,
+            db.scalars(
+                select(models.Item.id).where(models.Item.id.in_(item_ids), models.Item.file_path.is_not(None))
+            ).all(),
+        )
+
+    def _resolve_tags(self, names: set[str]) -> dict[str, uuid.UUID]:
+        tags = tags_service.ensure_tags(self.db, self.user, sorted(names))
+        return {tag.name_normalized: tag.id for tag in tags}
+
+
+class LineSplitter:
+    """Cut a byte stream into numbered lines, keeping at most ``max_bytes`` of the current one.
+
+    Only the newly fed chunk is searched for newlines. A line longer than
+    ``max_bytes`` is dropped as it streams in and comes out as ``None``.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.line_number = 0
+        self._buffer = bytearray()
+        self._too_long = False
+
+    def feed(self, chunk: bytes) -> list[tuple[int, bytes | None]]:
+        lines: list[tuple[int, bytes | None]] = []
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            self._append(chunk, start, end)
+            lines.append(self._take())
+            start = end + 1
+        self._append(chunk, start, len(chunk))
+        return lines
+
+    def finish(self) -> list[tuple[int, bytes | None]]:
+        """The last line when the body does not end with a newline."""
+        if self._too_long or self._buffer.strip():
+            return [self._take()]
+        return []
+
+    def _append(self, chunk: bytes, start: int, end: int) -> None:
+        if self._too_long:
+            return
+        if len(self._buffer) + end - start > self.max_bytes:
+            self._too_long = True
+            self._buffer.clear()
+            return
+        self._buffer += chunk[start:end]
+
+    def _take(self) -> tuple[int, bytes | None]:
+        self.line_number += 1
+        line = None if self._too_long else bytes(self._buffer)
+        self._buffer.clear()
+        self._too_long = False
+        return self.line_number, line
+
+
+def parse_line(raw: bytes) -> tuple[dict, list[str]]:
+    """Validate one NDJSON line into insertable item columns plus its tag names."""
+    try:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc}") from exc
+    if isinstance(payload, dict) and isinstance(payload.get("item"), dict):
+        payload = payload["item"]
+    if not isinstance(payload, dict):
+        raise ValueError("Each line must be a JSON object")
+    raw_tags = payload.get("tags")
+    if isinstance(raw_tags, list):
+        # Exports carry tag objects; plain imports may send names.
+        payload = {
+            **payload,
+            "tags": [tag.get("name") if isinstance(tag, dict) else tag for tag in raw_tags],
+        }
+    try:
+        entry = schemas.ItemImport.model_validate(payload)
+    except ValidationError as exc:
+        first = exc.errors()[0]
+        location = ".".join(str(part) for part in first["loc"]) or "item"
+        raise ValueError(f"{location}: {first['msg']}") from exc
+
+    data = entry.model_dump(exclude={"tags", "created_at"}, exclude_none=True)
+    items_service._apply_common_normalization(data)
+    row = {column: data.get(column) for column in ITEM_COLUMNS}
+    row["created_at"] = entry.created_at
+    return row, list(entry.tags)
@@ -0,0 +1,179 @@
+"""In-process background pipeline for queued URL saves.
+
+``POST /api/items/url`` in async mode stores a placeholder via
+``ingestion_service.queue_url`` and hands its id to ``enqueue``. A small thread
+pool (``INGEST_WORKERS``) runs ``ingestion_service.complete_pending_item`` with
+its own session, so the request returns as soon as the row is committed.
+
+Jobs live in memory: placeholders left ``queued``, or ``processing`` under a
+lease older than ``INGEST_LEASE_SECS``, by a stopped process are picked up
+again by ``resume_pending`` at startup. Every API process runs it, so it may
+enqueue a placeholder that a live process also holds; that is harmless, as
+``complete_pending_item`` leases the placeholder with a conditional ``UPDATE``
+before fetching and only one process's update matches.
+With ``JOB_QUEUE_ENABLED`` the work goes to durable ``ingest_url`` jobs instead
+(see ``job_queue``) and this pool stays idle.
+
+``wait_for_item`` backs the status endpoint's long poll for both paths. It is a
+coroutine: jobs of this process wake it through an ``asyncio.Event``, other
+placeholders are re-read every ``POLL_INTERVAL_SECS`` in the threadpool, and the
+sleeping in between happens on the event loop rather than on a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .. import models
+from ..core.config import get_settings
+from ..database import SessionLocal
+from . import ingestion_service
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECS = 0.5
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_active: set[UUID] = set()
+_waiters: dict[UUID, list[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+
+def enqueue(item_id: UUID, user_id: UUID) -> None:
+    """Process the placeholder ``item_id`` in the background (no-op if already queued here)."""
+    global _executor
+    with _lock:
+        if item_id in _active:
+            return
+        _active.add(item_id)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().INGEST_WORKERS,
+                thread_name_prefix="ingest",
+            )
+        executor = _executor
+    executor.submit(_run, item_id, user_id)
+
+
+def is_active(item_id: UUID) -> bool:
+    with _lock:
+        return item_id in _active
+
+
+async def wait(item_id: UUID, timeout: float) -> bool:
+    """Wait until this process finishes ``item_id`` or ``timeout`` passes; True if it is idle."""
+    event = asyncio.Event()
+    waiter = (asyncio.get_running_loop(), event)
+    with _lock:
+        if item_id not in _active:
+            return True
+        _waiters.setdefault(item_id, []).append(waiter)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        with _lock:
+            waiters = _waiters.get(item_id, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                _waiters.pop(item_id, None)
+
+
+async def wait_for_item(db: Session, item: models.Item, timeout: float) -> None:
+    """Wait up to ``timeout`` seconds for a queued save to finish, then reload ``item``.
+
+    Jobs of this process are awaited directly; otherwise (a worker elsewhere)
+    the row is re-read every ``POLL_INTERVAL_SECS``.
+    """
+    # End the read transaction so the wait does not hold a pooled connection.
+    await run_in_threadpool(db.commit)
+    deadline = time.monotonic() + timeout
+    if is_active(item.id):
+        await wait(item.id, timeout)
+    else:
+        while (remaining := deadline - time.monotonic()) > 0:
+            await asyncio.sleep(min(POLL_INTERVAL_SECS, remaining))
+            if not await run_in_threadpool(_still_active, db, item):
+                return
+    await run_in_threadpool(db.refresh, item)
+
+
+def _still_active(db: Session, item: models.Item) -> bool:
+    db.refresh(item)
+    progress = ingestion_service.ingest_state(item) or {}
+    active = progress.get("state") in ingestion_service.INGEST_ACTIVE_STATES
+    db.commit()
+    return active
+
+
+def resume_pending(db: Session) -> int:
+    """Re-enqueue placeholders whose processing never finished; returns how many."""
+    if get_settings().JOB_QUEUE_ENABLED:
+        # Durable jobs survive restarts on their own.
+        return 0
+    rows = db.execute(
+        select(models.Item.id, models.Item.user_id, models.Item.extra, models.Item.updated_at).where(
+            models.Item.status == models.ItemStatus.pending,
+            models.Item.source_url.is_not(None),
+        )
+    ).all()
+    claimed: list[tuple[UUID, UUID]] = []
+    now = models.utcnow()
+    for item_id, user_id, extra, updated_at in rows:
+        progress = (extra or {}).get("ingest")
+        if not isinstance(progress, dict) or not ingestion_service.is_claimable(progress, now=now):
+            # Finished, or still leased by a live process.
+            continue
+        # Processes starting together read the same rows; only one update matches.
+        result = db.execute(
+            update(models.Item)
+            .where(models.Item.id == item_id, models.Item.updated_at == updated_at)
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed.append((item_id, user_id))
+    db.commit()
+    for item_id, user_id in claimed:
+        enqueue(item_id, user_id)
+    if claimed:
+        logger.info("ingest_queue_resumed count=%s", len(claimed))
+    return len(claimed)
+
+
+def shutdown(*, wait_for_jobs: bool = False) -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait_for_jobs, cancel_futures=not wait_for_jobs)
+
+
+def _run(item_id: UUID, user_id: UUID) -> None:
+    try:
+        with SessionLocal() as db:
+            user = db.get(models.User, user_id)
+            item = db.get(models.Item, item_id)
+            if user is None or item is None or item.user_id != user_id:
+                return
+            ingestion_service.complete_pending_item(db, user, item)
+    except Exception:  # pragma: no cover - complete_pending_item records its own failures
+        logger.exception("ingest_queue_job_failed item_id=%s", item_id)
+    finally:
+        with _lock:
+            _active.discard(item_id)
+            waiters = _waiters.pop(item_id, [])
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
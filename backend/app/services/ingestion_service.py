@@ -8,16 +8,27 @@ from datetime import datetime, timezone
 from typing import Mapping
 
 import httpx
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..core import storage, urls
-from . import items_service, metadata_service, url_extractors
+from ..core import http, storage, urls
+from ..core.config import get_settings
+from . import dedup_service, image_hash_service, items_service, job_queue, metadata_service, search_service, semantic_service, url_extractors, user_cache
 from .time_utils import parse_metadata_timestamp, parse_twitter_timestamp_from_url
 
 logger = logging.getLogger(__name__)
 
 IMAGE_TIMEOUT = 15.0
+INGEST_QUEUED = "queued"
+INGEST_PROCESSING = "processing"
+INGEST_DONE = "done"
+INGEST_FAILED = "failed"
+INGEST_ACTIVE_STATES = frozenset({INGEST_QUEUED, INGEST_PROCESSING})
+INGEST_JOB = "ingest_url"
+# Someone is waiting on the result, so ahead of refreshes and backfills.
+INGEST_JOB_PRIORITY = 10
+REFRESH_JOB = "refresh_item"
 
 
 def ingest_url(
@@ -29,6 +40,262 @@ def ingest_url(
     image_get: metadata_service.HttpGetter | None = None,
 ) -> models.Item:
     normalized = urls.normalize_url(payload.url)
+    metadata, status = _fetch_url_metadata(normalized, http_get=http_get)
+
+    final_title = payload.title or metadata.title or normalized.url
+    duplicate = None
+    if dedup_service.mode() != "off":
+        duplicate = dedup_service.find_duplicate(
+            db,
+            user.id,
+            title=final_title,
+            description=metadata.description,
+            source_url=normalized.url,
+        )
+    if duplicate and dedup_service.mode() == "merge":
+        existing = items_service.get_item(db, user, duplicate.item_id)
+        if existing is not None:
+            logger.info("Merged near-duplicate save of %s into %s", normalized.url, existing.id)
+            return merge_duplicate(db, user, existing, payload.tags)
+
+    file_path, status = _download_metadata_image(db, user, normalized, metadata, status, image_get=image_get)
+    item_payload = schemas.ItemCreate(
+        title=final_title,
+        description=metadata.description,
+        type=metadata.item_type or models.ItemType.url,
+        status=status,
+        source_url=normalized.url,
+        origin_domain=normalized.domain,
+        file_path=file_path,
+        extra={**(metadata.extra or {}), **dedup_service.duplicate_extra(duplicate)} or None,
+    )
+
+    item = items_service.create_item(db, user, item_payload, created_at=_metadata_created_at(normalized, metadata))
+
+    if payload.tags:
+        items_service.set_item_tags(db, user, item, payload.tags)
+
+    return item
+
+
+def queue_url(
+    db: Session,
+    user: models.User,
+    payload: schemas.UrlIngestionRequest,
+) -> models.Item:
+    """Save a ``PENDING_PROCESSING`` placeholder for ``payload.url`` without fetching it.
+
+    ``complete_pending_item`` fills in metadata and media later, from an
+    ``ingest_url`` job when ``JOB_QUEUE_ENABLED`` and from ``ingest_queue``
+    otherwise; ``extra.ingest`` tracks its progress (``queued``, ``processing``,
+    ``done``, ``failed``).
+    """
+    normalized = urls.normalize_url(payload.url)
+    item_payload = schemas.ItemCreate(
+        title=payload.title or normalized.url,
+        type=models.ItemType.url,
+        status=models.ItemStatus.pending,
+        source_url=normalized.url,
+        origin_domain=normalized.domain,
+        extra={"ingest": {"state": INGEST_QUEUED, "keep_title": bool(payload.title)}},
+    )
+    # Item, tags and job commit together: a placeholder without its job would stay queued forever.
+    try:
+        item = items_service.create_item(db, user, item_payload, commit=False)
+        if payload.tags:
+            item = items_service.set_item_tags(db, user, item, payload.tags, commit=False)
+        if get_settings().JOB_QUEUE_ENABLED:
+            job_queue.enqueue(db, INGEST_JOB, {"item_id": str(item.id)}, user_id=user.id, priority=INGEST_JOB_PRIORITY)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(item)
+    return item
+
+
+def ingest_state(item: models.Item) -> dict | None:
+    """The ``extra.ingest`` progress record of a queued URL save, if any."""
+    state = (item.extra or {}).get("ingest")
+    return state if isinstance(state, dict) else None
+
+
+def complete_pending_item(
+    db: Session,
+    user: models.User,
+    item: models.Item,
+    *,
+    http_get: metadata_service.HttpGetter | None = None,
+    image_get: metadata_service.HttpGetter | None = None,
+    reraise: bool = False,
+) -> models.Item:
+    """Fetch metadata and media for a placeholder from ``queue_url`` and set its final status.
+
+    The fetch holds a lease on the placeholder (``extra.ingest.started_at``):
+    only a ``queued`` placeholder, or one whose lease is older than
+    ``INGEST_LEASE_SECS``, is started, and the result is only written while the
+    lease is still this call's. Near-duplicates are flagged in ``extra`` rather
+    than merged: the client already holds this item's id. With ``reraise`` (a
+    job that will be retried) an error leaves the item queued and propagates
+    instead of failing it; so does finding it leased elsewhere.
+    """
+    progress = ingest_state(item)
+    if progress is None or progress.get("state") not in INGEST_ACTIVE_STATES:
+        return item
+    claimed_at = _start_processing(db, item, progress)
+    if claimed_at is None:
+        logger.info("Queued ingest of %s was taken by another process", item.source_url)
+        still_active = (ingest_state(item) or {}).get("state") in INGEST_ACTIVE_STATES
+        if reraise and still_active:
+            raise RuntimeError("Queued ingest is being processed elsewhere")
+        return item
+    progress = ingest_state(item) or progress
+
+    try:
+        normalized = urls.normalize_url(item.source_url or "")
+        metadata, status = _fetch_url_metadata(normalized, http_get=http_get)
+        title = item.title if progress.get("keep_title") else metadata.title or normalized.url
+        duplicate = None
+        if dedup_service.mode() != "off":
+            duplicate = dedup_service.find_duplicate(
+                db,
+                user.id,
+                title=title,
+                description=metadata.description,
+                source_url=normalized.url,
+                exclude_id=item.id,
+            )
+        file_path, status = _download_metadata_image(db, user, normalized, metadata, status, image_get=image_get)
+    except Exception as exc:
+        db.rollback()
+        error = str(exc) or exc.__class__.__name__
+        if reraise:
+            _set_ingest_state(db, item, claimed_at, INGEST_QUEUED, error=error)
+            raise
+        logger.exception("Queued ingest of %s failed", item.source_url)
+        _set_ingest_state(db, item, claimed_at, INGEST_FAILED, error=error, status=models.ItemStatus.failed)
+        return item
+
+    values = {
+        "title": title,
+        "description": metadata.description,
+        "type": metadata.item_type or models.ItemType.url,
+        "status": status,
+        "file_path": file_path,
+        "extra": {
+            **(metadata.extra or {}),
+            **dedup_service.duplicate_extra(duplicate),
+            "ingest": {**progress, "state": INGEST_DONE},
+        },
+    }
+    created_at = _metadata_created_at(normalized, metadata)
+    if created_at:
+        values["created_at"] = created_at
+    if not _write_if_leased(db, item, claimed_at, values):
+        return item
+    search_service.index_items(db, [item.id])
+    semantic_service.index_items(db, [item.id])
+    dedup_service.index_items(db, [item.id])
+    image_hash_service.index_items(db, [item.id])
+    user_cache.record_change(db, item.user_id, [item.id])
+    db.commit()
+    db.refresh(item)
+    return item
+
+
+def is_claimable(progress: Mapping | None, *, now: datetime | None = None) -> bool:
+    """Whether a queued save may be started: ``queued``, or ``processing`` under an expired lease."""
+    if not progress:
+        return False
+    state = progress.get("state")
+    if state == INGEST_QUEUED:
+        return True
+    if state != INGEST_PROCESSING:
+        return False
+    try:
+        started_at = datetime.fromisoformat(progress["started_at"])
+    except (KeyError, TypeError, ValueError):
+        # Left by a process that predates leases; nothing says it is still alive.
+        return True
+    age = ((now or models.utcnow()) - started_at).total_seconds()
+    return age >= get_settings().INGEST_LEASE_SECS
+
+
+def _start_processing(db: Session, item: models.Item, progress: dict) -> datetime | None:
+    """Lease ``item`` and move it to ``processing``; returns the lease's timestamp, or None if not claimable.
+
+    The ``UPDATE`` only matches the row as it was loaded, so of several
+    processes holding the same placeholder exactly one gets it.
+    """
+    now = models.utcnow()
+    started = 0
+    if is_claimable(progress, now=now):
+        started = db.execute(
+            update(models.Item)
+            .where(
+                models.Item.id == item.id,
+                models.Item.updated_at == item.updated_at,
+                models.Item.extra[("ingest", "state")].as_string() == progress["state"],
+            )
+            .values(
+                extra={
+                    **(item.extra or {}),
+                    "ingest": {**progress, "state": INGEST_PROCESSING, "started_at": now.isoformat()},
+                },
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    if started:
+        user_cache.record_change(db, item.user_id, [item.id])
+    db.commit()
+    db.refresh(item)
+    return now if started == 1 else None
+
+
+def _write_if_leased(db: Session, item: models.Item, claimed_at: datetime, values: dict) -> bool:
+    """Write ``values`` to ``item`` unless another process took it over since ``claimed_at``."""
+    written = db.execute(
+        update(models.Item)
+        .where(models.Item.id == item.id, models.Item.updated_at == claimed_at)
+        .values(**values, updated_at=models.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if written != 1:
+        db.rollback()
+        db.refresh(item)
+        logger.warning("Queued ingest of %s lost its lease; dropping the result", item.source_url)
+        return False
+    return True
+
+
+def _set_ingest_state(
+    db: Session,
+    item: models.Item,
+    claimed_at: datetime,
+    state: str,
+    *,
+    error: str | None = None,
+    status: models.ItemStatus | None = None,
+) -> None:
+    progress = {**(ingest_state(item) or {}), "state": state}
+    if error:
+        progress["error"] = error
+    values: dict = {"extra": {**(item.extra or {}), "ingest": progress}}
+    if status is not None:
+        values["status"] = status
+    if not _write_if_leased(db, item, claimed_at, values):
+        return
+    user_cache.record_change(db, item.user_id, [item.id])
+    db.commit()
+    db.refresh(item)
+
+
+def _fetch_url_metadata(
+    normalized: urls.NormalizedURL,
+    *,
+    http_get: metadata_service.HttpGetter | None = None,
+) -> tuple[metadata_service.MetadataResult, models.ItemStatus]:
     html_result = metadata_service.fetch_html(
         normalized.url,
         http_get=http_get,
@@ -47,8 +314,18 @@ def ingest_url(
     status = models.ItemStatus.ok
     if html_result.error and not html_result.html:
         status = models.ItemStatus.failed
+    return metadata, status
 
-    final_title = payload.title or metadata.title or normalized.url
+
+def _download_metadata_image(
+    db: Session,
+    user: models.User,
+    normalized: urls.NormalizedURL,
+    metadata: metadata_service.MetadataResult,
+    status: models.ItemStatus,
+    *,
+    image_get: metadata_service.HttpGetter | None = None,
+) -> tuple[str | None, models.ItemStatus]:
     file_path: str | None = None
     image_error: str | None = None
     if metadata.image_url and url_extractors._looks_like_image_url(metadata.image_url):
@@ -60,28 +337,51 @@ def ingest_url(
             logger.warning("Failed to download image for %s: %s", normalized.url, image_error)
             if status == models.ItemStatus.ok:
                 status = models.ItemStatus.pending
+        elif file_path:
+            file_path = image_hash_service.reuse_stored_copy(db, user.id, file_path)
+    return file_path, status
 
+
+def _metadata_created_at(normalized: urls.NormalizedURL, metadata: metadata_service.MetadataResult) -> datetime | None:
     created_at = parse_metadata_timestamp((metadata.extra or {}).get("timestamp"))
     if not created_at and metadata.item_type == models.ItemType.tweet:
         created_at = parse_twitter_timestamp_from_url(normalized.url)
+    return created_at
 
-    item_payload = schemas.ItemCreate(
-        title=final_title,
-        description=metadata.description,
-        type=metadata.item_type or models.ItemType.url,
-        status=status,
-        source_url=normalized.url,
-        origin_domain=normalized.domain,
-        file_path=file_path,
-        extra=metadata.extra or None,
-    )
 
-    item = items_service.create_item(db, user, item_payload, created_at=created_at)
+def merge_duplicate(
+    db: Session,
+    user: models.User,
+    existing: models.Item,
+    tag_names: list[str] | None,
+) -> models.Item:
+    """Fold a repeated save into ``existing``: keep its content, add any new tags."""
+    if tag_names:
+        current = [tag.name for tag in existing.tags]
+        return items_service.set_item_tags(db, user, existing, current + list(tag_names))
+    return existing
 
-    if payload.tags:
-        items_service.set_item_tags(db, user, item, payload.tags)
 
-    return item
+def queue_refresh(
+    db: Session,
+    user: models.User,
+    item: models.Item,
+    *,
+    force_download: bool = False,
+    update_text: bool = False,
+    priority: int = 0,
+    commit: bool = True,
+) -> models.Job:
+    """Add a ``refresh_item`` job that runs ``refresh_url_item`` on a worker."""
+    if item.user_id != user.id:
+        raise ValueError("Cannot refresh an item you do not own")
+    if not item.source_url:
+        raise ValueError("Cannot refresh item without source_url")
+    payload = {"item_id": str(item.id), "force_download": force_download, "update_text": update_text}
+    job = job_queue.enqueue(db, REFRESH_JOB, payload, user_id=user.id, priority=priority)
+    if commit:
+        db.commit()
+    return job
 
 
 def refresh_url_item(
@@ -160,7 +460,7 @@ def refresh_url_item(
                 thumbnail_path = None
         else:
             if downloaded_path:
-                file_path = downloaded_path
+                file_path = image_hash_service.reuse_stored_copy(db, user.id, downloaded_path)
                 thumbnail_path = None
 
     final_title = item.title
@@ -198,11 +498,15 @@ def refresh_url_item(
     item.type = new_type
 
     db.add(item)
+    db.flush()
+    search_service.index_items(db, [item.id])
+    semantic_service.index_items(db, [item.id])
+    dedup_service.index_items(db, [item.id])
+    image_hash_service.index_items(db, [item.id])
+    user_cache.record_change(db, item.user_id, [item.id])
     if commit:
         db.commit()
         db.refresh(item)
-    else:
-        db.flush()
     return item
 
 
@@ -211,7 +515,7 @@ def _download_primary_image(
     *,
     image_get: metadata_service.HttpGetter | None = None,
 ) -> tuple[str | None, str | None]:
-    getter = image_get or httpx.get
+    getter = image_get or http.get
     try:
         response = getter(image_url, timeout=IMAGE_TIMEOUT)
     except httpx.HTTPError as exc:  # pragma: no cover
@@ -256,6 +560,9 @@ def _maybe_apply_twitter_fallback(domain: str, url: str, metadata: metadata_serv
     normalized = domain.lower()
     if not (normalized.endswith("twitter.com") or normalized.endswith("x.com")):
         return
+    if metadata.twitter_fallback_done:
+        return
+    metadata.twitter_fallback_done = True
     fallback_fn = getattr(url_extractors, "_twitter_oembed_fallback", None)
     if not fallback_fn:
         return
@@ -1,18 +1,36 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
 import logging
 from datetime import datetime
-from typing import Iterable, List, Sequence
+from typing import Collection, Iterable, Iterator, List, Sequence
 from uuid import UUID
 from urllib.parse import urlparse
 
-from sqlalchemy import func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, load_only, raiseload, selectinload
 
 from .. import models, schemas
 from ..core import storage
+from . import (
+    dedup_service,
+    filter_index,
+    image_hash_service,
+    search_service,
+    semantic_service,
+    tags_service,
+    user_cache,
+)
 
 PATH_FIELDS = ("file_path", "thumbnail_path")
+MAX_BATCH_IDS = 250
+MAX_TAG_BATCH_IDS = 5000
+TAG_BATCH_ACTIONS = ("add", "remove", "replace")
+EXPORT_BATCH_SIZE = 500
+SEARCH_FIELDS = frozenset({"title", "description", "text_content"})
+DEDUP_FIELDS = SEARCH_FIELDS | {"source_url"}
 logger = logging.getLogger(__name__)
 
 
@@ -69,33 +87,127 @@ def list_items(
     created_to: datetime | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
+    sort: schemas.ItemSort = schemas.ItemSort.newest,
+    fields: Collection[str] | None = None,
 ) -> Sequence[models.Item]:
+    """Return one page of the user's items, newest first unless relevance-ranked.
+
+    ``fields`` limits which item attributes are loaded; unlisted columns are never
+    read and tags are skipped unless requested, so callers must only serialize
+    the fields they asked for.
+    """
+    normalized_tags = collect_tag_filters(tag_name, tag_names)
+    if not search and filter_index.is_enabled():
+        return _list_items_from_index(
+            db,
+            user,
+            item_type=item_type,
+            status=status,
+            origin_domain=origin_domain,
+            tag_names=normalized_tags,
+            created_from=created_from,
+            created_to=created_to,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            fields=fields,
+        )
+
+    ranked = (
+        bool(search)
+        and sort == schemas.ItemSort.relevance
+        and search_service.get_backend(db).supports_ranking
+    )
+    if cursor and ranked:
+        raise ValueError("Cursor pagination is only supported for newest-first ordering")
+    query = filtered_items_query(
+        db,
+        user,
+        search=search,
+        item_type=item_type,
+        status=status,
+        origin_domain=origin_domain,
+        tag_names=normalized_tags,
+        created_from=created_from,
+        created_to=created_to,
+        rank=ranked,
+    )
+    query = query.options(*_load_options(fields))
+    if cursor:
+        query = _after_cursor(query, cursor)
+    query = query.order_by(models.Item.created_at.desc(), models.Item.id.desc())
+    if not cursor:
+        query = query.offset(offset)
+    return query.limit(limit).all()
+
+
+def iter_items(
+    db: Session,
+    user: models.User,
+    *,
+    search: str | None = None,
+    item_type: models.ItemType | None = None,
+    status: models.ItemStatus | None = None,
+    origin_domain: str | None = None,
+    tag_names: Sequence[str] = (),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[models.Item]:
+    """Stream every matching item newest-first, ``batch_size`` rows at a time.
+
+    Rows come from a server-side cursor (``yield_per``) with tags selectin-loaded
+    per batch, so memory stays flat however large the vault is. ``cursor`` resumes
+    after the item it was encoded from.
+    """
+    query = filtered_items_query(
+        db,
+        user,
+        search=search,
+        item_type=item_type,
+        status=status,
+        origin_domain=origin_domain,
+        tag_names=tag_names,
+        created_from=created_from,
+        created_to=created_to,
+    ).options(selectinload(models.Item.tags))
+    if cursor:
+        query = _after_cursor(query, cursor)
+    statement = query.order_by(models.Item.created_at.desc(), models.Item.id.desc()).statement
+    # 2.0-style execution: legacy Query results are always uniqued, which rules out yield_per.
+    yield from db.scalars(statement.execution_options(yield_per=batch_size))
+
+
+def filtered_items_query(
+    db: Session,
+    user: models.User,
+    *,
+    search: str | None = None,
+    item_type: models.ItemType | None = None,
+    status: models.ItemStatus | None = None,
+    origin_domain: str | None = None,
+    tag_names: Sequence[str] = (),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    rank: bool = False,
+):
+    """Build the user's items query with every list filter applied but no paging.
+
+    ``tag_names`` must already be normalized (see ``collect_tag_filters``);
+    ``rank`` asks the search backend to order by relevance first.
+    """
     query = db.query(models.Item).filter(models.Item.user_id == user.id)
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Item.title.ilike(like),
-                models.Item.description.ilike(like),
-                models.Item.text_content.ilike(like),
-            )
-        )
+        query = search_service.get_backend(db).apply(query, user.id, search, rank=rank)
     if item_type:
         query = query.filter(models.Item.type == item_type)
     if status:
         query = query.filter(models.Item.status == status)
     if origin_domain:
         query = query.filter(models.Item.origin_domain == origin_domain.strip().lower())
-    tag_filters: List[str] = []
-    if tag_name:
-        tag_filters.append(tag_name)
     if tag_names:
-        if isinstance(tag_names, str):
-            tag_filters.append(tag_names)
-        else:
-            tag_filters.extend(tag_names)
-    normalized_tags = _normalize_tag_filters(tag_filters)
-    if normalized_tags:
         # Require every requested tag by grouping on item and enforcing the count of
         # distinct tag names. This keeps multi-tag queries deterministic for the UI.
         matched_items = (
@@ -103,27 +215,80 @@ def list_items(
             .join(models.Item.tags)
             .filter(
                 models.Item.user_id == user.id,
-                func.lower(models.Tag.name).in_(normalized_tags),
+                models.Tag.name_normalized.in_(tag_names),
             )
             .group_by(models.Item.id)
-            .having(
-                func.count(func.distinct(func.lower(models.Tag.name)))
-                >= len(normalized_tags)
-            )
+            .having(func.count(models.Tag.id) >= len(tag_names))
         )
         query = query.filter(models.Item.id.in_(matched_items))
     if created_from:
         query = query.filter(models.Item.created_at >= created_from)
     if created_to:
         query = query.filter(models.Item.created_at <= created_to)
-    return (
-        query.order_by(models.Item.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    return query
+
+
+def _list_items_from_index(
+    db: Session,
+    user: models.User,
+    *,
+    tag_names: List[str],
+    limit: int,
+    offset: int,
+    cursor: str | None,
+    fields: Collection[str] | None,
+    **filters,
+) -> List[models.Item]:
+    index = filter_index.get_index(db, user.id, version=user.data_version)
+    selected = index.mask(tag_names=tag_names, **filters)
+    start = 0
+    if cursor:
+        start = index.start_after(*decode_cursor(cursor))
+        offset = 0
+    page_ids = index.page(selected, start=start, offset=offset, limit=limit)
+    if not page_ids:
+        return []
+    query = db.query(models.Item).filter(
+        models.Item.user_id == user.id,
+        models.Item.id.in_(page_ids),
+    )
+    query = query.options(*_load_options(fields))
+    by_id = {item.id: item for item in query.all()}
+    # Rows deleted since the index was built simply drop out of the page.
+    return [by_id[item_id] for item_id in page_ids if item_id in by_id]
+
+
+def _after_cursor(query, cursor: str):
+    # Keyset pagination: seek past the last (created_at, id) pair instead of
+    # counting skipped rows, so deep pages cost the same as the first one.
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    return query.filter(
+        or_(
+            models.Item.created_at < cursor_created_at,
+            and_(
+                models.Item.created_at == cursor_created_at,
+                models.Item.id < cursor_id,
+            ),
+        )
     )
 
 
+def encode_cursor(item: models.Item) -> str:
+    """Return an opaque pagination cursor pointing just after ``item``."""
+    raw = json.dumps([item.created_at.isoformat(), str(item.id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by :func:`encode_cursor`; raise ValueError if malformed."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_raw, id_raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_raw), UUID(id_raw)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 def get_item(
     db: Session,
     user: models.User,
@@ -131,17 +296,39 @@ def get_item(
 ) -> models.Item | None:
     return (
         db.query(models.Item)
+        .options(selectinload(models.Item.tags))
         .filter(models.Item.user_id == user.id, models.Item.id == item_id)
         .first()
     )
 
 
+def get_items(
+    db: Session,
+    user: models.User,
+    item_ids: Sequence[UUID],
+) -> dict[UUID, models.Item]:
+    """Load up to ``MAX_BATCH_IDS`` of the user's items in one query (tags in one more)."""
+    unique_ids = list(dict.fromkeys(item_ids))
+    if len(unique_ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids can be fetched at once")
+    if not unique_ids:
+        return {}
+    items = (
+        db.query(models.Item)
+        .options(selectinload(models.Item.tags))
+        .filter(models.Item.user_id == user.id, models.Item.id.in_(unique_ids))
+        .all()
+    )
+    return {item.id: item for item in items}
+
+
 def create_item(
     db: Session,
     user: models.User,
     payload: schemas.ItemCreate,
     *,
     created_at: datetime | None = None,
+    commit: bool = True,
 ) -> models.Item:
     data = payload.model_dump(exclude_none=True)
     _apply_common_normalization(data)
@@ -150,8 +337,16 @@ def create_item(
         item.created_at = created_at
         item.updated_at = created_at
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    db.flush()
+    search_service.index_items(db, [item.id])
+    semantic_service.index_items(db, [item.id])
+    dedup_service.index_items(db, [item.id])
+    if item.file_path:
+        image_hash_service.index_items(db, [item.id])
+    user_cache.record_change(db, user.id, [item.id])
+    if commit:
+        db.commit()
+        db.refresh(item)
     return item
 
 
@@ -164,14 +359,31 @@ def update_item(
     _apply_common_normalization(updates)
     for key, value in updates.items():
         setattr(item, key, value)
+    if SEARCH_FIELDS.intersection(updates):
+        db.flush()
+        search_service.index_items(db, [item.id])
+        semantic_service.index_items(db, [item.id])
+    if DEDUP_FIELDS.intersection(updates):
+        db.flush()
+        dedup_service.index_items(db, [item.id])
+    if "file_path" in updates:
+        db.flush()
+        image_hash_service.index_items(db, [item.id])
+    user_cache.record_change(db, item.user_id, [item.id])
     db.commit()
     db.refresh(item)
     return item
 
 
 def delete_item(db: Session, item: models.Item) -> None:
-    paths = _collect_paths(item)
+    paths = _unshared_paths(db, item)
+    search_service.remove_items(db, [item.id])
+    semantic_service.remove_items(db, item.user_id, [item.id])
+    dedup_service.remove_items(db, [item.id])
+    # The ORM delete removes the item_tags rows of item.tags.
+    tags_service.adjust_item_counts(db, {tag.id: -1 for tag in item.tags})
     db.delete(item)
+    user_cache.record_change(db, item.user_id, [item.id])
     db.commit()
     for path in paths:
         storage.safe_remove_path(path)
@@ -195,37 +407,100 @@ def set_item_tags(
     user: models.User,
     item: models.Item,
     tag_names: Iterable[str],
+    *,
+    commit: bool = True,
 ) -> models.Item:
-    unique_names: dict[str, str] = {}
-    for name in tag_names:
-        if not name:
-            continue
-        cleaned = name.strip()
-        if not cleaned:
-            continue
-        key = cleaned.lower()
-        unique_names.setdefault(key, cleaned)
+    tags = tags_service.ensure_tags(db, user, tag_names)
+    before = {tag.id for tag in item.tags}
+    after = {tag.id for tag in tags}
+    item.tags = tags
+    deltas = {tag_id: -1 for tag_id in before - after}
+    deltas.update((tag_id, 1) for tag_id in after - before)
+    tags_service.adjust_item_counts(db, deltas)
+    user_cache.record_change(db, user.id, [item.id])
+    if commit:
+        db.commit()
+        db.refresh(item)
+    else:
+        db.flush()
+    return item
 
-    tags: List[models.Tag] = []
-    for key, display_name in unique_names.items():
-        tag = (
-            db.query(models.Tag)
-            .filter(
-                models.Tag.user_id == user.id,
-                func.lower(models.Tag.name) == key,
-            )
-            .first()
-        )
-        if not tag:
-            tag = models.Tag(user_id=user.id, name=display_name)
-            db.add(tag)
-            db.flush()
-        tags.append(tag)
 
-    item.tags = tags
+def batch_update_tags(
+    db: Session,
+    user: models.User,
+    *,
+    action: str,
+    tag_names: Iterable[str],
+    item_ids: Sequence[UUID] | None = None,
+    filters: dict | None = None,
+) -> tuple[int, int, int]:
+    """Add, remove or replace tags on many items with set-based SQL in one transaction.
+
+    Targets are either explicit ``item_ids`` (unknown or foreign ids are ignored)
+    or every item matching ``filters`` (keyword arguments of
+    ``filtered_items_query``). Returns ``(matched, added, removed)`` counts.
+    """
+    if action not in TAG_BATCH_ACTIONS:
+        raise ValueError(f"Unknown tag batch action: {action}")
+    if item_ids is not None:
+        unique_ids = list(dict.fromkeys(item_ids))
+        if len(unique_ids) > MAX_TAG_BATCH_IDS:
+            raise ValueError(f"At most {MAX_TAG_BATCH_IDS} item ids can be tagged per request")
+        targets = select(models.Item.id).where(
+            models.Item.user_id == user.id,
+            models.Item.id.in_(unique_ids),
+        )
+    else:
+        targets = filtered_items_query(db, user, **(filters or {})).with_entities(models.Item.id).statement
+
+    matched = db.scalar(select(func.count()).select_from(targets.subquery())) or 0
+    if action == "remove":
+        tag_ids = [tag.id for tag in tags_service.find_tags(db, user, tag_names)]
+        added = 0
+        removed = tags_service.unlink_items(db, targets, tag_ids)
+    else:
+        tag_ids = [tag.id for tag in tags_service.ensure_tags(db, user, tag_names)]
+        removed = tags_service.unlink_items(db, targets, tag_ids, keep=True) if action == "replace" else 0
+        added = tags_service.link_items(db, targets, tag_ids)
+
+    user_cache.record_change(db, user.id, unique_ids if item_ids is not None else None)
+    # Loaded items' tag collections no longer match item_tags.
+    db.expire_all()
     db.commit()
-    db.refresh(item)
-    return item
+    return matched, added, removed
+
+
+def _load_options(fields: Collection[str] | None) -> list:
+    """Loader options for list pages: every column plus tags, or just the projection."""
+    if fields is None:
+        return [selectinload(models.Item.tags)]
+    return _projection_options(fields)
+
+
+def _projection_options(fields: Collection[str]) -> list:
+    # id and created_at are always needed for identity and cursor encoding.
+    column_names = {"id", "created_at"}
+    column_names.update(name for name in fields if name in models.Item.__table__.columns)
+    options: list = [load_only(*(getattr(models.Item, name) for name in sorted(column_names)))]
+    # Unrequested tags are never serialized; raise rather than lazy-load if they are.
+    options.append(selectinload(models.Item.tags) if "tags" in fields else raiseload(models.Item.tags))
+    return options
+
+
+def collect_tag_filters(
+    tag_name: str | None,
+    tag_names: Iterable[str] | None,
+) -> List[str]:
+    tag_filters: List[str] = []
+    if tag_name:
+        tag_filters.append(tag_name)
+    if tag_names:
+        if isinstance(tag_names, str):
+            tag_filters.append(tag_names)
+        else:
+            tag_filters.extend(tag_names)
+    return _normalize_tag_filters(tag_filters)
 
 
 def _normalize_tag_filters(values: Iterable[str]) -> List[str]:
@@ -234,7 +509,7 @@ def _normalize_tag_filters(values: Iterable[str]) -> List[str]:
     for value in values:
         if not value:
             continue
-        cleaned = value.strip().lower()
+        cleaned = models.normalize_tag_name(value)
         if not cleaned or cleaned in seen:
             continue
         seen.add(cleaned)
@@ -242,6 +517,21 @@ def _normalize_tag_filters(values: Iterable[str]) -> List[str]:
     return normalized
 
 
+def _unshared_paths(db: Session, item: models.Item) -> List[str]:
+    """Stored files of ``item`` that no other item points at (images can be shared)."""
+    paths = _collect_paths(item)
+    if not paths:
+        return paths
+    shared = db.execute(
+        select(models.Item.file_path, models.Item.thumbnail_path).where(
+            models.Item.id != item.id,
+            or_(models.Item.file_path.in_(paths), models.Item.thumbnail_path.in_(paths)),
+        )
+    ).all()
+    in_use = {path for row in shared for path in row if path}
+    return [path for path in paths if path not in in_use]
+
+
 def _collect_paths(item: models.Item) -> List[str]:
     paths: List[str] = []
     for field in PATH_FIELDS:
@@ -0,0 +1,46 @@
+"""Handlers for the job kinds run by ``python -m app.worker``.
+
+Each handler gets its own session and the claimed job; raising marks the
+attempt failed (``ValueError``/``LookupError`` permanently, anything else with
+a retry). Import this module to register them.
+"""
+
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import ingestion_service, job_queue
+
+
+def _load_item(db: Session, job: models.Job) -> tuple[models.User, models.Item]:
+    item = db.get(models.Item, UUID(job.payload["item_id"]))
+    if item is None or item.user_id != job.user_id:
+        raise LookupError("Item not found")
+    user = db.get(models.User, item.user_id)
+    if user is None:
+        raise LookupError("User not found")
+    return user, item
+
+
+@job_queue.handler(ingestion_service.INGEST_JOB)
+def ingest_url(db: Session, job: models.Job) -> None:
+    """Fill in a placeholder saved by ``POST /api/items/url?async=true``."""
+    user, item = _load_item(db, job)
+    final_attempt = job.attempts >= job.max_attempts
+    ingestion_service.complete_pending_item(db, user, item, reraise=not final_attempt)
+
+
+@job_queue.handler(ingestion_service.REFRESH_JOB)
+def refresh_item(db: Session, job: models.Job) -> None:
+    """Re-fetch an item's metadata and media; queued by ``ingestion_service.queue_refresh``."""
+    user, item = _load_item(db, job)
+    ingestion_service.refresh_url_item(
+        db,
+        user,
+        item,
+        force_download=bool(job.payload.get("force_download")),
+        update_text=bool(job.payload.get("update_text")),
+    )
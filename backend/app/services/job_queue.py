@@ -0,0 +1,281 @@
+"""Durable background jobs stored in the ``jobs`` table.
+
+Producers call ``enqueue`` inside their own transaction, so a job exists exactly
+when the write that needs it commits. Any number of ``python -m app.worker``
+processes, on any number of hosts, then share the table:
+
+* **Claiming** locks up to ``CLAIM_BATCH`` runnable rows with
+  ``SELECT ... FOR UPDATE SKIP LOCKED`` (highest ``priority`` first, then oldest
+  ``run_at``), so concurrent workers never wait on or double-claim a row.
+* **Fairness**: users already at ``JOB_MAX_RUNNING_PER_USER`` running jobs
+  are filtered out in the claim query itself; among the locked candidates of
+  the best priority, the job whose user has the fewest running jobs wins.
+* **Visibility timeout**: a claim holds the job for
+  ``JOB_VISIBILITY_TIMEOUT_SECS``; if the worker dies, the job becomes claimable
+  again once ``locked_until`` passes.
+* **Retries**: a failed attempt is re-queued with exponential backoff
+  (``JOB_BACKOFF_BASE_SECS`` doubling per attempt, capped at
+  ``JOB_BACKOFF_MAX_SECS``, with jitter). ``ValueError``/``LookupError`` are
+  permanent. Jobs out of attempts are dead-lettered (status ``dead``) and
+  can be re-queued with ``retry_dead``.
+
+Handlers are registered per ``kind`` with the ``handler`` decorator (see
+``job_handlers``) and get their own session. SQLite has no ``SKIP LOCKED``;
+there the conditional claim ``UPDATE`` alone keeps two workers from taking
+the same job.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import get_settings
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+CLAIM_BATCH = 32
+MAX_ERROR_CHARS = 4000
+PERMANENT_ERRORS = (ValueError, LookupError)
+
+Handler = Callable[[Session, models.Job], None]
+_handlers: dict[str, Handler] = {}
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register ``func(db, job)`` as the handler for jobs of ``kind``."""
+
+    def register(func: Handler) -> Handler:
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+def registered_kinds() -> list[str]:
+    return sorted(_handlers)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    user_id: UUID | None = None,
+    priority: int = 0,
+    run_at: datetime | None = None,
+    max_attempts: int | None = None,
+) -> models.Job:
+    """Add a job inside the caller's transaction; it becomes visible on commit."""
+    job = models.Job(
+        kind=kind,
+        payload=payload or {},
+        user_id=user_id,
+        priority=priority,
+        status=models.JobStatus.queued,
+        attempts=0,
+        max_attempts=max_attempts or get_settings().JOB_MAX_ATTEMPTS,
+        run_at=run_at or models.utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def claim(
+    db: Session,
+    worker_id: str,
+    *,
+    kinds: Iterable[str] | None = None,
+    now: datetime | None = None,
+) -> models.Job | None:
+    """Lock the next job for ``worker_id`` and mark it running; ``None`` when nothing is runnable."""
+    settings = get_settings()
+    now = now or models.utcnow()
+    Job = models.Job
+    runnable = or_(
+        and_(Job.status == models.JobStatus.queued, Job.run_at <= now),
+        and_(Job.status == models.JobStatus.running, Job.locked_until < now),
+    )
+    # Users already at the cap are excluded before the LIMIT, so one user's
+    # backlog cannot fill the whole candidate batch and starve everyone else.
+    capped_users = (
+        select(Job.user_id)
+        .where(
+            Job.user_id.is_not(None),
+            Job.status == models.JobStatus.running,
+            Job.locked_until >= now,
+        )
+        .group_by(Job.user_id)
+        .having(func.count() >= settings.JOB_MAX_RUNNING_PER_USER)
+    )
+    query = select(Job).where(runnable, or_(Job.user_id.is_(None), Job.user_id.not_in(capped_users)))
+    if kinds is not None:
+        query = query.where(Job.kind.in_(list(kinds)))
+    candidates = db.scalars(
+        query.order_by(Job.priority.desc(), Job.run_at, Job.created_at)
+        .limit(CLAIM_BATCH)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not candidates:
+        db.rollback()
+        return None
+
+    user_ids = {job.user_id for job in candidates if job.user_id is not None}
+    running: dict[UUID, int] = {}
+    if user_ids:
+        running = dict(
+            db.execute(
+                select(Job.user_id, func.count())
+                .where(
+                    Job.user_id.in_(user_ids),
+                    Job.status == models.JobStatus.running,
+                    Job.locked_until >= now,
+                )
+                .group_by(Job.user_id)
+            ).all()
+        )
+    eligible = [
+        (position, job)
+        for position, job in enumerate(candidates)
+        if job.user_id is None or running.get(job.user_id, 0) < settings.JOB_MAX_RUNNING_PER_USER
+    ]
+    if not eligible:
+        db.rollback()
+        return None
+    _, chosen = min(
+        eligible,
+        key=lambda entry: (-entry[1].priority, running.get(entry[1].user_id, 0), entry[0]),
+    )
+
+    claimed = db.execute(
+        update(Job)
+        .where(Job.id == chosen.id, runnable)
+        .values(
+            status=models.JobStatus.running,
+            attempts=Job.attempts + 1,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECS),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed != 1:
+        # Taken by another worker between the SELECT and the UPDATE (SQLite only).
+        db.rollback()
+        return None
+    db.commit()
+    db.refresh(chosen)
+    return chosen
+
+
+def complete(db: Session, job: models.Job, worker_id: str) -> bool:
+    """Mark ``job`` done; False if its claim expired and another worker took it over."""
+    return _finish(db, job, worker_id, status=models.JobStatus.done, finished_at=models.utcnow())
+
+
+def fail(
+    db: Session,
+    job: models.Job,
+    worker_id: str,
+    error: str,
+    *,
+    permanent: bool = False,
+    now: datetime | None = None,
+) -> bool:
+    """Record a failed attempt: retry later with backoff, or dead-letter the job."""
+    now = now or models.utcnow()
+    error = error[:MAX_ERROR_CHARS]
+    if permanent or job.attempts >= job.max_attempts:
+        logger.warning("job_dead id=%s kind=%s attempts=%s error=%s", job.id, job.kind, job.attempts, error)
+        return _finish(db, job, worker_id, status=models.JobStatus.dead, finished_at=now, last_error=error)
+    delay = backoff_delay(job.attempts)
+    logger.info("job_retry id=%s kind=%s attempts=%s delay=%.1fs", job.id, job.kind, job.attempts, delay)
+    return _finish(
+        db,
+        job,
+        worker_id,
+        status=models.JobStatus.queued,
+        run_at=now + timedelta(seconds=delay),
+        last_error=error,
+    )
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds before retry number ``attempts``: doubling from the base, capped, with jitter."""
+    settings = get_settings()
+    ceiling = min(settings.JOB_BACKOFF_MAX_SECS, settings.JOB_BACKOFF_BASE_SECS * 2 ** max(attempts - 1, 0))
+    # Equal jitter: at least half the delay, so retries of a burst spread out.
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def retry_dead(db: Session, *, kinds: Iterable[str] | None = None) -> int:
+    """Re-queue dead-lettered jobs with fresh attempts; returns how many."""
+    statement = (
+        update(models.Job)
+        .where(models.Job.status == models.JobStatus.dead)
+        .values(
+            status=models.JobStatus.queued,
+            attempts=0,
+            run_at=models.utcnow(),
+            finished_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if kinds is not None:
+        statement = statement.where(models.Job.kind.in_(list(kinds)))
+    count = db.execute(statement).rowcount or 0
+    db.commit()
+    return count
+
+
+def run_one(
+    worker_id: str,
+    *,
+    kinds: Iterable[str] | None = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> bool:
+    """Claim and run a single job; returns False when there was nothing to do."""
+    with session_factory() as db:
+        job = claim(db, worker_id, kinds=kinds)
+        if job is None:
+            return False
+        func = _handlers.get(job.kind)
+        if func is None:
+            fail(db, job, worker_id, f"No handler registered for job kind {job.kind!r}", permanent=True)
+            return True
+        try:
+            with session_factory() as work_db:
+                func(work_db, job)
+        except Exception as exc:  # noqa: BLE001 - every failure is recorded on the job
+            logger.exception("job_failed id=%s kind=%s", job.id, job.kind)
+            message = str(exc) or exc.__class__.__name__
+            fail(db, job, worker_id, message, permanent=isinstance(exc, PERMANENT_ERRORS))
+        else:
+            if not complete(db, job, worker_id):
+                logger.warning("job_claim_lost id=%s kind=%s worker=%s", job.id, job.kind, worker_id)
+    return True
+
+
+def _finish(db: Session, job: models.Job, worker_id: str, **values: Any) -> bool:
+    # Only the worker holding the claim may settle the job.
+    updated = db.execute(
+        update(models.Job)
+        .where(
+            models.Job.id == job.id,
+            models.Job.status == models.JobStatus.running,
+            models.Job.locked_by == worker_id,
+        )
+        .values(locked_by=None, locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if updated:
+        db.refresh(job)
+    return updated == 1
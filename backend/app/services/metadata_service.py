@@ -9,6 +9,7 @@ from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
 from .. import models
+from ..core import http
 
 DEFAULT_HEADERS = {
     "User-Agent": (
@@ -41,6 +42,8 @@ class MetadataResult:
     error: str | None = None
     raw_html: str | None = None
     extra: dict[str, str | None] = field(default_factory=dict)
+    # Set once the X/Twitter oEmbed fallback has run, so one ingest never repeats it.
+    twitter_fallback_done: bool = False
 
 
 def fetch_html(
@@ -50,7 +53,7 @@ def fetch_html(
     headers: dict[str, str] | None = None,
     http_get: HttpGetter | None = None,
 ) -> HtmlFetchResult:
-    getter = http_get or httpx.get
+    getter = http_get or http.get
     merged_headers = {**DEFAULT_HEADERS, **(headers or {})}
     domain = urlparse(url).netloc.lower()
     is_pinterest = "pinterest.com" in domain
@@ -0,0 +1,219 @@
+"""Keyword search backends behind ``items_service.list_items``.
+
+Each backend knows how to filter (and optionally rank) an items query and how to
+keep its index current. ``get_backend`` picks one from ``SEARCH_BACKEND`` or,
+by default, from the database dialect:
+
+* ``postgres`` – weighted ``items.search_vector`` + GIN index via ``websearch_to_tsquery``.
+* ``sqlite_fts`` – the ``items_fts`` FTS5 table, updated incrementally (by rowid) on writes.
+* ``like`` – unindexed ``ILIKE`` fallback for anything else.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, false, func, insert, literal_column, or_, select, update
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from .. import models
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TEXT_SEARCH_CONFIG = "english"
+# bm25 column weights for items_fts: item_id, user_id, title, description, text_content
+# (rowid is not a column).
+FTS_COLUMN_WEIGHTS = (0.0, 0.0, 10.0, 4.0, 1.0)
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchBackend:
+    """Base interface; also the unindexed ILIKE implementation."""
+
+    name = "like"
+    supports_ranking = False
+
+    def apply(
+        self,
+        query: Query,
+        user_id: UUID,
+        search: str,
+        *,
+        rank: bool = False,
+    ) -> Query:
+        """Restrict ``query`` to matches, ordering by relevance first when ``rank`` is set."""
+        like = f"%{search}%"
+        return query.filter(
+            or_(
+                models.Item.title.ilike(like),
+                models.Item.description.ilike(like),
+                models.Item.text_content.ilike(like),
+            )
+        )
+
+    def index_items(self, db: Session, item_ids: Iterable[UUID]) -> int:
+        """Refresh index entries for ``item_ids`` inside the caller's transaction."""
+        return 0
+
+    def remove_items(self, db: Session, item_ids: Iterable[UUID]) -> None:
+        """Drop index entries for deleted items inside the caller's transaction."""
+        return None
+
+    def unindexed_condition(self) -> ColumnElement | None:
+        """WHERE clause selecting items missing from the index, or None if not indexed."""
+        return None
+
+
+class PostgresSearchBackend(SearchBackend):
+    name = "postgres"
+    supports_ranking = True
+
+    def apply(self, query, user_id, search, *, rank=False):
+        tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, search)
+        query = query.filter(models.Item.search_vector.op("@@")(tsquery))
+        if rank:
+            query = query.order_by(func.ts_rank_cd(models.Item.search_vector, tsquery).desc())
+        return query
+
+    def index_items(self, db, item_ids):
+        ids = list(item_ids)
+        if not ids:
+            return 0
+        result = db.execute(
+            update(models.Item)
+            .where(models.Item.id.in_(ids))
+            .values(search_vector=search_vector_expression())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    def unindexed_condition(self):
+        return models.Item.search_vector.is_(None)
+
+
+class SqliteFtsSearchBackend(SearchBackend):
+    name = "sqlite_fts"
+    supports_ranking = True
+
+    def apply(self, query, user_id, search, *, rank=False):
+        match = build_fts_query(search)
+        if not match:
+            # Punctuation-only input has no FTS tokens; keep substring semantics.
+            return super().apply(query, user_id, search, rank=rank)
+        fts = models.items_fts
+        matches = (
+            select(
+                fts.c.item_id.label("item_id"),
+                func.bm25(literal_column(fts.name), *FTS_COLUMN_WEIGHTS).label("score"),
+            )
+            .where(literal_column(fts.name).op("MATCH")(match), fts.c.user_id == user_id)
+            .subquery("fts_matches")
+        )
+        query = query.join(matches, matches.c.item_id == models.Item.id)
+        if rank:
+            # bm25() is lower-is-better.
+            query = query.order_by(matches.c.score.asc())
+        return query
+
+    def index_items(self, db, item_ids):
+        ids = list(item_ids)
+        if not ids:
+            return 0
+        self.remove_items(db, ids)
+        rows = db.execute(
+            select(
+                models.Item.id,
+                models.Item.user_id,
+                models.Item.title,
+                models.Item.description,
+                models.Item.text_content,
+            ).where(models.Item.id.in_(ids))
+        ).all()
+        if not rows:
+            return 0
+        db.execute(
+            insert(models.items_fts),
+            [
+                {
+                    "rowid": models.items_fts_rowid(row.id),
+                    "item_id": row.id,
+                    "user_id": row.user_id,
+                    "title": row.title or "",
+                    "description": row.description or "",
+                    "text_content": row.text_content or "",
+                }
+                for row in rows
+            ],
+        )
+        return len(rows)
+
+    def remove_items(self, db, item_ids):
+        # rowid lookups; item_id is UNINDEXED, so filtering on it would scan the whole table.
+        rowids = [models.items_fts_rowid(item_id) for item_id in item_ids]
+        if rowids:
+            db.execute(delete(models.items_fts).where(models.items_fts.c.rowid.in_(rowids)))
+
+    def unindexed_condition(self):
+        return models.Item.id.not_in(select(models.items_fts.c.item_id))
+
+
+_BACKENDS: dict[str, SearchBackend] = {
+    backend.name: backend
+    for backend in (SearchBackend(), PostgresSearchBackend(), SqliteFtsSearchBackend())
+}
+_DIALECT_DEFAULTS = {"postgresql": "postgres", "sqlite": "sqlite_fts"}
+
+
+def get_backend(db: Session) -> SearchBackend:
+    """Return the configured backend, resolving ``auto`` from the session's dialect."""
+    configured = (get_settings().SEARCH_BACKEND or "auto").strip().lower()
+    if configured == "auto":
+        configured = _DIALECT_DEFAULTS.get(db.get_bind().dialect.name, "like")
+    backend = _BACKENDS.get(configured)
+    if backend is None:
+        logger.warning("Unknown SEARCH_BACKEND %r; falling back to ILIKE search", configured)
+        return _BACKENDS["like"]
+    return backend
+
+
+def build_fts_query(search: str) -> str:
+    """Translate free text into an FTS5 expression of quoted prefix terms (implicit AND)."""
+    tokens = _FTS_TOKEN_RE.findall(search.lower())
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_vector_expression() -> ColumnElement:
+    """Weighted tsvector over the item text columns (title > description > text_content)."""
+
+    def _weighted(column, weight: str) -> ColumnElement:
+        return func.setweight(
+            func.to_tsvector(TEXT_SEARCH_CONFIG, func.coalesce(column, "")),
+            weight,
+        )
+
+    return (
+        _weighted(models.Item.title, "A")
+        .op("||")(_weighted(models.Item.description, "B"))
+        .op("||")(_weighted(models.Item.text_content, "C"))
+    )
+
+
+def index_items(db: Session, item_ids: Iterable[UUID]) -> int:
+    """Refresh the active backend's index for ``item_ids`` (caller commits)."""
+    return get_backend(db).index_items(db, item_ids)
+
+
+def remove_items(db: Session, item_ids: Iterable[UUID]) -> None:
+    """Remove ``item_ids`` from the active backend's index (caller commits)."""
+    get_backend(db).remove_items(db, item_ids)
+
+
+def unindexed_condition(db: Session) -> ColumnElement:
+    """Condition matching items the active backend has not indexed yet."""
+    condition = get_backend(db).unindexed_condition()
+    return condition if condition is not None else false()
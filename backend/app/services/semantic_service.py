@@ -0,0 +1,260 @@
+"""Local semantic search and "more like this" over item text.
+
+Items are embedded by a pluggable ``EmbeddingProvider`` (``EMBEDDING_PROVIDER``;
+the default ``hashing`` provider is a signed hashing vectorizer over word
+unigrams and bigrams, so nothing leaves the machine and no model has to be
+fitted) and kept in a per-user ``VectorStore`` under ``INDEX_ROOT``.
+
+Write paths call ``index_items``/``remove_items`` inside their transaction;
+vectors are computed there but only written to the store after the session
+commits. A user's store is built from the database on first use, so existing
+vaults need no migration step.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import zlib
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, selectinload
+
+from .. import models
+from ..core.config import get_settings
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_CHARS = 20_000
+BUILD_BATCH_SIZE = 500
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_PENDING_KEY = "semantic_service.pending"
+
+
+class EmbeddingProvider:
+    """Turns texts into L2-normalized float32 vectors of size ``dim``."""
+
+    name = "base"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    name = "hashing"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for position, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in features),
+                dtype=np.uint32,
+                count=len(features),
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[position], hashes % self.dim, signs)
+        # Sublinear term frequency keeps long texts from drowning out titles.
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+PROVIDERS: dict[str, type[EmbeddingProvider]] = {HashingEmbeddingProvider.name: HashingEmbeddingProvider}
+
+_stores: dict[Path, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return get_settings().SEMANTIC_SEARCH_ENABLED
+
+
+def get_provider() -> EmbeddingProvider:
+    settings = get_settings()
+    provider_cls = PROVIDERS.get(settings.EMBEDDING_PROVIDER.strip().lower())
+    if provider_cls is None:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER {settings.EMBEDDING_PROVIDER!r}")
+    return provider_cls(settings.EMBEDDING_DIM)
+
+
+def index_root() -> Path:
+    settings = get_settings()
+    if settings.INDEX_ROOT:
+        return Path(settings.INDEX_ROOT).expanduser()
+    # A sibling of STORAGE_ROOT, never inside it: everything there is served at /assets.
+    storage_root = Path(settings.STORAGE_ROOT).expanduser()
+    return storage_root.with_name(f"{storage_root.name}.index")
+
+
+def get_store(user_id: UUID) -> VectorStore:
+    provider = get_provider()
+    directory = index_root() / "semantic" / str(user_id)
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None or store.dim != provider.dim or store.provider != provider.name:
+            store = VectorStore(directory, dim=provider.dim, provider=provider.name)
+            _stores[directory] = store
+    return store
+
+
+def reset() -> None:
+    with _stores_lock:
+        _stores.clear()
+
+
+def item_text(title: str | None, description: str | None, text_content: str | None) -> str:
+    # The title is repeated so it outweighs long extracted text.
+    parts = [title or "", title or "", description or "", (text_content or "")[:MAX_TEXT_CHARS]]
+    return "\n".join(part for part in parts if part)
+
+
+def index_items(db: Session, item_ids: Iterable[UUID]) -> None:
+    """Embed ``item_ids`` now and write the vectors once the session commits."""
+    ids = list(item_ids)
+    if not ids or not is_enabled():
+        return
+    rows = db.execute(
+        select(
+            models.Item.id,
+            models.Item.user_id,
+            models.Item.title,
+            models.Item.description,
+            models.Item.text_content,
+        ).where(models.Item.id.in_(ids))
+    ).all()
+    if not rows:
+        return
+    vectors = get_provider().embed([item_text(row.title, row.description, row.text_content) for row in rows])
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    for row, vector in zip(rows, vectors):
+        pending.append(("upsert", row.user_id, row.id, vector))
+
+
+def remove_items(db: Session, user_id: UUID, item_ids: Iterable[UUID]) -> None:
+    """Drop ``item_ids`` from the user's store once the session commits."""
+    if not is_enabled():
+        return
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    pending.extend(("remove", user_id, item_id, None) for item_id in item_ids)
+
+
+def build_store(db: Session, user_id: UUID) -> VectorStore:
+    """(Re)build the user's store from every item in the database."""
+    provider = get_provider()
+    store = get_store(user_id)
+    with store.writing():
+        store.clear()
+        statement = (
+            select(models.Item.id, models.Item.title, models.Item.description, models.Item.text_content)
+            .where(models.Item.user_id == user_id)
+            .execution_options(yield_per=BUILD_BATCH_SIZE)
+        )
+        for batch in db.execute(statement).partitions():
+            vectors = provider.embed([item_text(row.title, row.description, row.text_content) for row in batch])
+            store.upsert([row.id for row in batch], vectors)
+        store.flush()
+    logger.info("semantic_index_built user_id=%s items=%s", user_id, len(store))
+    return store
+
+
+def ensure_store(db: Session, user_id: UUID) -> VectorStore:
+    store = get_store(user_id)
+    if not store.exists:
+        store = build_store(db, user_id)
+    return store
+
+
+def search(
+    db: Session,
+    user: models.User,
+    query: str,
+    *,
+    limit: int = 20,
+) -> list[tuple[models.Item, float]]:
+    """Items whose text is closest to ``query``, best first."""
+    vector = get_provider().embed([query])[0]
+    if not vector.any():
+        return []
+    store = ensure_store(db, user.id)
+    return _hydrate(db, user, store.search(vector, limit))
+
+
+def similar_items(
+    db: Session,
+    user: models.User,
+    item: models.Item,
+    *,
+    limit: int = 10,
+) -> list[tuple[models.Item, float]]:
+    """Items closest to ``item`` (excluding itself), best first."""
+    store = ensure_store(db, user.id)
+    vector = store.vector(item.id)
+    if vector is None:
+        vector = get_provider().embed([item_text(item.title, item.description, item.text_content)])[0]
+    if not vector.any():
+        return []
+    return _hydrate(db, user, store.search(vector, limit, exclude=[item.id]))
+
+
+def _hydrate(
+    db: Session,
+    user: models.User,
+    hits: list[tuple[UUID, float]],
+) -> list[tuple[models.Item, float]]:
+    hits = [(item_id, score) for item_id, score in hits if score > 0]
+    if not hits:
+        return []
+    items = (
+        db.query(models.Item)
+        .options(selectinload(models.Item.tags))
+        .filter(models.Item.user_id == user.id, models.Item.id.in_([item_id for item_id, _ in hits]))
+        .all()
+    )
+    by_id = {item.id: item for item in items}
+    return [(by_id[item_id], score) for item_id, score in hits if item_id in by_id]
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_vectors(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    by_user: dict[UUID, list[tuple[str, UUID, np.ndarray | None]]] = {}
+    for action, user_id, item_id, vector in pending:
+        by_user.setdefault(user_id, []).append((action, item_id, vector))
+    for user_id, operations in by_user.items():
+        try:
+            store = get_store(user_id)
+            if not store.exists:
+                # Built lazily from the database on first search, which already
+                # includes this write.
+                continue
+            with store.writing():
+                for action, group in groupby(operations, key=lambda operation: operation[0]):
+                    group = list(group)
+                    if action == "upsert":
+                        store.upsert([item_id for _, item_id, _ in group], np.stack([vector for _, _, vector in group]))
+                    else:
+                        store.remove([item_id for _, item_id, _ in group])
+        except Exception:  # pragma: no cover - the index is derived data
+            logger.exception("semantic_index_update_failed user_id=%s", user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_vectors(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,328 @@
+"""Typeahead completions for tags, origin domains and item titles.
+
+Tags and domains are answered from a per-user ``PrefixIndex``: keys sorted once
+so a prefix is a ``bisect`` range, with the matches in that range ranked by
+item count. Indexes are built lazily and remember the ``data_version`` they
+reflect. Item writes of this process (``user_cache.on_items_changed``) are
+patched in on the next read: the changed items' domains are re-read and moved
+between the cached per-domain counts, and the user's tags (a far smaller table
+than items) are re-read for their counts. Changes without item ids (tag
+renames/merges, filter-wide tagging), more than ``MAX_DELTA_ITEMS`` pending ids,
+a newer version on the request (a write from another worker) or an index older
+than ``CACHE_TTL_SECONDS`` mean a full rebuild.
+
+Titles come straight from the database: an ``ILIKE '%prefix%'`` that Postgres
+serves from the ``ix_items_title_trgm`` pg_trgm index (ranked by trigram
+similarity), and an unindexed ``LIKE`` elsewhere.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import user_cache
+
+CACHE_TTL_SECONDS = 60.0
+MAX_DELTA_ITEMS = 500
+# Shorter prefixes have no trigram to search by and would match most titles.
+MIN_TITLE_PREFIX = 3
+KINDS = ("tags", "domains", "titles")
+_LIKE_ESCAPE = "\\"
+
+
+@dataclass
+class PrefixIndex:
+    """Sorted lowercase keys, each pointing at a payload with a ranking count.
+
+    A payload may be reachable through several keys (``www.example.com`` is also
+    filed under ``example.com``); ``complete`` returns it once.
+    """
+
+    keys: list[str] = field(default_factory=list)
+    rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    counts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    payloads: list[Any] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, entries: Sequence[tuple[Sequence[str], int, Any]]) -> "PrefixIndex":
+        """``entries`` are ``(keys, count, payload)``; keys are matched case-insensitively."""
+        pairs = sorted(
+            (key.lower(), row)
+            for row, (keys, _, _) in enumerate(entries)
+            for key in dict.fromkeys(keys)
+            if key
+        )
+        counts = np.fromiter((count for _, count, _ in entries), dtype=np.int64, count=len(entries))
+        rows = np.fromiter((row for _, row in pairs), dtype=np.int64, count=len(pairs))
+        return cls(
+            keys=[key for key, _ in pairs],
+            rows=rows,
+            counts=counts[rows] if len(rows) else np.empty(0, dtype=np.int64),
+            payloads=[payload for _, _, payload in entries],
+        )
+
+    def complete(self, prefix: str, limit: int) -> list[Any]:
+        """Payloads with a key starting with ``prefix``, highest count first, then by key."""
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        stop = bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+        if start == stop or limit <= 0:
+            return []
+        # Keys are sorted, so a stable sort on count keeps ties alphabetical.
+        order = np.argsort(-self.counts[start:stop], kind="stable")
+        results: list[Any] = []
+        seen: set[int] = set()
+        for position in order:
+            row = int(self.rows[start + position])
+            if row in seen:
+                continue
+            seen.add(row)
+            results.append(self.payloads[row])
+            if len(results) == limit:
+                break
+        return results
+
+
+@dataclass(frozen=True)
+class TagCompletion:
+    id: UUID
+    name: str
+    item_count: int
+
+
+@dataclass(frozen=True)
+class DomainCompletion:
+    domain: str
+    item_count: int
+
+
+@dataclass(frozen=True)
+class TitleCompletion:
+    id: UUID
+    title: str
+
+
+@dataclass
+class UserPrefixIndexes:
+    tags: PrefixIndex
+    domains: PrefixIndex
+    # What ``domains`` is counted from, kept so item writes can be patched in.
+    item_domains: dict[UUID, str] = field(default_factory=dict)
+    domain_counts: Counter = field(default_factory=Counter)
+    version: int | None = None
+    built_at: float = field(default_factory=time.monotonic)
+    stale_ids: frozenset[UUID] = frozenset()
+    tags_stale: bool = False
+
+
+_indexes: dict[UUID, UserPrefixIndexes] = {}
+_lock = threading.Lock()
+
+
+@user_cache.on_items_changed
+def invalidate(
+    user_id: UUID,
+    item_ids: frozenset[UUID] | None = None,
+    versions: tuple[int, int] | None = None,
+) -> None:
+    """Mark ``item_ids`` for patching, or drop the indexes when the change cannot be patched."""
+    with _lock:
+        indexes = _indexes.get(user_id)
+        if indexes is None:
+            return
+        if (
+            item_ids is None
+            or versions is None
+            or versions[0] != indexes.version
+            or len(indexes.stale_ids) + len(item_ids) > MAX_DELTA_ITEMS
+        ):
+            del _indexes[user_id]
+        else:
+            indexes.stale_ids = indexes.stale_ids | item_ids
+            # Also after an empty set: a tag created on its own.
+            indexes.tags_stale = True
+            indexes.version = versions[1]
+
+
+def get_indexes(db: Session, user_id: UUID, *, version: int | None = None) -> UserPrefixIndexes:
+    """The user's indexes, current as of ``version`` (the request's ``users.data_version``)."""
+    with _lock:
+        indexes = _indexes.get(user_id)
+        if indexes is not None:
+            stale, tags_stale, indexed_version = indexes.stale_ids, indexes.tags_stale, indexes.version
+    if (
+        indexes is None
+        or time.monotonic() - indexes.built_at > CACHE_TTL_SECONDS
+        or (version is not None and (indexed_version is None or version > indexed_version))
+    ):
+        fresh = build_indexes(db, user_id)
+        with _lock:
+            if _indexes.get(user_id) is indexes:
+                _indexes[user_id] = fresh
+        return fresh
+    if stale or tags_stale:
+        apply_changes(db, user_id, indexes, stale, indexed_version)
+    return indexes
+
+
+def build_indexes(db: Session, user_id: UUID) -> UserPrefixIndexes:
+    # Read before the rows, so the rows are at least as new as the recorded version.
+    version = db.scalar(select(models.User.data_version).where(models.User.id == user_id))
+    domains: dict[str, str] = {}
+    item_domains = {
+        item_id: domains.setdefault(domain, domain)
+        for item_id, domain in db.execute(
+            select(models.Item.id, models.Item.origin_domain).where(
+                models.Item.user_id == user_id, models.Item.origin_domain.is_not(None)
+            )
+        )
+    }
+    domain_counts = Counter(item_domains.values())
+    return UserPrefixIndexes(
+        tags=_tag_index(db, user_id),
+        domains=_domain_index(domain_counts),
+        item_domains=item_domains,
+        domain_counts=domain_counts,
+        version=version,
+    )
+
+
+def apply_changes(
+    db: Session,
+    user_id: UUID,
+    indexes: UserPrefixIndexes,
+    stale: frozenset[UUID],
+    indexed_version: int | None,
+) -> None:
+    """Patch ``indexes`` in place with the current rows of the ``stale`` items and the user's tags.
+
+    Re-applying an id is harmless (it moves the item from its domain to the
+    same domain), so writes reported while the rows are read stay pending and
+    are simply read again next time.
+    """
+    current: dict[UUID, str | None] = {}
+    if stale:
+        current = dict(
+            db.execute(
+                select(models.Item.id, models.Item.origin_domain).where(
+                    models.Item.user_id == user_id, models.Item.id.in_(stale)
+                )
+            ).all()
+        )
+    tags = _tag_index(db, user_id)
+    with _lock:
+        if _indexes.get(user_id) is not indexes:
+            return
+        counts = indexes.domain_counts
+        for item_id in stale:
+            before = indexes.item_domains.pop(item_id, None)
+            after = current.get(item_id)
+            if before:
+                counts[before] -= 1
+                if counts[before] <= 0:
+                    del counts[before]
+            if after:
+                indexes.item_domains[item_id] = after
+                counts[after] += 1
+        if stale:
+            indexes.domains = _domain_index(counts)
+        indexes.tags = tags
+        if indexes.version == indexed_version:
+            indexes.stale_ids = indexes.stale_ids - stale
+            indexes.tags_stale = False
+
+
+def _tag_index(db: Session, user_id: UUID) -> PrefixIndex:
+    tags = db.execute(
+        select(models.Tag.id, models.Tag.name, models.Tag.name_normalized, models.Tag.item_count).where(
+            models.Tag.user_id == user_id
+        )
+    ).all()
+    return PrefixIndex.build(
+        [
+            ((normalized,), item_count, TagCompletion(id=tag_id, name=name, item_count=item_count))
+            for tag_id, name, normalized, item_count in tags
+        ]
+    )
+
+
+def _domain_index(counts: Counter) -> PrefixIndex:
+    return PrefixIndex.build(
+        [
+            (_domain_keys(domain), count, DomainCompletion(domain=domain, item_count=count))
+            for domain, count in counts.items()
+        ]
+    )
+
+
+def reset_cache() -> None:
+    with _lock:
+        _indexes.clear()
+
+
+def suggest(
+    db: Session,
+    user: models.User,
+    prefix: str,
+    *,
+    limit: int = 8,
+    kinds: Sequence[str] = KINDS,
+) -> dict[str, list]:
+    """Completions of ``prefix`` per kind (``tags``, ``domains``, ``titles``), best first."""
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown suggestion type: {unknown[0]}")
+    cleaned = " ".join(prefix.split())
+    results: dict[str, list] = {kind: [] for kind in KINDS}
+    if not cleaned:
+        return results
+    if "tags" in kinds or "domains" in kinds:
+        indexes = get_indexes(db, user.id, version=user.data_version)
+        if "tags" in kinds:
+            results["tags"] = indexes.tags.complete(models.normalize_tag_name(cleaned), limit)
+        if "domains" in kinds:
+            results["domains"] = indexes.domains.complete(cleaned.lower(), limit)
+    if "titles" in kinds:
+        results["titles"] = complete_titles(db, user.id, cleaned, limit)
+    return results
+
+
+def complete_titles(db: Session, user_id: UUID, prefix: str, limit: int) -> list[TitleCompletion]:
+    """Titles containing ``prefix``: titles starting with it first, then the closest, then newest."""
+    if len(prefix) < MIN_TITLE_PREFIX:
+        return []
+    escaped = _escape_like(prefix)
+    title = models.Item.title
+    ordering = [case((title.ilike(f"{escaped}%", escape=_LIKE_ESCAPE), 0), else_=1)]
+    if db.get_bind().dialect.name == "postgresql":
+        ordering.append(func.similarity(title, prefix).desc())
+    ordering.append(models.Item.created_at.desc())
+    rows = db.execute(
+        select(models.Item.id, title)
+        .where(models.Item.user_id == user_id, title.ilike(f"%{escaped}%", escape=_LIKE_ESCAPE))
+        .order_by(*ordering)
+        .limit(limit)
+    ).all()
+    return [TitleCompletion(id=item_id, title=value) for item_id, value in rows]
+
+
+def _domain_keys(domain: str) -> tuple[str, ...]:
+    for prefix in ("www.", "m."):
+        if domain.startswith(prefix):
+            return domain, domain[len(prefix):]
+    return (domain,)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2).replace("%", r"\%").replace("_", r"\_")
@@ -1,24 +1,31 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+import uuid
+from collections import Counter
+from typing import Iterable, List, Mapping, Sequence
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, Select, bindparam, delete, func, insert, literal, select, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .. import models
+from . import user_cache
 
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING ... RETURNING.
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
-def list_tags(db: Session, user: models.User) -> List[Tuple[models.Tag, int]]:
-    results = (
-        db.query(models.Tag, func.count(models.ItemTag.item_id))
-        .outerjoin(models.ItemTag, models.ItemTag.tag_id == models.Tag.id)
-        .filter(models.Tag.user_id == user.id)
-        .group_by(models.Tag.id)
-        .order_by(func.lower(models.Tag.name))
-        .all()
+
+def list_tags(db: Session, user: models.User) -> List[models.Tag]:
+    """The user's tags by name; ``item_count`` is maintained on the row, so no join is needed."""
+    return list(
+        db.scalars(
+            select(models.Tag)
+            .where(models.Tag.user_id == user.id)
+            .order_by(models.Tag.name_normalized)
+        )
     )
-    return [(tag, item_count) for tag, item_count in results]
 
 
 def create_tag(db: Session, user: models.User, name: str) -> models.Tag:
@@ -26,26 +33,315 @@ def create_tag(db: Session, user: models.User, name: str) -> models.Tag:
     if not cleaned:
         raise ValueError("Tag name is required")
     existing = (
-        db.query(models.Tag)
-        .filter(models.Tag.user_id == user.id, func.lower(models.Tag.name) == cleaned.lower())
+        db.query(models.Tag.id)
+        .filter(
+            models.Tag.user_id == user.id,
+            models.Tag.name_normalized == models.normalize_tag_name(cleaned),
+        )
         .first()
     )
     if existing:
         raise ValueError("Tag already exists")
     tag = models.Tag(user_id=user.id, name=cleaned)
     db.add(tag)
-    db.commit()
+    # A new tag has no items yet.
+    user_cache.record_change(db, user.id, ())
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        # A concurrent request created the same tag between the check and the insert.
+        db.rollback()
+        raise ValueError("Tag already exists") from exc
     db.refresh(tag)
     return tag
 
 
-def delete_tag(db: Session, user: models.User, tag_id: UUID) -> None:
-    tag = (
-        db.query(models.Tag)
-        .filter(models.Tag.user_id == user.id, models.Tag.id == tag_id)
-        .first()
+def ensure_tags(db: Session, user: models.User, names: Iterable[str]) -> List[models.Tag]:
+    """Return the user's tags for ``names`` (case-insensitive), creating missing ones.
+
+    One SELECT finds existing tags and one ``INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`` creates the rest, so concurrent writers cannot trip the unique
+    index. Runs inside the caller's transaction; tags come back in first-seen
+    order, deduplicated.
+    """
+    display_names: dict[str, str] = {}
+    for name in names:
+        cleaned = (name or "").strip()
+        if cleaned:
+            display_names.setdefault(models.normalize_tag_name(cleaned), cleaned)
+    if not display_names:
+        return []
+
+    found = {tag.name_normalized: tag for tag in find_tags(db, user, display_names)}
+    missing = [key for key in display_names if key not in found]
+    if missing:
+        now = models.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user.id,
+                "name": display_names[key],
+                "name_normalized": key,
+                "created_at": now,
+            }
+            for key in missing
+        ]
+        upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            statement = (
+                upsert(models.Tag)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["user_id", "name_normalized"])
+                .returning(models.Tag)
+            )
+            found.update((tag.name_normalized, tag) for tag in db.scalars(statement))
+        else:
+            db.execute(insert(models.Tag), rows)
+        raced = [key for key in missing if key not in found]
+        if raced:
+            # Inserted by a concurrent transaction (or no RETURNING support): read them back.
+            found.update((tag.name_normalized, tag) for tag in find_tags(db, user, raced))
+    return [found[key] for key in display_names]
+
+
+def find_tags(db: Session, user: models.User, names: Iterable[str]) -> List[models.Tag]:
+    """The user's existing tags matching ``names`` case-insensitively (missing names are skipped)."""
+    keys = {models.normalize_tag_name(name) for name in names if name and name.strip()}
+    if not keys:
+        return []
+    return list(
+        db.scalars(
+            select(models.Tag).where(
+                models.Tag.user_id == user.id,
+                models.Tag.name_normalized.in_(keys),
+            )
+        )
     )
-    if not tag:
+
+
+def link_items(db: Session, item_ids: Select, tag_ids: Sequence[UUID]) -> int:
+    """Attach every tag in ``tag_ids`` to every item selected by ``item_ids``; returns new links.
+
+    One ``INSERT ... SELECT`` that skips pairs which already exist.
+    """
+    if not tag_ids:
+        return 0
+    source = (
+        select(models.Item.id, models.Tag.id, literal(models.utcnow(), DateTime(timezone=True)))
+        # Deliberate cross join: every selected item gets every tag.
+        .select_from(models.Item)
+        .join(models.Tag, true())
+        .where(models.Item.id.in_(item_ids), models.Tag.id.in_(list(tag_ids)))
+    )
+    return _insert_links(db, source, models.Item.id, models.Tag.id, tag_ids)
+
+
+def _insert_links(
+    db: Session,
+    source: Select,
+    item_column,
+    tag_column,
+    tag_ids: Sequence[UUID],
+) -> int:
+    """``INSERT INTO item_tags SELECT ...`` ignoring pairs that already exist; returns rows added.
+
+    ``source`` selects (item_id, tag_id, created_at) for tags among ``tag_ids``;
+    ``item_column``/``tag_column`` are its first two expressions, used for the
+    NOT EXISTS fallback on dialects without ``ON CONFLICT``.
+    """
+    item_tags = models.ItemTag.__table__
+    columns = ["item_id", "tag_id", "created_at"]
+    upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        statement = upsert(item_tags).from_select(columns, source).on_conflict_do_nothing(
+            index_elements=["item_id", "tag_id"]
+        )
+    else:
+        existing = select(item_tags.c.item_id).where(
+            item_tags.c.item_id == item_column,
+            item_tags.c.tag_id == tag_column,
+        )
+        statement = insert(item_tags).from_select(columns, source.where(~existing.exists()))
+    return _change_links(db, statement, 1, tag_ids)
+
+
+def unlink_items(
+    db: Session,
+    item_ids: Select,
+    tag_ids: Sequence[UUID],
+    *,
+    keep: bool = False,
+) -> int:
+    """Detach ``tag_ids`` from the selected items (or every other tag when ``keep``); returns removed links."""
+    if not tag_ids and not keep:
+        return 0
+    item_tags = models.ItemTag.__table__
+    condition = item_tags.c.item_id.in_(item_ids)
+    if keep:
+        if tag_ids:
+            condition &= item_tags.c.tag_id.not_in(list(tag_ids))
+    else:
+        condition &= item_tags.c.tag_id.in_(list(tag_ids))
+    affected = tag_ids
+    if keep and not db.get_bind().dialect.delete_returning:
+        affected = list(db.scalars(select(item_tags.c.tag_id).where(condition).distinct()))
+    return _change_links(db, delete(item_tags).where(condition), -1, affected)
+
+
+def _change_links(db: Session, statement, sign: int, tag_ids: Sequence[UUID]) -> int:
+    """Run an INSERT (``sign`` 1) or DELETE (-1) on item_tags and keep ``tags.item_count`` in step.
+
+    With ``RETURNING`` each changed row moves its tag's count; otherwise the
+    ``tag_ids`` the statement can touch are recounted afterwards.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.insert_returning if sign > 0 else dialect.delete_returning:
+        changed = Counter(db.scalars(statement.returning(models.ItemTag.__table__.c.tag_id)))
+        adjust_item_counts(db, {tag_id: sign * count for tag_id, count in changed.items()})
+        return sum(changed.values())
+    rowcount = db.execute(statement).rowcount or 0
+    if rowcount:
+        recount_items(db, tag_ids=tag_ids)
+    return rowcount
+
+
+def adjust_item_counts(db: Session, deltas: Mapping[UUID, int]) -> None:
+    """Add ``deltas`` (tag id -> change) to ``tags.item_count`` inside the caller's transaction.
+
+    Relative updates stay correct when concurrent transactions touch the same
+    tag; rows are updated in id order so they cannot deadlock each other.
+    """
+    changes = sorted((tag_id, delta) for tag_id, delta in deltas.items() if delta)
+    if not changes:
+        return
+    tags = models.Tag.__table__
+    db.execute(
+        update(tags)
+        .where(tags.c.id == bindparam("b_id"))
+        .values(item_count=tags.c.item_count + bindparam("b_delta")),
+        [{"b_id": tag_id, "b_delta": delta} for tag_id, delta in changes],
+    )
+    _expire_counts(db, [tag_id for tag_id, _ in changes])
+
+
+def recount_items(
+    db: Session,
+    *,
+    tag_ids: Iterable[UUID] | None = None,
+    user_id: UUID | None = None,
+) -> int:
+    """Recompute ``tags.item_count`` from item_tags where it drifted; returns tags corrected.
+
+    Scoped to ``tag_ids`` and/or ``user_id`` when given, every tag otherwise.
+    Runs inside the caller's transaction.
+    """
+    tags = models.Tag.__table__
+    item_tags = models.ItemTag.__table__
+    actual = select(func.count()).select_from(item_tags).where(item_tags.c.tag_id == tags.c.id).scalar_subquery()
+    statement = update(tags).where(tags.c.item_count != actual).values(item_count=actual)
+    ids = None
+    if tag_ids is not None:
+        ids = list(tag_ids)
+        if not ids:
+            return 0
+        statement = statement.where(tags.c.id.in_(ids))
+    if user_id is not None:
+        statement = statement.where(tags.c.user_id == user_id)
+    corrected = db.execute(statement).rowcount or 0
+    if corrected:
+        _expire_counts(db, ids)
+    return corrected
+
+
+def _expire_counts(db: Session, tag_ids: Sequence[UUID] | None) -> None:
+    # Core updates bypass the identity map; reload item_count on next access.
+    wanted = None if tag_ids is None else set(tag_ids)
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, models.Tag) and (wanted is None or obj.id in wanted):
+            db.expire(obj, ["item_count"])
+
+
+def get_tag(db: Session, user: models.User, tag_id: UUID) -> models.Tag:
+    tag = db.scalar(select(models.Tag).where(models.Tag.user_id == user.id, models.Tag.id == tag_id))
+    if tag is None:
+        raise LookupError("Tag not found")
+    return tag
+
+
+def rename_tag(db: Session, user: models.User, tag_id: UUID, name: str) -> models.Tag:
+    """Rename a tag in place; its item links are untouched.
+
+    Renaming onto another tag's name is rejected; merge the tags instead.
+    """
+    cleaned = (name or "").strip()
+    if not cleaned:
+        raise ValueError("Tag name is required")
+    tag = get_tag(db, user, tag_id)
+    clash = db.scalar(
+        select(models.Tag.id).where(
+            models.Tag.user_id == user.id,
+            models.Tag.name_normalized == models.normalize_tag_name(cleaned),
+            models.Tag.id != tag.id,
+        )
+    )
+    if clash is not None:
+        raise ValueError("Another tag already has this name; merge the tags instead")
+    tag.name = cleaned
+    user_cache.record_change(db, user.id)
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise ValueError("Another tag already has this name; merge the tags instead") from exc
+    db.refresh(tag)
+    return tag
+
+
+def merge_tags(db: Session, user: models.User, target_id: UUID, source_ids: Iterable[UUID]) -> models.Tag:
+    """Move every item of the ``source_ids`` tags onto the target tag and delete the sources.
+
+    Set-based: one ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` copies the
+    links (items already carrying the target keep their link), then the source
+    links and tags are deleted, all in one transaction.
+    """
+    target = get_tag(db, user, target_id)
+    sources = list(dict.fromkeys(source_id for source_id in source_ids if source_id != target.id))
+    if not sources:
+        raise ValueError("Provide at least one tag to merge other than the target")
+    owned = set(
+        db.scalars(select(models.Tag.id).where(models.Tag.user_id == user.id, models.Tag.id.in_(sources)))
+    )
+    if len(owned) != len(sources):
         raise LookupError("Tag not found")
-    db.delete(tag)
-    db.commit()
\ No newline at end of file
+
+    item_tags = models.ItemTag.__table__
+    source_links = item_tags.alias("source_links")
+    copy = (
+        select(
+            source_links.c.item_id,
+            literal(target.id, models.Tag.id.type),
+            func.min(source_links.c.created_at),
+        )
+        .where(source_links.c.tag_id.in_(sources))
+        .group_by(source_links.c.item_id)
+    )
+    _insert_links(db, copy, source_links.c.item_id, literal(target.id, models.Tag.id.type), [target.id])
+    db.execute(delete(item_tags).where(item_tags.c.tag_id.in_(sources)))
+    db.execute(delete(models.Tag.__table__).where(models.Tag.id.in_(sources)))
+    user_cache.record_change(db, user.id)
+    # Loaded tags/items may still reference the deleted tags.
+    db.expire_all()
+    db.commit()
+    db.refresh(target)
+    return target
+
+
+def delete_tag(db: Session, user: models.User, tag_id: UUID) -> None:
+    """Delete a tag and its links with two set-based DELETEs (Tag.items is never loaded)."""
+    tag = get_tag(db, user, tag_id)
+    db.execute(delete(models.ItemTag.__table__).where(models.ItemTag.tag_id == tag.id))
+    db.execute(delete(models.Tag.__table__).where(models.Tag.id == tag.id))
+    user_cache.record_change(db, user.id)
+    # Loaded items may still list the deleted tag.
+    db.expire_all()
+    db.commit()
@@ -3,19 +3,25 @@ from __future__ import annotations
 import json
 import logging
 import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.parse import urlparse
 from typing import Iterable, List, Tuple
 
-import httpx
 from bs4 import BeautifulSoup
 
 from .. import models
+from ..core import http
 from ..core.config import get_settings
 from .metadata_service import MetadataResult
 from .twitter_headless import resolve_twitter_video_headless
 
 logger = logging.getLogger(__name__)
 
+LOOKUP_TIMEOUT_SECS = 6.0
+# Upper bound for the whole fallback: a lookup may follow a redirect after its first request.
+FALLBACK_WAIT_SECS = 2 * LOOKUP_TIMEOUT_SECS
+
 
 def extract_for_domain(domain: str, url: str, html: str | None) -> MetadataResult | None:
     normalized = domain.lower()
@@ -115,6 +121,7 @@ def _extract_twitter(url: str, html: str | None) -> MetadataResult | None:
 
     # Fallback when X removed OG/Twitter meta tags or when we didn't get an image.
     if (not metadata.title and not metadata.description) or not _looks_like_image_url(metadata.image_url):
+        metadata.twitter_fallback_done = True
         fallback = _twitter_oembed_fallback(url)
         if fallback:
             metadata.title = metadata.title or fallback.get("text")
@@ -131,32 +138,53 @@ def _extract_twitter(url: str, html: str | None) -> MetadataResult | None:
 
 
 def _twitter_oembed_fallback(url: str) -> dict[str, str | None] | None:
-    """Best-effort metadata recovery for X/Twitter when OG meta tags are absent."""
-    tweet_id = _parse_tweet_id(url)
-    vx_data = _twitter_vx_lookup(tweet_id) if tweet_id else None
-    vx_text = vx_data.get("text") if vx_data else None
-    vx_image = vx_data.get("image_url") if vx_data else None
-    vx_author = vx_data.get("author") if vx_data else None
-    vx_timestamp = vx_data.get("timestamp") if vx_data else None
-
+    """Best-effort metadata recovery for X/Twitter when OG meta tags are absent.
+
+    vxtwitter (on a worker thread) and publish.twitter.com oEmbed are queried
+    at the same time; the t.co media link from the embed is followed while
+    vxtwitter is still outstanding and ignored once vxtwitter supplies an image.
+    Precedence is unchanged: vxtwitter text and media first, oEmbed for author
+    and timestamp, t.co media last. An oEmbed error response means no fallback.
+
+    Each call gets its own two-thread executor, so lookups never queue behind
+    other ingests and waiting on them is bounded by their own request timeouts
+    (``FALLBACK_WAIT_SECS`` overall). A result that misses the deadline is
+    logged and dropped.
+    """
+    deadline = time.monotonic() + FALLBACK_WAIT_SECS
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="twitter-fallback")
     try:
-        resp = httpx.get(
-            "https://publish.twitter.com/oembed",
-            params={"url": url},
-            timeout=6.0,
-            follow_redirects=True,
-        )
-        if resp.status_code >= 400:
+        tweet_id = _parse_tweet_id(url)
+        vx_future = executor.submit(_twitter_vx_lookup, tweet_id) if tweet_id else None
+        payload = _twitter_oembed_lookup(url)
+        if payload is None:
             return None
-        payload = resp.json()
-    except Exception:  # pragma: no cover - defensive
-        payload = {}
 
-    html = payload.get("html") or ""
-    soup = BeautifulSoup(html, "html.parser")
-    text_node = soup.find("p")
-    text = vx_text or (text_node.get_text(" ", strip=True) if text_node else None)
-    image_url = vx_image or _resolve_tco_image(soup)
+        html = payload.get("html") or ""
+        soup = BeautifulSoup(html, "html.parser")
+        vx_has_image = (
+            vx_future is not None
+            and vx_future.done()
+            and bool((_future_result(vx_future, "vxtwitter", deadline) or {}).get("image_url"))
+        )
+        tco_future = None if vx_has_image else executor.submit(_resolve_tco_image, soup)
+        vx_data = _future_result(vx_future, "vxtwitter", deadline) if vx_future is not None else None
+        vx_text = vx_data.get("text") if vx_data else None
+        vx_image = vx_data.get("image_url") if vx_data else None
+        vx_author = vx_data.get("author") if vx_data else None
+        vx_timestamp = vx_data.get("timestamp") if vx_data else None
+
+        text_node = soup.find("p")
+        text = vx_text or (text_node.get_text(" ", strip=True) if text_node else None)
+        if vx_image:
+            image_url = vx_image
+            if tco_future is not None and not tco_future.done():
+                logger.debug("twitter_fallback_tco_ignored url=%s reason=vxtwitter_image", url)
+        else:
+            image_url = _future_result(tco_future, "t.co", deadline) if tco_future is not None else None
+    finally:
+        # Never wait for an ignored lookup; it ends on its own request timeout.
+        executor.shutdown(wait=False, cancel_futures=True)
     if vx_author:
         payload.setdefault("author_name", vx_author)
     if vx_timestamp:
@@ -175,6 +203,32 @@ def _twitter_oembed_fallback(url: str) -> dict[str, str | None] | None:
     }
 
 
+def _twitter_oembed_lookup(url: str) -> dict | None:
+    """publish.twitter.com oEmbed payload; ``{}`` when unreachable, ``None`` on an error response."""
+    try:
+        resp = http.get(
+            "https://publish.twitter.com/oembed",
+            params={"url": url},
+            timeout=LOOKUP_TIMEOUT_SECS,
+            follow_redirects=True,
+        )
+        if resp.status_code >= 400:
+            return None
+        return resp.json()
+    except Exception:  # pragma: no cover - defensive
+        return {}
+
+
+def _future_result(future: Future, source: str, deadline: float):
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0.0))
+    except TimeoutError:
+        logger.warning("twitter_fallback_result_dropped source=%s reason=timeout", source)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("twitter_fallback_result_dropped source=%s error=%s", source, exc)
+    return None
+
+
 def _parse_tweet_id(url: str) -> str | None:
     parsed = urlparse(url)
     match = re.search(r"/status/(\d+)", parsed.path)
@@ -184,7 +238,7 @@ def _parse_tweet_id(url: str) -> str | None:
 def _twitter_vx_lookup(tweet_id: str) -> dict[str, str | None] | None:
     """Use the public vxtwitter API as a resilience fallback to grab media/text."""
     try:
-        resp = httpx.get(f"https://api.vxtwitter.com/status/{tweet_id}", timeout=6.0)
+        resp = http.get(f"https://api.vxtwitter.com/status/{tweet_id}", timeout=LOOKUP_TIMEOUT_SECS)
         if resp.status_code >= 400:
             return None
         data = resp.json()
@@ -222,7 +276,7 @@ def _resolve_tco_image(soup: BeautifulSoup) -> str | None:
         return None
 
     try:
-        response = httpx.get(target, timeout=6.0, follow_redirects=True)
+        response = http.get(target, timeout=LOOKUP_TIMEOUT_SECS, follow_redirects=True)
     except Exception:  # pragma: no cover - defensive
         return None
 
@@ -0,0 +1,167 @@
+"""Per-user change tracking and the in-process caches that depend on it.
+
+Write paths in the items/tags services call ``record_change`` inside their
+transaction. It bumps ``users.data_version`` (which HTTP ETags are derived
+from) and, once the session commits, runs ``user_data_changed`` so every
+registered ``UserCache`` and listener forgets that user's entries. Write paths
+that know exactly which items they touched pass ``item_ids``; listeners
+registered with ``on_items_changed`` receive them so they can patch rather than
+drop (``None`` means "anything may have changed").
+
+Other processes (``python -m app.worker``, other API workers) bump the same
+counter without notifying this one, so ``UserCache`` entries are stored with
+the ``data_version`` they were computed at and callers look them up with the
+version of the request's user row: a newer version is a miss, and no cached
+body outlives the ETag it was served under. Entries also expire after
+``ttl_seconds``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable
+from uuid import UUID
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from .. import models
+
+Listener = Callable[[UUID], None]
+# (user_id, item_ids or None, (data_version before, after) or None when unknown)
+ItemsListener = Callable[[UUID, "frozenset[UUID] | None", "tuple[int, int] | None"], None]
+
+_listeners: list[Listener] = []
+_item_listeners: list[ItemsListener] = []
+_MISSING = object()
+_PENDING_KEY = "user_cache.changed_user_ids"
+
+
+def on_user_data_changed(listener: Listener) -> Listener:
+    """Register ``listener`` to run after any write to a user's items or tags."""
+    _listeners.append(listener)
+    return listener
+
+
+def on_items_changed(listener: ItemsListener) -> ItemsListener:
+    """Register ``listener(user_id, item_ids, versions)`` for committed writes.
+
+    ``item_ids`` is None when unknown; ``versions`` is the user's
+    ``data_version`` before and after the transaction (None when the database
+    cannot return it).
+    """
+    _item_listeners.append(listener)
+    return listener
+
+
+def user_data_changed(
+    user_id: UUID,
+    item_ids: frozenset[UUID] | None = None,
+    versions: tuple[int, int] | None = None,
+) -> None:
+    for listener in list(_listeners):
+        listener(user_id)
+    for item_listener in list(_item_listeners):
+        item_listener(user_id, item_ids, versions)
+
+
+@dataclass
+class _PendingChange:
+    item_ids: set[UUID] | None
+    first_version: int | None
+    last_version: int | None = None
+
+    @property
+    def versions(self) -> tuple[int, int] | None:
+        if self.first_version is None or self.last_version is None:
+            return None
+        return self.first_version, self.last_version
+
+
+def record_change(db: Session, user_id: UUID, item_ids: Iterable[UUID] | None = None) -> None:
+    """Bump the user's data version in the current transaction; notify listeners on commit.
+
+    ``item_ids`` names the items whose columns or tags changed; leave it out
+    when the write is not limited to known items (tag renames, bulk tagging).
+    """
+    statement = (
+        update(models.User)
+        .where(models.User.id == user_id)
+        # Keep updated_at (profile changes) untouched by content writes.
+        .values(data_version=models.User.data_version + 1, updated_at=models.User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    version = None
+    if db.get_bind().dialect.update_returning:
+        version = db.execute(statement.returning(models.User.data_version)).scalar()
+    else:  # pragma: no cover - SQLite and Postgres support RETURNING
+        db.execute(statement)
+
+    pending: dict[UUID, _PendingChange] = db.info.setdefault(_PENDING_KEY, {})
+    change = pending.get(user_id)
+    if change is None:
+        change = pending[user_id] = _PendingChange(
+            item_ids=set(),
+            first_version=None if version is None else version - 1,
+        )
+    change.last_version = version
+    if item_ids is None:
+        change.item_ids = None
+    elif change.item_ids is not None:
+        change.item_ids.update(item_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_changes(session: Session) -> None:
+    for user_id, change in session.info.pop(_PENDING_KEY, {}).items():
+        item_ids = None if change.item_ids is None else frozenset(change.item_ids)
+        user_data_changed(user_id, item_ids, change.versions)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class UserCache:
+    """Small LRU of computed results per user, keyed by a hashable signature."""
+
+    def __init__(self, *, max_entries: int = 64, ttl_seconds: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[UUID, OrderedDict[Hashable, tuple[float, int | None, Any]]] = {}
+        self._lock = threading.Lock()
+        on_user_data_changed(self.invalidate)
+
+    def get(self, user_id: UUID, key: Hashable, default: Any = None, *, version: int | None = None) -> Any:
+        """Cached value for ``key``; entries stored at another ``data_version`` are misses."""
+        with self._lock:
+            entries = self._entries.get(user_id)
+            hit = entries.get(key, _MISSING) if entries else _MISSING
+            if hit is _MISSING:
+                return default
+            stored_at, stored_version, value = hit
+            if stored_version != version or time.monotonic() - stored_at > self.ttl_seconds:
+                del entries[key]
+                return default
+            entries.move_to_end(key)
+            return value
+
+    def set(self, user_id: UUID, key: Hashable, value: Any, *, version: int | None = None) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(user_id, OrderedDict())
+            entries[key] = (time.monotonic(), version, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
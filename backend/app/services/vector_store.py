@@ -0,0 +1,282 @@
+"""Memory-mapped float32 vector store keyed by item id.
+
+One store lives in one directory:
+
+* ``vectors.f32`` – ``(capacity, dim)`` float32 rows, L2-normalized by the caller.
+* ``ids.u8`` – ``(capacity, 16)`` raw UUID bytes; all zeroes marks a free row.
+* ``meta.json`` – dim, provider name, row count, capacity and write generation.
+
+Rows are appended (reusing freed rows first) and the files are grown by
+doubling, so updates are incremental and reads map the matrix without loading
+it. Searches are a single matrix-vector product plus ``argpartition``.
+
+Several processes (API workers, ``python -m app.worker``) may share a store.
+Writes hold an exclusive ``flock`` on ``lock`` in the directory and first
+reload the row map whenever ``meta.json`` changed on disk, so no process
+appends from stale row state; reads resync under a shared lock and then work
+on a snapshot of the mapped arrays. Wrap multi-step writes in ``writing()``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+from uuid import UUID
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: one writing process only
+    fcntl = None
+
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.u8"
+META_FILE = "meta.json"
+LOCK_FILE = "lock"
+MIN_CAPACITY = 64
+_EMPTY_ID = bytes(16)
+
+
+class VectorStore:
+    def __init__(self, directory: Path, *, dim: int, provider: str) -> None:
+        self.directory = Path(directory)
+        self.dim = dim
+        self.provider = provider
+        self.lock = threading.RLock()
+        self.count = 0
+        self.capacity = 0
+        self._vectors: np.ndarray | None = None
+        self._ids: np.ndarray | None = None
+        self._rows: dict[UUID, int] = {}
+        self._free: list[int] = []
+        self.generation: int | None = None
+        self._write_depth = 0
+        self._sync_for_read()
+
+    @property
+    def exists(self) -> bool:
+        return (self.directory / META_FILE).exists()
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._sync_for_read()
+            return len(self._rows)
+
+    def __contains__(self, item_id: UUID) -> bool:
+        with self.lock:
+            self._sync_for_read()
+            return item_id in self._rows
+
+    @contextmanager
+    def writing(self) -> Iterator["VectorStore"]:
+        """Hold the store exclusively (threads and processes), synced with the files on disk."""
+        with self.lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._write_depth -= 1
+                return
+            with self._file_lock(exclusive=True):
+                self._write_depth = 1
+                try:
+                    self._sync()
+                    yield self
+                finally:
+                    self._write_depth = 0
+
+    def vector(self, item_id: UUID) -> np.ndarray | None:
+        with self.lock:
+            self._sync_for_read()
+            row = self._rows.get(item_id)
+            if row is None:
+                return None
+            return np.array(self._vectors[row])
+
+    def upsert(self, item_ids: Sequence[UUID], vectors: np.ndarray) -> None:
+        """Insert or overwrite rows for ``item_ids`` (``vectors`` is ``(n, dim)``)."""
+        with self.writing():
+            new_ids = [item_id for item_id in dict.fromkeys(item_ids) if item_id not in self._rows]
+            self._reserve(max(0, len(new_ids) - len(self._free)))
+            for item_id, vector in zip(item_ids, vectors):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = self._free.pop() if self._free else self._append_row()
+                    self._rows[item_id] = row
+                    self._ids[row] = np.frombuffer(item_id.bytes, dtype=np.uint8)
+                self._vectors[row] = vector
+            self.flush()
+
+    def remove(self, item_ids: Iterable[UUID]) -> None:
+        with self.writing():
+            removed = False
+            for item_id in item_ids:
+                row = self._rows.pop(item_id, None)
+                if row is None:
+                    continue
+                self._vectors[row] = 0.0
+                self._ids[row] = 0
+                self._free.append(row)
+                removed = True
+            if removed:
+                self.flush()
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        *,
+        exclude: Iterable[UUID] = (),
+    ) -> list[tuple[UUID, float]]:
+        """Top-``k`` item ids by cosine similarity to ``query`` (rows are unit length)."""
+        with self.lock:
+            self._sync_for_read()
+            if not self._rows or k <= 0:
+                return []
+            # Growing swaps in new maps; these references keep the ones scored here alive.
+            vectors, ids, count = self._vectors, self._ids, self.count
+            hidden = self._free + [self._rows[item_id] for item_id in exclude if item_id in self._rows]
+        scores = vectors[:count] @ query.astype(np.float32, copy=False)
+        if hidden:
+            scores[hidden] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (UUID(bytes=ids[row].tobytes()), float(scores[row]))
+            for row in top
+            if np.isfinite(scores[row]) and ids[row].any()
+        ]
+
+    def flush(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+        self._write_meta()
+
+    def clear(self) -> None:
+        """Drop every row and the files backing them."""
+        with self.writing():
+            self._clear_files()
+
+    def _clear_files(self) -> None:
+        self._reset_state()
+        for name in (VECTORS_FILE, IDS_FILE, META_FILE):
+            (self.directory / name).unlink(missing_ok=True)
+
+    def _reset_state(self) -> None:
+        self._vectors = self._ids = None
+        self.count = self.capacity = 0
+        self._rows = {}
+        self._free = []
+        self.generation = None
+
+    @contextmanager
+    def _file_lock(self, *, exclusive: bool) -> Iterator[None]:
+        if fcntl is None or (not exclusive and not self.directory.is_dir()):
+            yield
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "a+b") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict | None:
+        try:
+            return json.loads((self.directory / META_FILE).read_text())
+        except FileNotFoundError:
+            return None
+
+    def _sync(self) -> None:
+        # Every write bumps ``generation`` in meta.json; a different one means another process wrote.
+        meta = self._read_meta()
+        if (meta or {}).get("generation") != self.generation:
+            self._reset_state()
+            self._load(meta)
+
+    def _sync_for_read(self) -> None:
+        if self._write_depth:
+            return
+        with self._file_lock(exclusive=False):
+            self._sync()
+
+    def _load(self, meta: dict | None) -> None:
+        if meta is None:
+            return
+        if meta.get("dim") != self.dim or meta.get("provider") != self.provider:
+            # Vectors from another provider/dimension are useless; start over.
+            self._clear_files()
+            return
+        self.generation = meta.get("generation")
+        self.count = int(meta["count"])
+        self.capacity = int(meta["capacity"])
+        if self.capacity:
+            self._open(self.capacity)
+        for row in range(self.count):
+            raw = self._ids[row].tobytes()
+            if raw == _EMPTY_ID:
+                self._free.append(row)
+            else:
+                self._rows[UUID(bytes=raw)] = row
+
+    def _open(self, capacity: int, mode: str = "r+") -> None:
+        self._vectors = np.memmap(
+            self.directory / VECTORS_FILE, dtype=np.float32, mode=mode, shape=(capacity, self.dim)
+        )
+        self._ids = np.memmap(self.directory / IDS_FILE, dtype=np.uint8, mode=mode, shape=(capacity, 16))
+
+    def _append_row(self) -> int:
+        row = self.count
+        self.count += 1
+        return row
+
+    def _reserve(self, extra_rows: int) -> None:
+        needed = self.count + extra_rows
+        if needed <= self.capacity:
+            return
+        capacity = max(MIN_CAPACITY, self.capacity * 2, needed)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        old_vectors, old_ids = self._vectors, self._ids
+        tmp_vectors = self.directory / f"{VECTORS_FILE}.tmp"
+        tmp_ids = self.directory / f"{IDS_FILE}.tmp"
+        vectors = np.memmap(tmp_vectors, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        ids = np.memmap(tmp_ids, dtype=np.uint8, mode="w+", shape=(capacity, 16))
+        if old_vectors is not None and self.count:
+            vectors[: self.count] = old_vectors[: self.count]
+            ids[: self.count] = old_ids[: self.count]
+        vectors.flush()
+        ids.flush()
+        del vectors, ids, old_vectors, old_ids
+        self._vectors = self._ids = None
+        os.replace(tmp_vectors, self.directory / VECTORS_FILE)
+        os.replace(tmp_ids, self.directory / IDS_FILE)
+        self.capacity = capacity
+        self._open(capacity)
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path = self.directory / META_FILE
+        tmp_path = meta_path.with_suffix(".tmp")
+        self.generation = (self.generation or 0) + 1
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "dim": self.dim,
+                    "provider": self.provider,
+                    "count": self.count,
+                    "capacity": self.capacity,
+                    "generation": self.generation,
+                }
+            )
+        )
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,122 @@
+"""Background job worker.
+
+    python -m app.worker [--concurrency 4] [--kinds ingest_url,refresh_item] [--once]
+
+Runs ``--concurrency`` threads that each claim one job at a time from the
+``jobs`` table (see ``services.job_queue``) and sleep ``JOB_POLL_INTERVAL_SECS``
+when there is nothing to do. Start as many processes, on as many hosts, as
+needed: claims use ``FOR UPDATE SKIP LOCKED``. SIGINT/SIGTERM stop claiming
+and let running jobs finish.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+
+from .core import http
+from .core.config import get_settings
+from .core.logging import configure_logging
+from .database import SessionLocal, configure_engine
+from .services import job_handlers, job_queue  # noqa: F401 - job_handlers registers the handlers
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Jobs to run at once in this process (default: 2)",
+    )
+    parser.add_argument(
+        "--kinds",
+        help=f"Comma-separated job kinds to run (default: all of {', '.join(job_queue.registered_kinds())})",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Exit once no job is runnable instead of polling",
+    )
+    parser.add_argument(
+        "--retry-dead",
+        action="store_true",
+        help="Re-queue dead-lettered jobs (of --kinds) and exit",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=None,
+        help="Logging level (DEBUG, INFO, WARNING, ERROR; default: LOG_LEVEL)",
+    )
+    return parser.parse_args(argv)
+
+
+def run(
+    worker_id: str,
+    stop: threading.Event,
+    *,
+    kinds: list[str] | None = None,
+    once: bool = False,
+) -> int:
+    """Claim and run jobs until ``stop`` is set (or, with ``once``, the queue is drained)."""
+    poll_interval = get_settings().JOB_POLL_INTERVAL_SECS
+    processed = 0
+    while not stop.is_set():
+        try:
+            ran = job_queue.run_one(worker_id, kinds=kinds)
+        except Exception:  # noqa: BLE001 - e.g. the database is briefly unreachable
+            logger.exception("worker_claim_failed worker=%s", worker_id)
+            ran = False
+        if ran:
+            processed += 1
+        elif once:
+            break
+        else:
+            stop.wait(poll_interval)
+    return processed
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    configure_logging(args.log_level or get_settings().LOG_LEVEL)
+    configure_engine()
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()] if args.kinds else None
+
+    if args.retry_dead:
+        with SessionLocal() as db:
+            count = job_queue.retry_dead(db, kinds=kinds)
+        print(f"Re-queued {count} dead job(s).")
+        return
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(
+            target=run,
+            args=(f"{base_id}:{number}", stop),
+            kwargs={"kinds": kinds, "once": args.once},
+            name=f"worker-{number}",
+        )
+        for number in range(max(args.concurrency, 1))
+    ]
+    logger.info("worker_started id=%s concurrency=%s kinds=%s", base_id, len(threads), kinds or "all")
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.5)
+    http.close()
+    logger.info("worker_stopped id=%s", base_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compute perceptual image hashes (dHash) for existing items with a stored file so
+they show up in image duplicate clusters.
+
+Safe by default (dry-run). Use --apply to write changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import func, select
+
+from app import models
+from app.database import SessionLocal, configure_engine
+from app.services import image_hash_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Populate perceptual hashes for stored images",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="Number of items to hash per transaction (default: 200)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Rehash every item with a file instead of only rows without a hash",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many items would be hashed (default)",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Persist changes (must be set to write updates)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+    if not args.apply:
+        args.dry_run = True
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    configure_engine()
+    session = SessionLocal()
+
+    candidates = 0
+    hashed = 0
+    try:
+        condition = models.Item.file_path.is_not(None)
+        if not args.all:
+            condition = condition & models.Item.image_hash.is_(None)
+        candidates = session.scalar(select(func.count(models.Item.id)).where(condition)) or 0
+        if args.apply:
+            last_id = None
+            while True:
+                query = select(models.Item.id).where(condition).order_by(models.Item.id)
+                if last_id is not None:
+                    query = query.where(models.Item.id > last_id)
+                batch = session.scalars(query.limit(args.batch_size)).all()
+                if not batch:
+                    break
+                hashed += image_hash_service.index_items(session, batch)
+                session.commit()
+                last_id = batch[-1]
+                logger.info("image_hash_backfill hashed=%s", hashed)
+    finally:
+        session.close()
+
+    print("Image hash backfill summary")
+    print(f"  candidates: {candidates}")
+    print(f"  hashed: {hashed if args.apply else 0}")
+    if not args.apply:
+        print("Dry-run only; rerun with --apply to persist changes.")
+
+
+if __name__ == "__main__":
+    main()
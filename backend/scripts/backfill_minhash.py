@@ -0,0 +1,98 @@
+"""
+Compute MinHash signatures and LSH bands for existing items so near-duplicate
+detection sees them. Signatures for each batch are hashed together with NumPy.
+
+Safe by default (dry-run). Use --apply to write changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import func, select, true
+
+from app import models
+from app.database import SessionLocal, configure_engine
+from app.services import dedup_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Populate MinHash signatures for near-duplicate detection",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of items to fingerprint per transaction (default: 1000)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute every item instead of only rows without a signature",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many items would be updated (default)",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Persist changes (must be set to write updates)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+    if not args.apply:
+        args.dry_run = True
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    configure_engine()
+    session = SessionLocal()
+
+    candidates = 0
+    updated = 0
+    try:
+        if dedup_service.mode() == "off":
+            print("DEDUP_MODE is off; nothing to do.")
+            return
+
+        condition = true() if args.all else models.Item.minhash.is_(None)
+        candidates = session.scalar(select(func.count(models.Item.id)).where(condition)) or 0
+        if args.apply:
+            last_id = None
+            while True:
+                query = select(models.Item.id).where(condition).order_by(models.Item.id)
+                if last_id is not None:
+                    query = query.where(models.Item.id > last_id)
+                batch = session.scalars(query.limit(args.batch_size)).all()
+                if not batch:
+                    break
+                updated += dedup_service.index_items(session, batch)
+                session.commit()
+                last_id = batch[-1]
+                logger.info("minhash_backfill updated=%s", updated)
+    finally:
+        session.close()
+
+    print("MinHash backfill summary")
+    print(f"  candidates: {candidates}")
+    print(f"  updated: {updated if args.apply else 0}")
+    if not args.apply:
+        print("Dry-run only; rerun with --apply to persist changes.")
+
+
+if __name__ == "__main__":
+    main()
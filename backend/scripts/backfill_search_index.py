@@ -0,0 +1,99 @@
+"""
+Backfill the keyword search index (Postgres search_vector or SQLite items_fts)
+so existing rows are visible to search.
+
+Safe by default (dry-run). Use --apply to write changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import func, select, true
+
+from app import models
+from app.database import SessionLocal, configure_engine
+from app.services import search_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Populate the keyword search index for existing items",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of items to update per transaction (default: 1000)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Reindex every item instead of only rows missing from the index",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many items would be updated (default)",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Persist changes (must be set to write updates)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+    if not args.apply:
+        args.dry_run = True
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    configure_engine()
+    session = SessionLocal()
+
+    candidates = 0
+    updated = 0
+    try:
+        backend = search_service.get_backend(session)
+        if backend.unindexed_condition() is None:
+            print(f"Search backend '{backend.name}' keeps no index; nothing to do.")
+            return
+
+        condition = true() if args.all else search_service.unindexed_condition(session)
+        candidates = session.scalar(select(func.count(models.Item.id)).where(condition)) or 0
+        if args.apply:
+            last_id = None
+            while True:
+                query = select(models.Item.id).where(condition).order_by(models.Item.id)
+                if last_id is not None:
+                    query = query.where(models.Item.id > last_id)
+                batch = session.scalars(query.limit(args.batch_size)).all()
+                if not batch:
+                    break
+                updated += backend.index_items(session, batch)
+                session.commit()
+                last_id = batch[-1]
+                logger.info("search_index_backfill backend=%s updated=%s", backend.name, updated)
+    finally:
+        session.close()
+
+    print("Search index backfill summary")
+    print(f"  candidates: {candidates}")
+    print(f"  updated: {updated if args.apply else 0}")
+    if not args.apply:
+        print("Dry-run only; rerun with --apply to persist changes.")
+
+
+if __name__ == "__main__":
+    main()
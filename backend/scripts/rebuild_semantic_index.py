@@ -0,0 +1,86 @@
+"""
+Rebuild the per-user semantic search vector stores from the database, e.g.
+after changing EMBEDDING_PROVIDER or EMBEDDING_DIM or restoring a backup.
+
+Safe by default (dry-run). Use --apply to write changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import func, select
+
+from app import models
+from app.database import SessionLocal, configure_engine
+from app.services import semantic_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rebuild semantic search vector stores for existing items",
+    )
+    parser.add_argument(
+        "--username",
+        help="Only rebuild the store for this user",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many items would be embedded (default)",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Persist changes (must be set to write the stores)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+    if not args.apply:
+        args.dry_run = True
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    configure_engine()
+    session = SessionLocal()
+
+    users = 0
+    candidates = 0
+    embedded = 0
+    try:
+        query = select(models.User.id)
+        if args.username:
+            query = query.where(models.User.username == args.username)
+        user_ids = session.scalars(query).all()
+        users = len(user_ids)
+        for user_id in user_ids:
+            candidates += session.scalar(
+                select(func.count(models.Item.id)).where(models.Item.user_id == user_id)
+            ) or 0
+            if args.apply:
+                embedded += len(semantic_service.build_store(session, user_id))
+    finally:
+        session.close()
+
+    print("Semantic index rebuild summary")
+    print(f"  root: {semantic_service.index_root()}")
+    print(f"  users: {users}")
+    print(f"  candidates: {candidates}")
+    print(f"  embedded: {embedded if args.apply else 0}")
+    if not args.apply:
+        print("Dry-run only; rerun with --apply to persist changes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 """
 Bulk refresh existing Twitter/X items to pick up extractor improvements.
 
-Safe by default: runs in dry-run mode unless --apply is provided.
+Safe by default: runs in dry-run mode unless --apply is provided. With
+JOB_QUEUE_ENABLED (or --enqueue true) --apply queues one refresh_item job per
+item for `python -m app.worker` instead of refreshing them here.
 """
 
 from __future__ import annotations
@@ -22,6 +24,9 @@ from app.services import ingestion_service
 
 logger = logging.getLogger(__name__)
 
+# Behind interactive saves and refreshes, which use priority 0 and above.
+JOB_PRIORITY = -10
+
 
 def _bool_arg(value: Any) -> bool:
     if isinstance(value, bool):
@@ -65,6 +70,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Overwrite title/description/text_content with refreshed values.",
     )
+    parser.add_argument(
+        "--enqueue",
+        type=_bool_arg,
+        default=None,
+        help="Queue refresh_item jobs instead of refreshing inline (default: JOB_QUEUE_ENABLED).",
+    )
     parser.add_argument(
         "--sleep",
         type=float,
@@ -131,10 +142,12 @@ def main() -> int:
     settings = get_settings()
     engine = configure_engine(settings.DATABASE_URL)
     Base.metadata.create_all(bind=engine)
+    enqueue = settings.JOB_QUEUE_ENABLED if args.enqueue is None else args.enqueue
 
     counters = {
         "scanned": 0,
         "eligible": 0,
+        "queued": 0,
         "refreshed_ok": 0,
         "refreshed_pending": 0,
         "failed": 0,
@@ -171,11 +184,24 @@ def main() -> int:
 
             if args.dry_run:
                 print(
-                    f"[DRY-RUN] would refresh item_id={item.id} url={item.source_url} "
-                    f"download_image={download_needed} update_text={args.update_text}"
+                    f"[DRY-RUN] would {'queue a refresh of' if enqueue else 'refresh'} item_id={item.id} "
+                    f"url={item.source_url} download_image={download_needed} update_text={args.update_text}"
                 )
                 continue
 
+            if enqueue:
+                ingestion_service.queue_refresh(
+                    db,
+                    user,
+                    item,
+                    force_download=args.force_download,
+                    update_text=args.update_text,
+                    priority=JOB_PRIORITY,
+                    commit=False,
+                )
+                counters["queued"] += 1
+                continue
+
             before_path = item.file_path
             before_extra = dict(item.extra or {})
             before_title = item.title
@@ -226,9 +252,13 @@ def main() -> int:
             if args.sleep:
                 time.sleep(args.sleep)
 
+        if counters["queued"]:
+            db.commit()
+
     print("Refresh summary")
     print(f"  scanned: {counters['scanned']}")
     print(f"  eligible: {counters['eligible']}")
+    print(f"  queued: {counters['queued']}")
     print(f"  refreshed_ok: {counters['refreshed_ok']}")
     print(f"  refreshed_pending: {counters['refreshed_pending']}")
     print(f"  failed: {counters['failed']}")
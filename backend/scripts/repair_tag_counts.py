@@ -0,0 +1,88 @@
+"""
+Recompute tags.item_count from item_tags for tags whose maintained count has
+drifted (e.g. after manual SQL against item_tags).
+
+Safe by default (dry-run). Use --apply to write changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import select
+
+from app import models
+from app.database import SessionLocal, configure_engine
+from app.services import tags_service, user_cache
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute maintained tag item counts",
+    )
+    parser.add_argument(
+        "--user-email",
+        help="Only repair tags of this user (default: every user)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many tags would be corrected (default)",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Persist changes (must be set to write updates)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+    if not args.apply:
+        args.dry_run = True
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    configure_engine()
+    session = SessionLocal()
+
+    corrected = 0
+    try:
+        user_id = None
+        if args.user_email:
+            user_id = session.scalar(select(models.User.id).where(models.User.email == args.user_email))
+            if user_id is None:
+                print(f"No user with email {args.user_email!r}.")
+                return
+        # One set-based UPDATE; a dry run rolls it back to report the count.
+        corrected = tags_service.recount_items(session, user_id=user_id)
+        if args.apply:
+            if corrected:
+                # Cached tag lists and ETags must not keep serving the old counts.
+                user_ids = [user_id] if user_id else session.scalars(select(models.User.id)).all()
+                for changed_user_id in user_ids:
+                    user_cache.record_change(session, changed_user_id)
+            session.commit()
+            logger.info("tag_counts_repaired corrected=%s", corrected)
+        else:
+            session.rollback()
+    finally:
+        session.close()
+
+    print("Tag count repair summary")
+    print(f"  {'corrected' if args.apply else 'would correct'}: {corrected}")
+    if not args.apply:
+        print("Dry-run only; rerun with --apply to persist changes.")
+
+
+if __name__ == "__main__":
+    main()
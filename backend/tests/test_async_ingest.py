@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from uuid import UUID
+
+import anyio
+import httpx
+
+from app import models, schemas
+from app.database import SessionLocal
+from app.services import ingest_queue, ingestion_service, metadata_service
+from tests import utils
+
+HTML = """
+<html>
+  <head>
+    <title>Example Page</title>
+    <meta name='description' content='Sample description'>
+    <meta property='og:image' content='https://cdn.example.com/img.jpg'>
+  </head>
+</html>
+"""
+
+
+def test_async_ingest_returns_placeholder_then_completes(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    release = threading.Event()
+
+    def _slow_fetch(url, **_):
+        assert release.wait(10)
+        return metadata_service.HtmlFetchResult(html=HTML)
+
+    monkeypatch.setattr(ingestion_service.metadata_service, "fetch_html", _slow_fetch)
+    monkeypatch.setattr(
+        ingestion_service,
+        "_download_primary_image",
+        lambda image_url, **_: ("uploads/images/mock.jpg", None),
+    )
+
+    response = client.post(
+        "/api/items/url",
+        params={"async": "true"},
+        json={"url": "example.com/test", "tags": ["Design"]},
+        headers=headers,
+    )
+    assert response.status_code == 202, response.text
+    body = response.json()
+    assert body["status"] == "PENDING_PROCESSING"
+    assert body["title"] == "https://example.com/test"
+    assert body["extra"]["ingest"]["state"] in {"queued", "processing"}
+    assert [tag["name"] for tag in body["tags"]] == ["Design"]
+    assert response.headers["location"] == f"/api/items/{body['id']}/ingest"
+
+    pending = client.get(response.headers["location"], headers=headers).json()
+    assert pending["state"] in {"queued", "processing"}
+
+    release.set()
+    done = client.get(response.headers["location"], params={"wait": 10}, headers=headers).json()
+    assert done["state"] == "done"
+    assert done["status"] == "OK"
+
+    item = client.get(f"/api/items/{body['id']}", headers=headers).json()
+    assert item["title"] == "Example Page"
+    assert item["description"] == "Sample description"
+    assert item["file_path"] == "uploads/images/mock.jpg"
+    assert [tag["name"] for tag in item["tags"]] == ["Design"]
+
+
+def test_async_ingest_records_failures_and_keeps_requested_title(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"INGEST_ASYNC": "true"})
+    headers = utils.auth_headers(client)
+
+    def _broken_fetch(url, **_):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(ingestion_service.metadata_service, "fetch_html", _broken_fetch)
+
+    response = client.post("/api/items/url", json={"url": "example.com/broken", "title": "Mine"}, headers=headers)
+    assert response.status_code == 202, response.text
+    item_id = response.json()["id"]
+
+    failed = client.get(f"/api/items/{item_id}/ingest", params={"wait": 10}, headers=headers).json()
+    assert failed["state"] == "failed"
+    assert failed["status"] == "FAILED_FETCH"
+    assert failed["error"] == "boom"
+    assert client.get(f"/api/items/{item_id}", headers=headers).json()["title"] == "Mine"
+
+    # Explicit opt-out still saves synchronously.
+    monkeypatch.setattr(
+        ingestion_service.metadata_service,
+        "fetch_html",
+        lambda url, **_: metadata_service.HtmlFetchResult(html=HTML),
+    )
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", lambda image_url, **_: (None, None))
+    sync = client.post("/api/items/url", params={"async": "false"}, json={"url": "example.com/ok"}, headers=headers)
+    assert sync.status_code == 201
+    status = client.get(f"/api/items/{sync.json()['id']}/ingest", headers=headers).json()
+    assert status["state"] is None
+    assert status["status"] == "OK"
+
+
+def test_resumed_placeholder_is_processed_by_one_process_only(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    utils.auth_headers(client)
+    fetched: list[str] = []
+
+    def _fetch(url, **_):
+        fetched.append(url)
+        return metadata_service.HtmlFetchResult(html=HTML)
+
+    monkeypatch.setattr(ingestion_service.metadata_service, "fetch_html", _fetch)
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", lambda image_url, **_: (None, None))
+    enqueued: list = []
+    monkeypatch.setattr(ingest_queue, "enqueue", lambda item_id, user_id: enqueued.append(item_id))
+
+    with SessionLocal() as db:
+        user = db.query(models.User).one()
+        item = ingestion_service.queue_url(db, user, schemas.UrlIngestionRequest(url="example.com/once"))
+        assert ingest_queue.resume_pending(db) == 1
+    assert enqueued == [item.id]
+
+    # Two processes load the same queued placeholder before either starts on it.
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        loaded = [(db, db.get(models.User, user.id), db.get(models.Item, item.id)) for db in (first, second)]
+        results = [ingestion_service.complete_pending_item(db, owner, row) for db, owner, row in loaded]
+    finally:
+        first.close()
+        second.close()
+    assert fetched == ["https://example.com/once"]
+    # The second one found the row changed under it and only reloaded it.
+    assert [row.extra["ingest"]["state"] for row in results] == ["done", "done"]
+
+
+def test_leased_placeholder_is_not_fetched_again_until_the_lease_expires(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    utils.auth_headers(client)
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", lambda image_url, **_: (None, None))
+    monkeypatch.setattr(ingest_queue, "enqueue", lambda item_id, user_id: None)
+    with SessionLocal() as db:
+        user = db.query(models.User).one()
+        item = ingestion_service.queue_url(db, user, schemas.UrlIngestionRequest(url="example.com/lease"))
+
+    def _complete_in_new_process() -> models.Item:
+        with SessionLocal() as db:
+            row = db.get(models.Item, item.id)
+            ingestion_service.complete_pending_item(db, db.get(models.User, user.id), row)
+            return row
+
+    fetches: list[str] = []
+    seen: list = []
+
+    def _fetch(url, **_):
+        fetches.append(url)
+        title = f"Fetch {len(fetches)}"
+        if len(fetches) == 1:
+            # While process A fetches, B picks the placeholder out of its executor and C restarts.
+            seen.append(_complete_in_new_process().extra["ingest"]["state"])
+            with SessionLocal() as db:
+                seen.append(ingest_queue.resume_pending(db))
+            # Then A stalls past its lease and D takes the save over.
+            with SessionLocal() as db:
+                row = db.get(models.Item, item.id)
+                progress = {**row.extra["ingest"], "started_at": (models.utcnow() - timedelta(hours=1)).isoformat()}
+                row.extra = {**row.extra, "ingest": progress}
+                db.commit()
+            seen.append(_complete_in_new_process().title)
+        return metadata_service.HtmlFetchResult(html=HTML.replace("Example Page", title))
+
+    monkeypatch.setattr(ingestion_service.metadata_service, "fetch_html", _fetch)
+    stalled = _complete_in_new_process()
+
+    assert seen == ["processing", 0, "Fetch 2"]
+    assert len(fetches) == 2
+    # A's late result does not overwrite D's.
+    assert stalled.title == "Fetch 2"
+    assert stalled.extra["ingest"]["state"] == "done"
+
+
+def test_long_polls_do_not_hold_threadpool_threads(app_client_factory) -> None:
+    client, _ = app_client_factory(extra_env={"INGEST_ASYNC": "true", "JOB_QUEUE_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+    item_id = client.post("/api/items/url", json={"url": "example.com/remote"}, headers=headers).json()["id"]
+
+    async def _scenario() -> tuple[list[str], float]:
+        # One threadpool thread: sleeping long polls would leave none for other requests.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 1
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as http_client:
+            polls = [
+                asyncio.create_task(http_client.get(f"/api/items/{item_id}/ingest", params={"wait": 5}))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.2)
+            started = time.monotonic()
+            listing = await http_client.get("/api/items/")
+            elapsed = time.monotonic() - started
+            assert listing.status_code == 200
+
+            # A worker elsewhere finishes the save.
+            with SessionLocal() as db:
+                item = db.get(models.Item, UUID(item_id))
+                item.status = models.ItemStatus.ok
+                item.extra = {"ingest": {"state": "done"}}
+                db.commit()
+            return [(await poll).json()["state"] for poll in polls], elapsed
+
+    states, elapsed = asyncio.run(_scenario())
+    assert elapsed < 2
+    assert states == ["done", "done", "done"]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.database import SessionLocal
+from app.services import count_service
+from tests import utils
+
+
+def _create_item(client, headers, **payload):
+    body = {
+        "title": payload.get("title", "Sample"),
+        "type": payload.get("type", models.ItemType.url.value),
+        "description": payload.get("description"),
+    }
+    response = client.post("/api/items", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _total(response) -> tuple[int, str]:
+    return int(response.headers["X-Total-Count"]), response.headers["X-Total-Count-Kind"]
+
+
+def test_list_reports_exact_total_count(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    for index in range(3):
+        _create_item(client, headers, title=f"Poster {index}", type=models.ItemType.pin.value)
+    _create_item(client, headers, title="Essay", type=models.ItemType.note.value)
+
+    resp = client.get("/api/items", headers=headers, params={"limit": 2})
+    assert len(resp.json()) == 2
+    assert _total(resp) == (4, "exact")
+
+    resp = client.get("/api/items", headers=headers, params={"type": "pin", "view": "summary"})
+    assert _total(resp) == (3, "exact")
+
+    resp = client.get("/api/items", headers=headers, params={"q": "essay"})
+    assert _total(resp) == (1, "exact")
+
+    # The cached count for the unfiltered listing is dropped by the write.
+    _create_item(client, headers, title="Another")
+    resp = client.get("/api/items", headers=headers, params={"limit": 2})
+    assert _total(resp) == (5, "exact")
+
+
+def test_filter_index_answers_structured_counts(app_client_factory) -> None:
+    client, _ = app_client_factory(extra_env={"FILTER_INDEX_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+    _create_item(client, headers, title="One", type=models.ItemType.pin.value)
+    _create_item(client, headers, title="Two")
+
+    resp = client.get("/api/items", headers=headers, params={"type": "pin"})
+    assert _total(resp) == (1, "exact")
+
+
+def test_writes_from_another_process_are_not_served_from_caches(app_client_factory) -> None:
+    client, _ = app_client_factory(extra_env={"FILTER_INDEX_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+    _create_item(client, headers, title="One", type=models.ItemType.pin.value)
+    first = client.get("/api/items", headers=headers, params={"type": "pin"})
+    assert _total(first) == (1, "exact")
+
+    # What a worker process does: write and bump data_version without notifying this process.
+    with SessionLocal() as db:
+        user = db.query(models.User).one()
+        now = models.utcnow()
+        db.execute(
+            insert(models.Item).values(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                title="Two",
+                type=models.ItemType.pin,
+                status=models.ItemStatus.ok,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        db.execute(
+            update(models.User).where(models.User.id == user.id).values(data_version=models.User.data_version + 1)
+        )
+        db.commit()
+
+    second = client.get("/api/items", headers=headers, params={"type": "pin"})
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert _total(second) == (2, "exact")
+    assert [item["title"] for item in second.json()] == ["Two", "One"]
+
+
+def test_large_keyword_searches_report_planner_estimates(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"COUNT_ESTIMATE_THRESHOLD": "100"})
+    headers = utils.auth_headers(client)
+    _create_item(client, headers, title="Poster")
+    monkeypatch.setattr(count_service, "_planner_estimate", lambda db, query: 5000)
+
+    resp = client.get("/api/items", headers=headers, params={"q": "poster"})
+    assert _total(resp) == (5000, "estimate")
+
+    monkeypatch.setattr(count_service, "_planner_estimate", lambda db, query: 20)
+    resp = client.get("/api/items", headers=headers, params={"q": "poster", "type": "url"})
+    assert _total(resp) == (1, "exact")
+
+
+def test_explain_wraps_statement_for_postgres() -> None:
+    with SessionLocal() as db:
+        statement = db.query(models.Item.id).filter(models.Item.title == "x").statement
+    sql = str(count_service._Explain(statement).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT items.id")
+    assert "%(title_1)s" in sql
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+import numpy as np
+
+from app import models
+from app.database import SessionLocal
+from app.services import dedup_service, ingestion_service, metadata_service
+from tests import utils
+
+TWEET = (
+    "Shipping a new vector index today: memory mapped float32 rows, argpartition "
+    "for top k, and incremental upserts after every commit"
+)
+
+
+def _stub_fetch(monkeypatch, title: str, description: str) -> None:
+    html = f"<html><head><title>{title}</title><meta name='description' content='{description}'></head></html>"
+    monkeypatch.setattr(
+        ingestion_service.metadata_service,
+        "fetch_html",
+        lambda url, **_: metadata_service.HtmlFetchResult(html=html),
+    )
+
+
+def test_canonical_url_drops_tracking_and_folds_twitter_mirrors() -> None:
+    assert dedup_service.canonical_url("https://www.example.com/a/?utm_source=x&b=2&a=1&fbclid=z") == "example.com/a?a=1&b=2"
+    assert dedup_service.canonical_url("https://twitter.com/alice/status/123?s=20&t=abc") == "x.com/i/status/123"
+    assert dedup_service.canonical_url("vxtwitter.com/alice/status/123") == "x.com/i/status/123"
+    assert dedup_service.canonical_url(None) is None
+
+
+def test_signatures_estimate_jaccard_and_skip_short_text() -> None:
+    base = dedup_service.shingle_hashes(TWEET)
+    wrapped = dedup_service.shingle_hashes(f"RT @bob: {TWEET} https://t.co/abc123")
+    other = dedup_service.shingle_hashes("Completely unrelated notes about sourdough starters and flour hydration levels")
+    short = dedup_service.shingle_hashes("Hi there")
+    signatures = dedup_service.signatures([base, wrapped, other, short])
+    assert signatures[3] is None
+    assert dedup_service.similarity(signatures[0], signatures[1]) == 1.0
+    assert dedup_service.similarity(signatures[0], signatures[2]) < 0.2
+
+    # Chunked hashing gives the same result as hashing each set alone.
+    many = [dedup_service.shingle_hashes(f"{TWEET} variant {index}") for index in range(20)]
+    batched = dedup_service.signatures(many)
+    assert all(np.array_equal(batched[index], dedup_service.signatures([many[index]])[0]) for index in (0, 7, 19))
+
+
+def test_url_ingest_flags_near_duplicates(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    _stub_fetch(monkeypatch, "Vector index launch", TWEET)
+    first = client.post("/api/items/url", json={"url": "https://example.com/post?id=1"}, headers=headers)
+    assert first.status_code == 201, first.text
+    assert (first.json()["extra"] or {}).get("duplicate_of") is None
+
+    _stub_fetch(monkeypatch, "Vector index launch", f"RT @carol: {TWEET}")
+    second = client.post("/api/items/url", json={"url": "https://example.org/mirror"}, headers=headers)
+    assert second.json()["extra"]["duplicate_of"] == first.json()["id"]
+    assert second.json()["extra"]["duplicate_score"] >= 0.8
+
+    _stub_fetch(monkeypatch, "Different page", "Nothing in common with the other saves at all really")
+    resave = client.post(
+        "/api/items/url",
+        json={"url": "https://example.com/post?utm_campaign=spring&id=1"},
+        headers=headers,
+    )
+    assert resave.json()["extra"] == {"duplicate_of": first.json()["id"], "duplicate_score": 1.0}
+
+
+def test_merge_mode_folds_repeat_saves_into_existing_item(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"DEDUP_MODE": "merge"})
+    headers = utils.auth_headers(client)
+    _stub_fetch(monkeypatch, "Vector index launch", TWEET)
+    first = client.post("/api/items/url", json={"url": "https://x.com/alice/status/42", "tags": ["ml"]}, headers=headers)
+    again = client.post(
+        "/api/items/url",
+        json={"url": "https://twitter.com/alice/status/42?s=20", "tags": ["Later"]},
+        headers=headers,
+    )
+    assert again.json()["id"] == first.json()["id"]
+    assert sorted(tag["name"] for tag in again.json()["tags"]) == ["Later", "ml"]
+
+    with SessionLocal() as db:
+        assert db.query(models.Item).count() == 1
+        client.delete(f"/api/items/{first.json()['id']}", headers=headers)
+        assert db.query(models.ItemLshBand).count() == 0
+
+
+def test_index_items_keeps_updated_at_and_marks_short_items(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    item = client.post("/api/items", json={"title": "Short", "type": "note"}, headers=headers).json()
+    with SessionLocal() as db:
+        stored = db.get(models.Item, UUID(item["id"]))
+        before = stored.updated_at
+        assert stored.minhash == b""
+        assert dedup_service.index_items(db, [stored.id]) == 1
+        db.commit()
+        db.refresh(stored)
+        assert stored.updated_at == before
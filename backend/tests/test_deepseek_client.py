@@ -41,7 +41,7 @@ def test_generate_tags_success(monkeypatch, caplog):
         return _DummyResponse(_payload=payload)
 
     json_module = json
-    monkeypatch.setattr(deepseek_client.httpx, "post", _fake_post)
+    monkeypatch.setattr(deepseek_client.http, "post", _fake_post)
 
     result = deepseek_client.generate_tags_for_text("Example tweet text", max_tags=5)
 
@@ -57,7 +57,7 @@ def test_generate_tags_handles_http_error(monkeypatch, caplog):
     def _fake_post(*args, **kwargs):
         raise httpx.TimeoutException("timeout")
 
-    monkeypatch.setattr(deepseek_client.httpx, "post", _fake_post)
+    monkeypatch.setattr(deepseek_client.http, "post", _fake_post)
 
     result = deepseek_client.generate_tags_for_text("Example tweet text")
 
@@ -73,7 +73,7 @@ def test_generate_tags_handles_bad_json(monkeypatch, caplog):
         payload = {"choices": [{"message": {"content": "not-json"}}]}
         return _DummyResponse(_payload=payload)
 
-    monkeypatch.setattr(deepseek_client.httpx, "post", _fake_post)
+    monkeypatch.setattr(deepseek_client.http, "post", _fake_post)
 
     result = deepseek_client.generate_tags_for_text("Example tweet text")
 
@@ -92,7 +92,7 @@ def test_generate_tags_handles_json_code_fence(monkeypatch):
         payload = {"choices": [{"message": {"content": fenced_content}}]}
         return _DummyResponse(_payload=payload)
 
-    monkeypatch.setattr(deepseek_client.httpx, "post", _fake_post)
+    monkeypatch.setattr(deepseek_client.http, "post", _fake_post)
 
     result = deepseek_client.generate_tags_for_text("Example tweet text", max_tags=4)
 
@@ -108,7 +108,7 @@ def test_generate_tags_handles_non_json_text(monkeypatch, caplog):
         payload = {"choices": [{"message": {"content": "I cannot tag this."}}]}
         return _DummyResponse(_payload=payload)
 
-    monkeypatch.setattr(deepseek_client.httpx, "post", _fake_post)
+    monkeypatch.setattr(deepseek_client.http, "post", _fake_post)
 
     result = deepseek_client.generate_tags_for_text("Example tweet text")
 
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from app import models
+from app.database import SessionLocal
+from app.services import items_service
+from tests import utils
+
+
+def _create_item(client, headers, title="Sample"):
+    response = client.post("/api/items", json={"title": title, "type": "note"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_list_detail_and_tags_answer_304_until_data_changes(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    item = _create_item(client, headers)
+    client.put(f"/api/items/{item['id']}/tags", json={"tags": ["one"]}, headers=headers)
+
+    for path, params in (
+        ("/api/items/", {"limit": 5}),
+        ("/api/items/", {"limit": 5, "view": "summary"}),
+        (f"/api/items/{item['id']}", None),
+        (f"/api/items/{item['id']}/tags", None),
+        ("/api/tags/", None),
+    ):
+        first = client.get(path, headers=headers, params=params)
+        assert first.status_code == 200, path
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"') and first.headers["Cache-Control"] == "private, no-cache"
+
+        again = client.get(path, headers={**headers, "If-None-Match": etag}, params=params)
+        assert again.status_code == 304, path
+        assert again.content == b""
+        assert again.headers["ETag"] == etag
+
+    first = client.get("/api/items/", headers=headers, params={"limit": 5})
+    etag = first.headers["ETag"]
+    other = client.get("/api/items/", headers={**headers, "If-None-Match": etag}, params={"limit": 6})
+    assert other.status_code == 200
+    gzipped = client.get("/api/items/", headers={**headers, "Accept-Encoding": "gzip"}, params={"limit": 5})
+    assert gzipped.headers["ETag"] == etag
+    # Comparison is weak, so a tag whose W/ prefix was dropped on the way still matches.
+    stripped = client.get("/api/items/", headers={**headers, "If-None-Match": etag[2:]}, params={"limit": 5})
+    assert stripped.status_code == 304
+
+    # 304s must not touch the list query at all.
+    def _fail(*args, **kwargs):
+        raise AssertionError("list_items should not run for a matching ETag")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(items_service, "list_items", _fail)
+        assert client.get(
+            "/api/items/", headers={**headers, "If-None-Match": etag}, params={"limit": 5}
+        ).status_code == 304
+
+    _create_item(client, headers, title="Second")
+    changed = client.get("/api/items/", headers={**headers, "If-None-Match": etag}, params={"limit": 5})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_every_write_bumps_the_data_version(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    def _version() -> int:
+        with SessionLocal() as db:
+            return db.query(models.User.data_version).scalar()
+
+    seen = [_version()]
+    item = _create_item(client, headers)
+    seen.append(_version())
+    client.patch(f"/api/items/{item['id']}", json={"title": "Renamed"}, headers=headers)
+    seen.append(_version())
+    client.put(f"/api/items/{item['id']}/tags", json={"tags": ["x"]}, headers=headers)
+    seen.append(_version())
+    tag = client.post("/api/tags", json={"name": "y"}, headers=headers).json()
+    seen.append(_version())
+    client.delete(f"/api/tags/{tag['id']}", headers=headers)
+    seen.append(_version())
+    client.delete(f"/api/items/{item['id']}", headers=headers)
+    seen.append(_version())
+    assert seen == sorted(set(seen))
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+
+from app import models, schemas
+from app.core.config import get_settings
+from app.database import SessionLocal
+from app.services import filter_index, items_service
+
+
+def _create_user(db) -> models.User:
+    user = models.User(
+        email=f"index-{uuid4().hex[:6]}@example.com",
+        username=f"index_{uuid4().hex[:6]}",
+        password_hash="hash",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _seed(db, user) -> list[models.Item]:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    specs = [
+        ("Pin A", models.ItemType.pin, "https://pinterest.com/a", ["Design", "Color"]),
+        ("Tweet A", models.ItemType.tweet, "https://x.com/a/status/1", ["Design"]),
+        ("Pin B", models.ItemType.pin, "https://pinterest.com/b", ["Color"]),
+        ("Note", models.ItemType.note, None, []),
+        ("Tweet B", models.ItemType.tweet, "https://x.com/b/status/2", ["Design", "Color"]),
+    ]
+    items = []
+    for offset, (title, item_type, url, tags) in enumerate(specs):
+        # Two items share a timestamp to exercise the id tiebreaker.
+        created_at = base + timedelta(days=min(offset, 3))
+        item = items_service.create_item(
+            db,
+            user,
+            schemas.ItemCreate(title=title, type=item_type, source_url=url),
+            created_at=created_at,
+        )
+        if tags:
+            item = items_service.set_item_tags(db, user, item, tags)
+        items.append(item)
+    return items
+
+
+def _ids(items) -> list:
+    return [item.id for item in items]
+
+
+def _row_domains(index) -> list:
+    names = {domain_id: domain for domain, domain_id in index.domains.items()}
+    return [names.get(domain_id) for domain_id in index.domain_ids]
+
+
+def test_index_matches_sql_for_filters_and_paging(app_client_factory, monkeypatch) -> None:
+    app_client_factory()
+    db = SessionLocal()
+    try:
+        user = _create_user(db)
+        _seed(db, user)
+        cases = [
+            {},
+            {"item_type": models.ItemType.pin},
+            {"origin_domain": "X.com"},
+            {"origin_domain": "unknown.dev"},
+            {"tag_names": ["design", "color"]},
+            {"tag_name": "Color", "item_type": models.ItemType.tweet},
+            {"tag_names": ["missing"]},
+            {"created_from": datetime(2025, 1, 2, tzinfo=timezone.utc)},
+            {"created_to": datetime(2025, 1, 3, tzinfo=timezone.utc), "limit": 2, "offset": 1},
+        ]
+        expected = [_ids(items_service.list_items(db, user, **case)) for case in cases]
+
+        monkeypatch.setenv("FILTER_INDEX_ENABLED", "true")
+        get_settings.cache_clear()
+        filter_index.reset()
+        actual = [_ids(items_service.list_items(db, user, **case)) for case in cases]
+        assert actual == expected
+
+        walked = []
+        cursor = None
+        while True:
+            page = items_service.list_items(db, user, limit=2, cursor=cursor)
+            walked.extend(_ids(page))
+            if len(page) < 2:
+                break
+            cursor = items_service.encode_cursor(page[-1])
+        assert walked == expected[0]
+    finally:
+        db.close()
+        get_settings.cache_clear()
+
+
+def test_index_is_invalidated_by_writes(app_client_factory) -> None:
+    app_client_factory(extra_env={"FILTER_INDEX_ENABLED": "true"})
+    db = SessionLocal()
+    try:
+        user = _create_user(db)
+        items = _seed(db, user)
+        assert len(items_service.list_items(db, user, tag_name="design")) == 3
+
+        items_service.set_item_tags(db, user, items[0], ["Color"])
+        assert len(items_service.list_items(db, user, tag_name="design")) == 2
+
+        items_service.delete_item(db, items[1])
+        assert len(items_service.list_items(db, user, tag_name="design")) == 1
+
+        created = items_service.create_item(db, user, schemas.ItemCreate(title="Fresh"))
+        assert items_service.list_items(db, user, limit=1)[0].id == created.id
+    finally:
+        db.close()
+
+
+def test_item_writes_patch_the_index_in_place(app_client_factory, monkeypatch) -> None:
+    app_client_factory(extra_env={"FILTER_INDEX_ENABLED": "true"})
+    db = SessionLocal()
+    try:
+        user = _create_user(db)
+        items = _seed(db, user)
+        items_service.list_items(db, user)
+
+        builds = []
+        real_build = filter_index.build_index
+        monkeypatch.setattr(
+            filter_index, "build_index", lambda *args: builds.append(args) or real_build(*args)
+        )
+        items_service.set_item_tags(db, user, items[0], ["Color", "Fresh"])
+        items_service.delete_item(db, items[1])
+        items_service.update_item(db, items[2], schemas.ItemUpdate(source_url="https://x.com/c/status/3"))
+        items_service.create_item(
+            db,
+            user,
+            schemas.ItemCreate(title="Tie", type=models.ItemType.pin),
+            created_at=datetime(2025, 1, 4, tzinfo=timezone.utc),
+        )
+        assert len(items_service.list_items(db, user, tag_name="design")) == 1
+        db.refresh(user)
+        # The index followed this process's own writes to the current data_version.
+        patched = filter_index.get_index(db, user.id, version=user.data_version)
+        assert builds == []
+        rebuilt = real_build(db, user.id)
+        assert patched.ids == rebuilt.ids
+        assert patched.positions == rebuilt.positions
+        for column in ("created_us", "type_codes", "status_codes"):
+            assert np.array_equal(getattr(patched, column), getattr(rebuilt, column))
+        assert _row_domains(patched) == _row_domains(rebuilt)
+        assert patched.tag_bits.keys() == rebuilt.tag_bits.keys()
+        for name, bits in rebuilt.tag_bits.items():
+            assert np.array_equal(patched.tag_bits[name], bits)
+
+        items_service.batch_update_tags(db, user, action="add", tag_names=["Bulk"], filters={})
+        filter_index.get_index(db, user.id)
+        assert len(builds) == 1
+    finally:
+        db.close()
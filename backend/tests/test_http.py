@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.core import http
+from app.core.config import reset_settings
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    """Install a shared client whose transport answers from ``handler``."""
+    monkeypatch.setenv("HTTP_MAX_CONNECTIONS_PER_HOST", "2")
+    reset_settings()
+    http.close()
+
+    def _install(handler) -> httpx.Client:
+        client = httpx.Client(transport=httpx.MockTransport(handler), **http._client_options())
+        monkeypatch.setattr(http, "_client", client)
+        return client
+
+    yield _install
+    http.close()
+    reset_settings()
+
+
+def test_client_is_shared_until_closed() -> None:
+    try:
+        client = http.get_client()
+        assert http.get_client() is client
+        http.close()
+        assert client.is_closed
+        assert http.get_client() is not client
+    finally:
+        asyncio.run(http.aclose())
+
+
+def test_requests_per_host_are_capped(mock_client) -> None:
+    lock = threading.Lock()
+    in_flight: Counter[str] = Counter()
+    peak: Counter[str] = Counter()
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.05)
+        with lock:
+            in_flight[host] -= 1
+        return httpx.Response(200, text="ok")
+
+    mock_client(_handler)
+    urls = ["https://busy.example.com/page"] * 6 + ["https://other.example.com/page"] * 2
+    threads = [threading.Thread(target=http.get, args=(url,)) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak["busy.example.com"] == 2
+    assert peak["other.example.com"] == 2
+
+
+def test_cookies_are_not_kept_between_requests(mock_client) -> None:
+    seen: list[str | None] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"set-cookie": "session=abc; Path=/"})
+
+    mock_client(_handler)
+    http.get("https://example.com/one")
+    http.post("https://example.com/two", json={"a": 1})
+
+    assert seen == [None, None]
+
+
+def test_waiting_for_a_host_slot_times_out(mock_client) -> None:
+    release = threading.Event()
+    in_handler = threading.Semaphore(0)
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        in_handler.release()
+        release.wait(5)
+        return httpx.Response(200, text="ok")
+
+    mock_client(_handler)
+    url = "https://slow.example.com/page"
+    busy = [threading.Thread(target=http.get, args=(url,)) for _ in range(2)]
+    for thread in busy:
+        thread.start()
+    try:
+        # Both slots are taken once both requests reach the transport.
+        assert in_handler.acquire(timeout=5) and in_handler.acquire(timeout=5)
+        with pytest.raises(httpx.PoolTimeout):
+            http.get(url, timeout=httpx.Timeout(5.0, pool=0.1))
+    finally:
+        release.set()
+        for thread in busy:
+            thread.join()
+
+
+def test_idle_host_slots_are_evicted(mock_client, monkeypatch) -> None:
+    monkeypatch.setattr(http, "MAX_TRACKED_HOSTS", 4)
+    mock_client(lambda request: httpx.Response(200, text="ok"))
+
+    for number in range(10):
+        http.get(f"https://site{number}.example.com/")
+
+    assert len(http._host_slots) == 4
+    assert "site9.example.com" in http._host_slots._slots
+    assert "site0.example.com" not in http._host_slots._slots
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import io
+import random
+from uuid import uuid4
+
+import numpy as np
+from PIL import Image
+
+from app.core import storage
+from app.services import image_hash_service, ingestion_service, metadata_service
+from tests import utils
+
+
+def _gradient_image(size: int = 96, *, flip: bool = False) -> Image.Image:
+    ramp = np.linspace(0, 255, size, dtype=np.uint8)
+    pixels = np.add.outer(ramp // 2, ramp // 2).astype(np.uint8)
+    pixels[size // 4 : size // 2, size // 4 : size // 2] = 255
+    if flip:
+        pixels = pixels[:, ::-1]
+    return Image.fromarray(pixels, mode="L").convert("RGB")
+
+
+def _encode(image: Image.Image, fmt: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_dhash_is_stable_under_resizing_and_reencoding() -> None:
+    original = _gradient_image()
+    resized = original.resize((64, 64))
+    reencoded = Image.open(io.BytesIO(_encode(original, "JPEG")))
+    base = image_hash_service.dhash(original)
+    assert image_hash_service.hamming(base, image_hash_service.dhash(resized)) <= 2
+    assert image_hash_service.hamming(base, image_hash_service.dhash(reencoded)) <= 2
+    assert image_hash_service.hamming(base, image_hash_service.dhash(_gradient_image(flip=True))) > 20
+    assert image_hash_service.to_unsigned(image_hash_service.to_signed(base)) == base
+
+
+def test_bk_tree_matches_brute_force() -> None:
+    rng = random.Random(7)
+    values = [(rng.getrandbits(64), uuid4()) for _ in range(300)]
+    tree = image_hash_service.BKTree()
+    for value, item_id in values:
+        tree.add(image_hash_service.to_signed(value), item_id)
+    probe = values[0][0] ^ 0b1011
+    expected = {item_id for value, item_id in values if (value ^ probe).bit_count() <= 28}
+    hits = tree.search(probe, 28)
+    assert {item_id for item_id, _ in hits} == expected
+    assert [distance for _, distance in hits] == sorted(distance for _, distance in hits)
+
+
+def test_uploads_are_hashed_and_clustered(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    ids = []
+    for name, image in (
+        ("a.png", _gradient_image()),
+        ("b.jpg", _gradient_image(80)),
+        ("c.png", _gradient_image(flip=True)),
+    ):
+        content_type = "image/jpeg" if name.endswith("jpg") else "image/png"
+        fmt = "JPEG" if name.endswith("jpg") else "PNG"
+        response = client.post(
+            "/api/items/upload",
+            headers=headers,
+            files=[("file", (name, io.BytesIO(_encode(image, fmt)), content_type))],
+        )
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+
+    resp = client.get("/api/items/duplicates/images", headers=headers)
+    assert resp.status_code == 200, resp.text
+    clusters = resp.json()
+    assert len(clusters) == 1
+    assert [item["id"] for item in clusters[0]["items"]] == ids[:2]
+    assert "text_content" not in clusters[0]["items"][0]
+
+    assert client.get("/api/items/duplicates/images", headers=headers, params={"radius": 64}).status_code == 422
+
+
+def test_downloaded_duplicates_reuse_the_stored_file(app_client_factory, monkeypatch) -> None:
+    client, storage_root = app_client_factory()
+    headers = utils.auth_headers(client)
+    image_bytes = _encode(_gradient_image())
+
+    def _fake_download(image_url, **_):
+        relative = storage.build_image_path(uuid4(), variant="url", ext="png")
+        storage.resolve_storage_path(relative).write_bytes(image_bytes)
+        return relative, None
+
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", _fake_download)
+    first_url, second_url = "https://pbs.twimg.com/media/one.png", "https://i.pinimg.com/originals/two.png"
+    items = []
+    for page, image_url in (("https://example.com/a", first_url), ("https://example.org/b", second_url)):
+        html = f"<html><head><title>{page}</title><meta property='og:image' content='{image_url}'></head></html>"
+        monkeypatch.setattr(
+            ingestion_service.metadata_service,
+            "fetch_html",
+            lambda url, html=html, **_: metadata_service.HtmlFetchResult(html=html),
+        )
+        response = client.post("/api/items/url", json={"url": page}, headers=headers)
+        assert response.status_code == 201, response.text
+        items.append(response.json())
+
+    assert items[0]["file_path"] == items[1]["file_path"]
+    assert len(list((storage_root / "uploads" / "images").iterdir())) == 1
+
+    # The shared file survives until its last item is deleted.
+    shared = storage_root / items[0]["file_path"]
+    assert client.delete(f"/api/items/{items[0]['id']}", headers=headers).status_code == 204
+    assert shared.exists()
+    assert client.delete(f"/api/items/{items[1]['id']}", headers=headers).status_code == 204
+    assert not shared.exists()
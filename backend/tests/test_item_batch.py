@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from app import models
+from app.database import SessionLocal
+from app.services import items_service
+from tests import utils
+
+
+def _create_item(client, headers, title):
+    response = client.post("/api/items", json={"title": title, "type": "note"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_batch_returns_requested_order_with_missing_markers(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    first = _create_item(client, headers, "First")
+    second = _create_item(client, headers, "Second")
+    client.put(f"/api/items/{second['id']}/tags", json={"tags": ["keep"]}, headers=headers)
+    missing = str(uuid4())
+
+    resp = client.get(
+        "/api/items/batch",
+        headers=headers,
+        params={"ids": [f"{second['id']},{missing}", first["id"]]},
+    )
+    assert resp.status_code == 200, resp.text
+    entries = resp.json()
+    assert [entry["id"] for entry in entries] == [second["id"], missing, first["id"]]
+    assert [entry["status"] for entry in entries] == ["ok", "not_found", "ok"]
+    assert entries[0]["item"]["tags"][0]["name"] == "keep"
+    assert entries[1]["item"] is None
+    assert entries[2]["item"]["title"] == "First"
+
+    resp = client.post("/api/items/batch", headers=headers, json={"ids": [first["id"], first["id"]]})
+    assert resp.status_code == 200
+    assert [entry["item"]["id"] for entry in resp.json()] == [first["id"], first["id"]]
+
+
+def test_batch_hides_other_users_items_and_validates_input(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    with SessionLocal() as db:
+        stranger = models.User(email="other@example.com", username="other", password_hash="hash")
+        db.add(stranger)
+        db.flush()
+        foreign = models.Item(user_id=stranger.id, title="Not yours", type=models.ItemType.note)
+        db.add(foreign)
+        db.commit()
+        foreign_id = str(foreign.id)
+
+    resp = client.post("/api/items/batch", headers=headers, json={"ids": [foreign_id]})
+    assert resp.json() == [{"id": foreign_id, "status": "not_found", "item": None}]
+
+    resp = client.get("/api/items/batch", headers=headers, params={"ids": "not-a-uuid"})
+    assert resp.status_code == 400
+
+    monkeypatch.setattr(items_service, "MAX_BATCH_IDS", 2)
+    resp = client.post(
+        "/api/items/batch",
+        headers=headers,
+        json={"ids": [str(uuid4()) for _ in range(3)]},
+    )
+    assert resp.status_code == 400
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from app import models
+from app.database import SessionLocal
+from tests import utils
+
+
+def _create_item(client, headers, title, item_type="note"):
+    response = client.post("/api/items", json={"title": title, "type": item_type}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _set_created_at(item_id: str, value: datetime) -> None:
+    with SessionLocal() as db:
+        db.get(models.Item, UUID(item_id)).created_at = value
+        db.commit()
+
+
+def _export(client, headers, **params) -> list[dict]:
+    response = client.get("/api/items/export", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_export_streams_all_items_and_resumes_from_cursor(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    base = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    created = []
+    for index in range(5):
+        item = _create_item(client, headers, f"Item {index}", "pin" if index % 2 else "note")
+        _set_created_at(item["id"], base + timedelta(hours=index))
+        created.append(item)
+    client.put(f"/api/items/{created[4]['id']}/tags", json={"tags": ["Latest"]}, headers=headers)
+
+    lines = _export(client, headers)
+    assert [line["item"]["id"] for line in lines] == [item["id"] for item in reversed(created)]
+    assert lines[0]["item"]["tags"][0]["name"] == "Latest"
+    assert lines[0]["item"]["text_content"] is None
+
+    resumed = _export(client, headers, cursor=lines[1]["cursor"])
+    assert [line["item"]["id"] for line in resumed] == [line["item"]["id"] for line in lines[2:]]
+
+    pins = _export(client, headers, type="pin")
+    assert {line["item"]["type"] for line in pins} == {"pin"}
+    assert len(pins) == 2
+
+
+def test_export_rejects_bad_cursor(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    response = client.get("/api/items/export", headers=headers, params={"cursor": "nope"})
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app import models
+from app.database import SessionLocal
+from tests import utils
+
+
+def _create_item(client, headers, *, tags=(), **payload):
+    body = {
+        "title": payload.get("title", "Sample"),
+        "type": payload.get("type", models.ItemType.url.value),
+        "source_url": payload.get("source_url"),
+        "description": payload.get("description"),
+        "status": payload.get("status", models.ItemStatus.ok.value),
+    }
+    response = client.post("/api/items", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    item = response.json()
+    if tags:
+        resp = client.put(f"/api/items/{item['id']}/tags", json={"tags": list(tags)}, headers=headers)
+        assert resp.status_code == 200, resp.text
+    return item
+
+
+def _set_created_at(item_id: str, value: datetime) -> None:
+    db = SessionLocal()
+    try:
+        record = db.get(models.Item, UUID(item_id))
+        record.created_at = value
+        db.commit()
+    finally:
+        db.close()
+
+
+def _counts(entries) -> dict:
+    return {entry["value"]: entry["count"] for entry in entries}
+
+
+def test_facets_count_matching_items(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    first = _create_item(
+        client,
+        headers,
+        title="Palette",
+        type=models.ItemType.pin.value,
+        source_url="https://pinterest.com/a",
+        tags=["Design", "Color"],
+    )
+    second = _create_item(
+        client,
+        headers,
+        title="Thread",
+        type=models.ItemType.tweet.value,
+        source_url="https://x.com/a/status/1",
+        tags=["design"],
+    )
+    third = _create_item(
+        client,
+        headers,
+        title="Broken",
+        status=models.ItemStatus.failed.value,
+        source_url="https://pinterest.com/b",
+    )
+    _set_created_at(first["id"], datetime(2025, 1, 5, tzinfo=timezone.utc))
+    _set_created_at(second["id"], datetime(2025, 2, 5, tzinfo=timezone.utc))
+    _set_created_at(third["id"], datetime(2025, 2, 9, tzinfo=timezone.utc))
+
+    resp = client.get("/api/items/facets", headers=headers)
+    assert resp.status_code == 200, resp.text
+    facets = resp.json()
+    assert _counts(facets["type"]) == {"pin": 1, "tweet": 1, "url": 1}
+    assert _counts(facets["status"]) == {"OK": 2, "FAILED_FETCH": 1}
+    assert facets["origin_domain"][0] == {"value": "pinterest.com", "count": 2}
+    assert facets["tags"] == [
+        {"value": "Design", "count": 2},
+        {"value": "Color", "count": 1},
+    ]
+    assert facets["month"] == [
+        {"value": "2025-02", "count": 2},
+        {"value": "2025-01", "count": 1},
+    ]
+
+    resp = client.get(
+        "/api/items/facets",
+        headers=headers,
+        params={"tags": ["design"], "top": 1},
+    )
+    facets = resp.json()
+    assert _counts(facets["type"]) == {"pin": 1, "tweet": 1}
+    assert facets["tags"] == [{"value": "Design", "count": 2}]
+
+
+def test_facets_cache_is_invalidated_by_writes(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    _create_item(client, headers, title="One", type=models.ItemType.note.value)
+    resp = client.get("/api/items/facets", headers=headers)
+    assert _counts(resp.json()["type"]) == {"note": 1}
+
+    created = _create_item(client, headers, title="Two", type=models.ItemType.note.value)
+    resp = client.get("/api/items/facets", headers=headers)
+    assert _counts(resp.json()["type"]) == {"note": 2}
+
+    assert client.delete(f"/api/items/{created['id']}", headers=headers).status_code == 204
+    resp = client.get("/api/items/facets", headers=headers)
+    assert _counts(resp.json()["type"]) == {"note": 1}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+
+from app.database import get_engine
+from tests import utils
+
+
+def _ndjson(*rows) -> bytes:
+    return b"".join(
+        (row if isinstance(row, bytes) else json.dumps(row).encode()) + b"\n" for row in rows
+    )
+
+
+def test_import_inserts_batches_and_reports_bad_lines(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    client.post("/api/tags", json={"name": "Design"}, headers=headers)
+
+    body = _ndjson(
+        {"title": "Poster", "type": "pin", "source_url": "https://pinterest.com/pin/1", "tags": ["design", "Print"]},
+        b"{not json",
+        {"title": "Essay", "type": "note", "created_at": "2024-05-01T10:00:00Z", "tags": ["print"]},
+        {"type": "note"},
+        b"",
+        {"cursor": "ignored", "item": {"title": "Exported", "type": "url", "tags": [{"id": "x", "name": "Design"}]}},
+    )
+    resp = client.post(
+        "/api/items/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        params={"batch_size": 2},
+        content=body,
+    )
+    assert resp.status_code == 200, resp.text
+    result = resp.json()
+    assert result["created"] == 3
+    assert result["error_count"] == 2
+    assert [error["line"] for error in result["errors"]] == [2, 4]
+    assert result["errors"][1]["error"].startswith("title")
+
+    items = {item["title"]: item for item in client.get("/api/items", headers=headers).json()}
+    assert set(items) == {"Poster", "Essay", "Exported"}
+    assert items["Poster"]["origin_domain"] == "pinterest.com"
+    assert sorted(tag["name"] for tag in items["Poster"]["tags"]) == ["Design", "Print"]
+    assert items["Essay"]["created_at"].startswith("2024-05-01T10:00:00")
+
+    tags = {tag["name"]: tag["item_count"] for tag in client.get("/api/tags", headers=headers).json()}
+    assert tags == {"Design": 2, "Print": 2}
+
+    # Imported text is searchable straight away.
+    found = client.get("/api/items", headers=headers, params={"q": "essay"}).json()
+    assert [item["title"] for item in found] == ["Essay"]
+
+
+def test_import_accepts_its_own_export(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    client.post("/api/items", json={"title": "Round trip", "type": "note"}, headers=headers)
+    exported = client.get("/api/items/export", headers=headers).content
+
+    resp = client.post("/api/items/import", headers=headers, content=exported)
+    assert resp.json() == {"created": 1, "error_count": 0, "errors": []}
+    titles = [item["title"] for item in client.get("/api/items", headers=headers).json()]
+    assert titles.count("Round trip") == 2
+
+
+def test_database_error_reports_only_the_failing_line(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    with get_engine().begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TRIGGER reject_broken BEFORE INSERT ON items WHEN NEW.title = 'Broken' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected by trigger'); END"
+        )
+
+    body = _ndjson(
+        {"title": "First", "type": "note", "tags": ["Kept"]},
+        {"title": "Broken", "type": "note", "tags": ["Lost"]},
+        {"title": "Third", "type": "note", "tags": ["Kept"]},
+    )
+    resp = client.post("/api/items/import", headers=headers, params={"batch_size": 10}, content=body)
+    assert resp.status_code == 200, resp.text
+    result = resp.json()
+    assert result["created"] == 2
+    assert result["error_count"] == 1
+    assert [error["line"] for error in result["errors"]] == [2]
+
+    titles = sorted(item["title"] for item in client.get("/api/items", headers=headers).json())
+    assert titles == ["First", "Third"]
+    tags = {tag["name"]: tag["item_count"] for tag in client.get("/api/tags", headers=headers).json()}
+    assert tags == {"Kept": 2}
+    found = client.get("/api/items", headers=headers, params={"q": "third"}).json()
+    assert [item["title"] for item in found] == ["Third"]
+
+
+def test_overlong_lines_are_reported_without_being_buffered(app_client_factory) -> None:
+    client, _ = app_client_factory(extra_env={"IMPORT_MAX_LINE_BYTES": "1024"})
+    headers = utils.auth_headers(client)
+    long_note = json.dumps({"title": "Long", "type": "note", "text_content": "x" * 5000}).encode()
+    body = _ndjson({"title": "Short", "type": "note"}, long_note, {"title": "After", "type": "note"}) + long_note
+
+    def _chunks():
+        # Small chunks, so the long lines arrive in pieces.
+        for start in range(0, len(body), 700):
+            yield body[start:start + 700]
+
+    resp = client.post("/api/items/import", headers=headers, content=_chunks())
+    assert resp.status_code == 200, resp.text
+    result = resp.json()
+    assert result["created"] == 2
+    assert [(error["line"], error["error"]) for error in result["errors"]] == [
+        (2, "Line is longer than IMPORT_MAX_LINE_BYTES"),
+        (4, "Line is longer than IMPORT_MAX_LINE_BYTES"),
+    ]
+    titles = sorted(item["title"] for item in client.get("/api/items", headers=headers).json())
+    assert titles == ["After", "Short"]
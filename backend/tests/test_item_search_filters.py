@@ -137,4 +137,78 @@ def test_pagination_uses_limit_and_offset(app_client_factory) -> None:
     assert [item["id"] for item in resp.json()] == [second["id"]]
 
     resp = client.get("/api/items", headers=headers, params={"limit": 2, "offset": 1})
-    assert [item["id"] for item in resp.json()] == [second["id"], first["id"]]
\ No newline at end of file
+    assert [item["id"] for item in resp.json()] == [second["id"], first["id"]]
+
+
+def test_cursor_pagination_walks_all_pages(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    created = [_create_item(client, headers, title=f"Item {idx}") for idx in range(5)]
+    same_moment = datetime.now(timezone.utc) - timedelta(hours=1)
+    # Force a created_at tie so the id tiebreaker is exercised.
+    _set_created_at(created[1]["id"], same_moment)
+    _set_created_at(created[2]["id"], same_moment)
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/items", headers=headers, params=params)
+        assert resp.status_code == 200, resp.text
+        seen.extend(item["id"] for item in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(item["id"] for item in created)
+    assert len(seen) == len(set(seen))
+    resp = client.get("/api/items", headers=headers, params={"limit": 5})
+    assert [item["id"] for item in resp.json()] == seen
+
+
+def test_invalid_cursor_rejected(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    resp = client.get("/api/items", headers=headers, params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_summary_view_and_sparse_fields_skip_heavy_columns(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+
+    created = _create_item(
+        client,
+        headers,
+        title="Report",
+        type=models.ItemType.pdf.value,
+        text_content="x" * 5000,
+    )
+    db = SessionLocal()
+    try:
+        record = db.get(models.Item, UUID(created["id"]))
+        record.extra = {"media_kind": "image", "author": "Someone", "raw_debug": "y" * 500}
+        db.commit()
+    finally:
+        db.close()
+    client.put(f"/api/items/{created['id']}/tags", json={"tags": ["Docs"]}, headers=headers)
+
+    resp = client.get("/api/items", headers=headers, params={"view": "summary"})
+    assert resp.status_code == 200, resp.text
+    [summary] = resp.json()
+    assert "text_content" not in summary
+    assert summary["extra"] == {"media_kind": "image", "author": "Someone"}
+    assert [tag["name"] for tag in summary["tags"]] == ["Docs"]
+
+    resp = client.get("/api/items", headers=headers, params={"fields": "title,thumbnail_path"})
+    assert resp.json() == [{"id": created["id"], "title": "Report", "thumbnail_path": None}]
+
+    resp = client.get("/api/items", headers=headers, params={"fields": "title,password"})
+    assert resp.status_code == 400
+
+    resp = client.get("/api/items", headers=headers)
+    assert resp.json()[0]["text_content"] == "x" * 5000
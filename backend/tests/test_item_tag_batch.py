@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from app import models
+from app.database import SessionLocal
+from tests import utils
+
+
+def _create_item(client, headers, title, item_type="note", tags=()):
+    response = client.post("/api/items", json={"title": title, "type": item_type}, headers=headers)
+    assert response.status_code == 201, response.text
+    item = response.json()
+    if tags:
+        client.put(f"/api/items/{item['id']}/tags", json={"tags": list(tags)}, headers=headers)
+    return item
+
+
+def _tag_names(client, headers, item_id) -> set[str]:
+    return {tag["name"] for tag in client.get(f"/api/items/{item_id}/tags", headers=headers).json()}
+
+
+def test_batch_add_remove_and_replace_by_ids(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    first = _create_item(client, headers, "First", tags=["keep"])
+    second = _create_item(client, headers, "Second")
+    ids = [first["id"], second["id"], str(uuid4())]
+
+    resp = client.post(
+        "/api/items/tags/batch",
+        headers=headers,
+        json={"action": "add", "ids": ids, "tags": ["Keep", "Reading"]},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"matched": 2, "added": 3, "removed": 0}
+    assert _tag_names(client, headers, first["id"]) == {"keep", "Reading"}
+    assert _tag_names(client, headers, second["id"]) == {"keep", "Reading"}
+
+    resp = client.post(
+        "/api/items/tags/batch",
+        headers=headers,
+        json={"action": "remove", "ids": ids, "tags": ["reading", "unknown"]},
+    )
+    assert resp.json() == {"matched": 2, "added": 0, "removed": 2}
+
+    resp = client.post(
+        "/api/items/tags/batch",
+        headers=headers,
+        json={"action": "replace", "ids": [first["id"]], "tags": ["Archive"]},
+    )
+    assert resp.json() == {"matched": 1, "added": 1, "removed": 1}
+    assert _tag_names(client, headers, first["id"]) == {"Archive"}
+    assert _tag_names(client, headers, second["id"]) == {"keep"}
+
+
+def test_batch_by_filter_only_touches_matching_items(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    pins = [_create_item(client, headers, f"Pin {index}", "pin") for index in range(3)]
+    note = _create_item(client, headers, "Note")
+    with SessionLocal() as db:
+        stranger = models.User(email="other@example.com", username="other", password_hash="hash")
+        db.add(stranger)
+        db.flush()
+        db.add(models.Item(user_id=stranger.id, title="Foreign pin", type=models.ItemType.pin))
+        db.commit()
+
+    resp = client.post(
+        "/api/items/tags/batch",
+        headers=headers,
+        json={"action": "add", "filter": {"type": "pin"}, "tags": ["Moodboard"]},
+    )
+    assert resp.json() == {"matched": 3, "added": 3, "removed": 0}
+    assert all(_tag_names(client, headers, pin["id"]) == {"Moodboard"} for pin in pins)
+    assert _tag_names(client, headers, note["id"]) == set()
+
+    listed = client.get("/api/items", headers=headers, params={"tag": "moodboard"}).json()
+    assert len(listed) == 3
+    with SessionLocal() as db:
+        assert db.query(models.ItemTag).count() == 3
+
+
+def test_batch_validates_target(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    resp = client.post("/api/items/tags/batch", headers=headers, json={"action": "add", "tags": ["x"]})
+    assert resp.status_code == 422
+    resp = client.post(
+        "/api/items/tags/batch",
+        headers=headers,
+        json={"action": "add", "tags": ["x"], "ids": [], "filter": {}},
+    )
+    assert resp.status_code == 422
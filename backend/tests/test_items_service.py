@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from uuid import uuid4
 
+from sqlalchemy import event
+
 from app import models, schemas
 from app.database import SessionLocal
 from app.services import items_service
@@ -138,4 +140,34 @@ def test_set_item_tags_is_idempotent_and_scoped(app_client_factory) -> None:
         other_updated = items_service.set_item_tags(db, other_user, other_item, ["Design"])
         assert {tag.user_id for tag in other_updated.tags} == {other_user.id}
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def test_set_item_tags_resolves_tags_in_constant_round_trips(app_client_factory) -> None:
+    app_client_factory()
+    db = SessionLocal()
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    try:
+        user = _create_user(db)
+        item = items_service.create_item(db, user, schemas.ItemCreate(title="Tweet", type=models.ItemType.tweet))
+        items_service.set_item_tags(db, user, item, ["Existing"])
+        names = ["existing", "One", "Two", "Three", "Four", "Five", "Six"]
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            tagged = items_service.set_item_tags(db, user, item, names)
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        assert {tag.name for tag in tagged.tags} == {"Existing", "One", "Two", "Three", "Four", "Five", "Six"}
+        tag_statements = [sql for sql in statements if "tags" in sql and "item_tags" not in sql]
+        assert len([sql for sql in tag_statements if sql.lstrip().upper().startswith("INSERT")]) == 1
+        assert "ON CONFLICT" in next(sql for sql in tag_statements if sql.lstrip().upper().startswith("INSERT"))
+        assert len(tag_statements) <= 3  # existing-tag SELECT, upsert, refresh
+    finally:
+        db.close()
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.services import ingestion_service, job_handlers, job_queue, metadata_service
+from tests import utils
+
+HTML = "<html><head><title>Queued Page</title></head></html>"
+
+
+@pytest.fixture
+def queue_db(app_client_factory, monkeypatch):
+    client, _ = app_client_factory(extra_env={"JOB_MAX_ATTEMPTS": "3", "JOB_MAX_RUNNING_PER_USER": "1"})
+    utils.auth_headers(client)
+    monkeypatch.setattr(job_queue.random, "uniform", lambda low, high: 0.0)
+    with SessionLocal() as db:
+        yield db
+
+
+def _users(db, count: int) -> list[models.User]:
+    users = [
+        models.User(email=f"jobs{index}@example.com", username=f"jobs{index}", password_hash="x")
+        for index in range(count)
+    ]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def _status(db, job: models.Job) -> models.Job:
+    db.refresh(job)
+    return job
+
+
+def _delay(job: models.Job, since) -> timedelta:
+    # SQLite hands datetimes back without their timezone.
+    return job.run_at.replace(tzinfo=None) - since.replace(tzinfo=None)
+
+
+def test_claim_prefers_priority_then_age(queue_db) -> None:
+    db = queue_db
+    low = job_queue.enqueue(db, "noop", {"n": 1})
+    high = job_queue.enqueue(db, "noop", {"n": 2}, priority=5)
+    later = job_queue.enqueue(db, "noop", {"n": 3}, run_at=models.utcnow() + timedelta(hours=1))
+    db.commit()
+
+    first = job_queue.claim(db, "w1")
+    assert first.id == high.id
+    claimed = job_queue.claim(db, "w1")
+    assert claimed.id == low.id
+    assert claimed.status == models.JobStatus.running
+    assert claimed.attempts == 1
+    assert claimed.locked_by == "w1"
+    assert job_queue.claim(db, "w1") is None
+    job_queue.complete(db, first, "w1")
+    job_queue.complete(db, claimed, "w1")
+    assert job_queue.claim(db, "w1", now=models.utcnow() + timedelta(hours=2)).id == later.id
+
+
+def test_failures_back_off_then_dead_letter(queue_db) -> None:
+    db = queue_db
+    job = job_queue.enqueue(db, "noop")
+    db.commit()
+    now = models.utcnow()
+
+    claimed = job_queue.claim(db, "w1", now=now)
+    assert job_queue.fail(db, claimed, "w1", "flaky", now=now)
+    assert _status(db, job).status == models.JobStatus.queued
+    # Equal jitter with the random half pinned to zero: base / 2, doubling per attempt.
+    assert _delay(job, now) == pytest.approx(timedelta(seconds=5), abs=timedelta(seconds=1))
+    assert job_queue.claim(db, "w1", now=now) is None
+
+    now = job.run_at
+    job_queue.fail(db, job_queue.claim(db, "w1", now=now), "w1", "flaky", now=now)
+    assert _delay(_status(db, job), now) == pytest.approx(timedelta(seconds=10), abs=timedelta(seconds=1))
+
+    now = job.run_at
+    job_queue.fail(db, job_queue.claim(db, "w1", now=now), "w1", "still flaky", now=now)
+    assert _status(db, job).status == models.JobStatus.dead
+    assert job.attempts == 3
+    assert job.last_error == "still flaky"
+    assert job.finished_at is not None
+
+    assert job_queue.retry_dead(db) == 1
+    assert _status(db, job).status == models.JobStatus.queued
+    assert job.attempts == 0
+
+
+def test_backoff_is_capped(queue_db, monkeypatch) -> None:
+    monkeypatch.setattr(job_queue.random, "uniform", lambda low, high: high)
+    assert job_queue.backoff_delay(1) == 10
+    assert job_queue.backoff_delay(3) == 40
+    assert job_queue.backoff_delay(30) == 3600
+
+
+def test_expired_claims_are_reclaimed_and_stale_workers_cannot_finish(queue_db) -> None:
+    db = queue_db
+    job = job_queue.enqueue(db, "noop")
+    db.commit()
+
+    first = job_queue.claim(db, "w1")
+    assert job_queue.claim(db, "w2") is None
+    later = first.locked_until + timedelta(seconds=1)
+    second = job_queue.claim(db, "w2", now=later)
+    assert second.id == job.id
+    assert second.attempts == 2
+
+    assert not job_queue.complete(db, second, "w1")
+    assert job_queue.complete(db, second, "w2")
+    assert _status(db, job).status == models.JobStatus.done
+
+
+def test_claim_caps_running_jobs_per_user(queue_db) -> None:
+    db = queue_db
+    busy, quiet = _users(db, 2)
+    busy_jobs = [job_queue.enqueue(db, "noop", user_id=busy.id) for _ in range(3)]
+    db.commit()
+    quiet_job = job_queue.enqueue(db, "noop", user_id=quiet.id)
+    db.commit()
+
+    assert job_queue.claim(db, "w1").id == busy_jobs[0].id
+    # busy is at JOB_MAX_RUNNING_PER_USER, so quiet's younger job goes next.
+    assert job_queue.claim(db, "w2").id == quiet_job.id
+    assert job_queue.claim(db, "w3") is None
+
+
+def test_capped_user_backlog_does_not_starve_others(queue_db) -> None:
+    db = queue_db
+    busy, quiet = _users(db, 2)
+    for _ in range(job_queue.CLAIM_BATCH + 8):
+        job_queue.enqueue(db, "noop", user_id=busy.id, priority=5)
+    db.commit()
+    quiet_job = job_queue.enqueue(db, "noop", user_id=quiet.id)
+    db.commit()
+
+    assert job_queue.claim(db, "w1").user_id == busy.id
+    # Every one of the top CLAIM_BATCH rows belongs to busy, who is now capped.
+    assert job_queue.claim(db, "w2").id == quiet_job.id
+
+
+def test_run_one_records_handler_outcomes(queue_db, monkeypatch) -> None:
+    db = queue_db
+    calls: list[str] = []
+
+    def _ok(work_db, job) -> None:
+        calls.append(job.payload["name"])
+
+    def _invalid(work_db, job) -> None:
+        raise ValueError("bad payload")
+
+    monkeypatch.setitem(job_queue._handlers, "test_ok", _ok)
+    monkeypatch.setitem(job_queue._handlers, "test_invalid", _invalid)
+
+    ok = job_queue.enqueue(db, "test_ok", {"name": "first"})
+    invalid = job_queue.enqueue(db, "test_invalid")
+    unknown = job_queue.enqueue(db, "test_unknown")
+    db.commit()
+
+    kinds = ["test_ok", "test_invalid", "test_unknown"]
+    while job_queue.run_one("w1", kinds=kinds):
+        pass
+
+    assert calls == ["first"]
+    assert _status(db, ok).status == models.JobStatus.done
+    assert _status(db, invalid).status == models.JobStatus.dead
+    assert invalid.attempts == 1
+    assert invalid.last_error == "bad payload"
+    assert _status(db, unknown).status == models.JobStatus.dead
+
+
+def test_queued_save_and_its_job_commit_together(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"INGEST_ASYNC": "true", "JOB_QUEUE_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+
+    def _broken_enqueue(*args, **kwargs):
+        raise RuntimeError("jobs table unavailable")
+
+    monkeypatch.setattr(ingestion_service.job_queue, "enqueue", _broken_enqueue)
+    with pytest.raises(RuntimeError):
+        client.post("/api/items/url", json={"url": "example.com/orphan", "tags": ["Design"]}, headers=headers)
+
+    with SessionLocal() as db:
+        assert db.query(models.Item).count() == 0
+        assert db.query(models.Tag).count() == 0
+        assert db.query(models.Job).count() == 0
+
+
+def test_async_ingest_runs_as_a_durable_job(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"INGEST_ASYNC": "true", "JOB_QUEUE_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+    responses = iter([RuntimeError("timeout"), metadata_service.HtmlFetchResult(html=HTML)])
+
+    def _fetch(url, **_):
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(ingestion_service.metadata_service, "fetch_html", _fetch)
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", lambda image_url, **_: (None, None))
+
+    response = client.post("/api/items/url", json={"url": "example.com/queued"}, headers=headers)
+    assert response.status_code == 202, response.text
+    item_id = response.json()["id"]
+
+    with SessionLocal() as db:
+        job = db.query(models.Job).one()
+        assert job.kind == job_handlers.ingestion_service.INGEST_JOB
+        assert job.payload == {"item_id": item_id}
+
+        assert job_queue.run_one("w1")
+        assert _status(db, job).status == models.JobStatus.queued
+        assert job.last_error == "timeout"
+        status = client.get(f"/api/items/{item_id}/ingest", headers=headers).json()
+        assert status["state"] == "queued"
+        assert status["error"] == "timeout"
+
+        assert job_queue.run_one("w1", kinds=[job.kind]) is False  # backing off
+        db.execute(models.Job.__table__.update().values(run_at=models.utcnow()))
+        db.commit()
+        assert job_queue.run_one("w1")
+        assert _status(db, job).status == models.JobStatus.done
+
+    done = client.get(f"/api/items/{item_id}/ingest", params={"wait": 1}, headers=headers).json()
+    assert done["state"] == "done"
+    assert done["status"] == "OK"
+    assert client.get(f"/api/items/{item_id}", headers=headers).json()["title"] == "Queued Page"
+
+
+def test_refresh_endpoint_queues_a_job_when_the_queue_is_enabled(app_client_factory, monkeypatch) -> None:
+    client, _ = app_client_factory(extra_env={"JOB_QUEUE_ENABLED": "true"})
+    headers = utils.auth_headers(client)
+    monkeypatch.setattr(
+        ingestion_service.metadata_service,
+        "fetch_html",
+        lambda url, **_: metadata_service.HtmlFetchResult(html=HTML),
+    )
+    monkeypatch.setattr(ingestion_service, "_download_primary_image", lambda image_url, **_: (None, None))
+    item = client.post(
+        "/api/items",
+        json={"title": "Stale", "type": "url", "source_url": "https://example.com/page"},
+        headers=headers,
+    ).json()
+
+    response = client.post(f"/api/items/{item['id']}/refresh", params={"update_text": "true"}, headers=headers)
+    assert response.status_code == 202, response.text
+    assert response.json()["title"] == "Stale"
+
+    with SessionLocal() as db:
+        job = db.query(models.Job).one()
+        assert job.kind == ingestion_service.REFRESH_JOB
+        assert job.payload == {"item_id": item["id"], "force_download": False, "update_text": True}
+        assert job_queue.run_one("w1")
+        assert _status(db, job).status == models.JobStatus.done
+    assert client.get(f"/api/items/{item['id']}", headers=headers).json()["title"] == "Queued Page"
+
+    inline = client.post(f"/api/items/{item['id']}/refresh", params={"async": "false"}, headers=headers)
+    assert inline.status_code == 200
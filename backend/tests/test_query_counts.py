@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+
+from app.database import get_engine
+from tests import utils
+
+# Statements per request, including the auth user lookup. None of these may grow
+# with the number of items carrying a tag.
+QUERY_BUDGETS = {
+    "list_items": 4,
+    "list_items_projection": 2,
+    "get_item": 3,
+    "item_tags": 3,
+    "set_item_tags": 9,
+    "list_tags": 2,
+    "rename_tag": 6,
+}
+
+
+@contextmanager
+def count_queries() -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+def _create_items(client, headers, count: int, start: int = 0) -> list[str]:
+    ids = []
+    for number in range(start, start + count):
+        response = client.post("/api/items", json={"title": f"Item {number}", "type": "note"}, headers=headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def _endpoint_query_counts(client, headers, item_id: str, tag_id: str) -> dict[str, int]:
+    requests = {
+        "list_items": lambda: client.get("/api/items", params={"limit": 10}, headers=headers),
+        "list_items_projection": lambda: client.get(
+            "/api/items", params={"limit": 10, "fields": "title"}, headers=headers
+        ),
+        "get_item": lambda: client.get(f"/api/items/{item_id}", headers=headers),
+        "item_tags": lambda: client.get(f"/api/items/{item_id}/tags", headers=headers),
+        "set_item_tags": lambda: client.put(
+            f"/api/items/{item_id}/tags", json={"tags": ["bulk", "extra"]}, headers=headers
+        ),
+        "list_tags": lambda: client.get("/api/tags", headers=headers),
+        "rename_tag": lambda: client.patch(f"/api/tags/{tag_id}", json={"name": "Bulk"}, headers=headers),
+    }
+    # Same starting state each round, so only the tag's size differs.
+    client.put(f"/api/items/{item_id}/tags", json={"tags": ["bulk"]}, headers=headers)
+    client.patch(f"/api/tags/{tag_id}", json={"name": "bulk"}, headers=headers)
+    counts = {}
+    for name, send in requests.items():
+        with count_queries() as statements:
+            response = send()
+        assert response.status_code == 200, (name, response.text)
+        counts[name] = len(statements)
+    return counts
+
+
+def test_tag_endpoints_do_not_load_every_item_of_a_tag(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    ids = _create_items(client, headers, 3)
+    client.post("/api/items/tags/batch", json={"action": "add", "tags": ["bulk"], "ids": ids}, headers=headers)
+    client.post("/api/tags", json={"name": "extra"}, headers=headers)
+    tag_id = client.get("/api/tags", headers=headers).json()[0]["id"]
+
+    small = _endpoint_query_counts(client, headers, ids[0], tag_id)
+    more = _create_items(client, headers, 30, start=3)
+    client.post("/api/items/tags/batch", json={"action": "add", "tags": ["bulk"], "ids": more}, headers=headers)
+    large = _endpoint_query_counts(client, headers, ids[0], tag_id)
+
+    assert small == QUERY_BUDGETS
+    assert large == small
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.compression import accepted_encodings
+from tests import utils
+
+
+def _create_item(client, headers, **payload):
+    body = {"title": "Sample", "type": "url", **payload}
+    response = client.post("/api/items", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_list_rows_match_detail_serialization(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    item = _create_item(
+        client,
+        headers,
+        title="Poster",
+        source_url="https://example.com/poster",
+        extra={"author": "Ada", "raw": {"nested": [1, 2]}},
+    )
+    client.put(f"/api/items/{item['id']}/tags", json={"tags": ["print"]}, headers=headers)
+
+    detail = client.get(f"/api/items/{item['id']}", headers=headers).json()
+    listed = client.get("/api/items", headers=headers).json()
+    assert listed == [detail]
+
+    summary = client.get("/api/items", headers=headers, params={"view": "summary"}).json()[0]
+    assert summary["extra"] == {"author": "Ada"}
+    assert summary["created_at"] == detail["created_at"]
+    assert summary["tags"] == detail["tags"]
+
+
+def test_list_schema_documents_every_projection(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    spec = client.get("/api/openapi.json").json()
+    schema = spec["paths"]["/api/items/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert [option["$ref"].rsplit("/", 1)[1] for option in schema["items"]["anyOf"]] == [
+        "ItemOut",
+        "ItemSummaryOut",
+        "ItemSparseOut",
+    ]
+    assert spec["components"]["schemas"]["ItemSparseOut"]["required"] == ["id"]
+
+
+def test_large_responses_are_compressed(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    for index in range(12):
+        _create_item(client, headers, title=f"Item {index}", description="lorem ipsum " * 20)
+
+    plain = client.get("/api/items", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    gzipped = client.get("/api/items", headers={**headers, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in gzipped.headers["vary"]
+    assert gzipped.json() == plain.json()
+    assert int(gzipped.headers["content-length"]) < len(plain.content)
+
+    small = client.get("/api/tags", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_streamed_and_binary_responses(app_client_factory) -> None:
+    client, storage_dir = app_client_factory()
+    headers = utils.auth_headers(client)
+    for index in range(12):
+        _create_item(client, headers, title=f"Item {index}", description="lorem ipsum " * 20)
+
+    plain = client.get("/api/items/export", headers={**headers, "Accept-Encoding": "identity"})
+    streamed = client.get("/api/items/export", headers={**headers, "Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert "content-length" not in streamed.headers
+    assert streamed.content == plain.content
+
+    (storage_dir / "uploads").mkdir()
+    (storage_dir / "uploads" / "photo.jpg").write_bytes(b"\xff\xd8" * 2048)
+    image = client.get("/assets/uploads/photo.jpg", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert image.content == b"\xff\xd8" * 2048
+
+
+def test_brotli_is_preferred_when_installed(app_client_factory) -> None:
+    pytest.importorskip("brotli")
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    for index in range(12):
+        _create_item(client, headers, title=f"Item {index}", description="lorem ipsum " * 20)
+
+    response = client.get(
+        "/api/items",
+        headers={**headers, "Accept-Encoding": "gzip, br"},
+    )
+    assert response.headers["content-encoding"] == "br"
+    # httpx decodes br only when brotli is importable, which it is here.
+    assert len(response.json()) == 12
+
+
+def test_accepted_encodings_honours_q_values() -> None:
+    assert accepted_encodings("gzip, br;q=0") == {"gzip"}
+    assert accepted_encodings("br;q=0.5, gzip;q=1.0") == {"br", "gzip"}
+    assert accepted_encodings("") == set()
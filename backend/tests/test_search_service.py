@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app import models, schemas
+from app.database import SessionLocal
+from app.services import items_service, search_service
+
+
+def _compile(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def _create_user(db) -> models.User:
+    user = models.User(
+        email=f"search-{uuid4().hex[:6]}@example.com",
+        username=f"search_{uuid4().hex[:6]}",
+        password_hash="hash",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _fts_ids(db) -> set:
+    return set(db.execute(models.items_fts.select().with_only_columns(models.items_fts.c.item_id)).scalars())
+
+
+def test_postgres_backend_uses_websearch_tsquery() -> None:
+    backend = search_service.PostgresSearchBackend()
+    with SessionLocal() as db:
+        query = backend.apply(db.query(models.Item), uuid4(), "poster -retro", rank=True)
+        sql = _compile(query.statement)
+    assert "items.search_vector @@ websearch_to_tsquery" in sql
+    assert "ORDER BY ts_rank_cd(items.search_vector" in sql
+
+
+def test_search_vector_weights_title_over_body() -> None:
+    sql = _compile(search_service.search_vector_expression())
+    assert "setweight" in sql
+    assert sql.index("items.title") < sql.index("items.description") < sql.index("items.text_content")
+
+
+def test_build_fts_query_quotes_prefix_terms() -> None:
+    assert search_service.build_fts_query('Mood "board" OR x*') == '"mood"* "board"* "or"* "x"*'
+    assert search_service.build_fts_query("!!!") == ""
+
+
+def test_sqlite_fts_index_tracks_writes(app_client_factory) -> None:
+    app_client_factory()
+    db = SessionLocal()
+    try:
+        assert search_service.get_backend(db).name == "sqlite_fts"
+        user = _create_user(db)
+        other = _create_user(db)
+        first = items_service.create_item(
+            db, user, schemas.ItemCreate(title="Poster archive", text_content="brutalist typography")
+        )
+        second = items_service.create_item(
+            db, user, schemas.ItemCreate(title="Typography notes", description="poster grids")
+        )
+        items_service.create_item(db, other, schemas.ItemCreate(title="Poster elsewhere"))
+        assert _fts_ids(db) >= {first.id, second.id}
+
+        ranked = items_service.list_items(db, user, search="poster", sort=schemas.ItemSort.relevance)
+        assert [item.id for item in ranked] == [first.id, second.id]
+
+        items_service.update_item(db, first, schemas.ItemUpdate(title="Renamed archive"))
+        assert [item.id for item in items_service.list_items(db, user, search="poster")] == [second.id]
+        assert [item.id for item in items_service.list_items(db, user, search="brutal typo")] == [first.id]
+
+        fts = models.items_fts
+        assert db.scalars(select(fts.c.rowid).where(fts.c.item_id == first.id)).all() == [
+            models.items_fts_rowid(first.id)
+        ]
+        plan = " ".join(
+            str(row[-1])
+            for row in db.execute(
+                text("EXPLAIN QUERY PLAN DELETE FROM items_fts WHERE rowid IN (1, 2)")
+            )
+        )
+        assert "VIRTUAL TABLE INDEX 0:=" in plan  # a rowid lookup, not a full scan
+
+        items_service.delete_item(db, second)
+        assert second.id not in _fts_ids(db)
+        assert items_service.list_items(db, user, search="grids") == []
+    finally:
+        db.close()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import numpy as np
+
+from app.services.vector_store import VectorStore
+from tests import utils
+
+
+def _create_item(client, headers, title, text=None):
+    payload = {"title": title, "type": "note"}
+    if text:
+        payload["text_content"] = text
+    response = client.post("/api/items", json=payload, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _unit(values) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_vector_store_grows_reuses_rows_and_reopens(tmp_path) -> None:
+    store = VectorStore(tmp_path, dim=4, provider="test")
+    ids = [uuid4() for _ in range(100)]
+    vectors = np.stack([_unit([1, index % 3, 0, 0.5]) for index in range(100)])
+    store.upsert(ids, vectors)
+    assert len(store) == 100
+    assert store.capacity >= 100
+
+    store.remove(ids[:10])
+    store.upsert([ids[50]], _unit([0, 0, 1, 0])[np.newaxis, :])
+    newcomer = uuid4()
+    store.upsert([newcomer], _unit([0, 1, 0, 0])[np.newaxis, :])
+    assert store.count == 100  # the freed row was reused
+
+    reopened = VectorStore(tmp_path, dim=4, provider="test")
+    assert len(reopened) == 91
+    assert ids[0] not in reopened
+    hits = reopened.search(_unit([0, 0, 1, 0]), 3, exclude=[newcomer])
+    assert hits[0][0] == ids[50]
+    assert hits[0][1] > 0.99
+
+    assert not VectorStore(tmp_path, dim=8, provider="test").exists
+
+
+def test_vector_store_writers_in_separate_processes_keep_each_others_rows(tmp_path) -> None:
+    # Two instances on one directory stand in for the API and worker processes.
+    api = VectorStore(tmp_path, dim=4, provider="test")
+    worker = VectorStore(tmp_path, dim=4, provider="test")
+    first, second, third = uuid4(), uuid4(), uuid4()
+    api.upsert([first], _unit([1, 0, 0, 0])[np.newaxis, :])
+    worker.upsert([second], _unit([0, 1, 0, 0])[np.newaxis, :])
+    api.upsert([third], _unit([0, 0, 1, 0])[np.newaxis, :])
+
+    assert worker.search(_unit([0, 0, 1, 0]), 1)[0][0] == third
+    assert api.search(_unit([0, 1, 0, 0]), 1)[0][0] == second
+    worker.remove([first])
+    assert first not in api
+
+    reopened = VectorStore(tmp_path, dim=4, provider="test")
+    assert len(reopened) == 2
+    assert {second, third} == {item_id for item_id, _ in reopened.search(_unit([0, 1, 1, 0]), 5)}
+
+
+def test_semantic_search_ranks_related_items(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    sourdough = _create_item(client, headers, "Sourdough starter", "Feed the starter flour and water before baking bread")
+    _create_item(client, headers, "Bread baking tips", "Bake bread hot with steam for a crisp crust")
+    _create_item(client, headers, "Kubernetes upgrade", "Drain nodes before upgrading the cluster")
+
+    resp = client.get("/api/search/semantic", headers=headers, params={"q": "baking sourdough bread"})
+    assert resp.status_code == 200, resp.text
+    hits = resp.json()
+    assert hits[0]["item"]["id"] == sourdough["id"]
+    assert "Kubernetes upgrade" not in [hit["item"]["title"] for hit in hits[:2]]
+    assert hits == sorted(hits, key=lambda hit: hit["score"], reverse=True)
+
+
+def test_similar_items_excludes_itself_and_tracks_writes(app_client_factory) -> None:
+    client, storage_dir = app_client_factory()
+    headers = utils.auth_headers(client)
+    first = _create_item(client, headers, "Espresso grind size", "Dial in espresso by adjusting the grinder")
+
+    resp = client.get(f"/api/items/{first['id']}/similar", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == []
+    index_dir = storage_dir.with_name(f"{storage_dir.name}.index")
+    assert (index_dir / "semantic").exists()
+    # Outside STORAGE_ROOT, which is served unauthenticated at /assets.
+    assert not (storage_dir / ".index").exists()
+
+    # Written to the already-built store after commit rather than rebuilt.
+    second = _create_item(client, headers, "Espresso recipes", "Espresso ratios and grinder settings")
+    resp = client.get(f"/api/items/{first['id']}/similar", headers=headers)
+    assert [hit["item"]["id"] for hit in resp.json()] == [second["id"]]
+
+    assert client.delete(f"/api/items/{second['id']}", headers=headers).status_code == 204
+    resp = client.get(f"/api/items/{first['id']}/similar", headers=headers)
+    assert resp.json() == []
+
+    missing = client.get(f"/api/items/{uuid4()}/similar", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_semantic_search_can_be_disabled(app_client_factory) -> None:
+    client, storage_dir = app_client_factory(extra_env={"SEMANTIC_SEARCH_ENABLED": "false"})
+    headers = utils.auth_headers(client)
+    item = _create_item(client, headers, "Anything")
+    assert client.get("/api/search/semantic", headers=headers, params={"q": "x"}).status_code == 404
+    assert client.get(f"/api/items/{item['id']}/similar", headers=headers).status_code == 404
+    assert not storage_dir.with_name(f"{storage_dir.name}.index").exists()
@@ -57,3 +57,16 @@ def test_safe_remove_path_removes_files_and_ignores_missing(app_client_factory)
 def test_safe_remove_path_blocks_traversal(app_client_factory) -> None:
     app_client_factory()
     storage.safe_remove_path("../../etc/passwd")
+
+
+def test_assets_mount_hides_dot_paths(app_client_factory) -> None:
+    client, storage_root = app_client_factory()
+    (storage_root / "uploads").mkdir()
+    (storage_root / "uploads" / "visible.txt").write_text("ok")
+    meta = storage_root / ".index" / "semantic" / str(uuid4()) / "meta.json"
+    meta.parent.mkdir(parents=True)
+    meta.write_text("{}")
+
+    assert client.get("/assets/uploads/visible.txt").status_code == 200
+    assert client.get(f"/assets/.index/semantic/{meta.parent.name}/meta.json").status_code == 404
+    assert client.get("/assets/uploads/.hidden").status_code == 404
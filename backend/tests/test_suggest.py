@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from app.services import suggest_service
+from app.services.suggest_service import PrefixIndex
+from tests import utils
+from tests.test_query_counts import count_queries
+
+
+def _create_item(client, headers, title: str, source_url: str | None = None, tags: list[str] | None = None) -> str:
+    response = client.post(
+        "/api/items",
+        json={"title": title, "type": "url", "source_url": source_url},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    item_id = response.json()["id"]
+    if tags:
+        client.put(f"/api/items/{item_id}/tags", json={"tags": tags}, headers=headers)
+    return item_id
+
+
+def test_prefix_index_ranks_by_count_and_dedupes_aliases() -> None:
+    index = PrefixIndex.build(
+        [
+            (("www.example.com", "example.com"), 3, "www.example.com"),
+            (("example.org",), 5, "example.org"),
+            (("exa.io",), 3, "exa.io"),
+            (("other.net",), 9, "other.net"),
+        ]
+    )
+    assert index.complete("EXA", 10) == ["example.org", "exa.io", "www.example.com"]
+    assert index.complete("www.", 10) == ["www.example.com"]
+    assert index.complete("example.", 1) == ["example.org"]
+    assert index.complete("zzz", 10) == []
+    assert PrefixIndex.build([]).complete("a", 5) == []
+
+
+def test_suggest_returns_tags_domains_and_titles(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    _create_item(client, headers, "Design systems at scale", "https://www.designsystems.com/a", ["Design", "Systems"])
+    _create_item(client, headers, "Poster design 100%", "https://dribbble.com/shots/1", ["design"])
+    _create_item(client, headers, "Typography notes", "https://desk.example/x", ["Desktop"])
+
+    response = client.get("/api/suggest", params={"prefix": "des"}, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [(tag["name"], tag["item_count"]) for tag in body["tags"]] == [("Design", 2), ("Desktop", 1)]
+    assert [domain["domain"] for domain in body["domains"]] == ["www.designsystems.com", "desk.example"]
+    assert [title["title"] for title in body["titles"]] == ["Design systems at scale", "Poster design 100%"]
+
+    only_tags = client.get("/api/suggest", params={"prefix": "sys", "types": "tags"}, headers=headers).json()
+    assert [tag["name"] for tag in only_tags["tags"]] == ["Systems"]
+    assert only_tags["domains"] == [] and only_tags["titles"] == []
+
+    # LIKE wildcards in the prefix are matched literally.
+    literal = client.get("/api/suggest", params={"prefix": "100%", "types": "titles"}, headers=headers).json()
+    assert [title["title"] for title in literal["titles"]] == ["Poster design 100%"]
+    assert client.get("/api/suggest", params={"prefix": "%%%", "types": "titles"}, headers=headers).json()["titles"] == []
+
+    # A short prefix skips titles; a new tag shows up right after the write.
+    _create_item(client, headers, "Moodboard", tags=["Dessert"])
+    short = client.get("/api/suggest", params={"prefix": "de", "limit": 2}, headers=headers).json()
+    assert [tag["name"] for tag in short["tags"]] == ["Design", "Desktop"]
+    assert short["titles"] == []
+    fresh = client.get("/api/suggest", params={"prefix": "dess", "types": "tags"}, headers=headers).json()
+    assert [tag["name"] for tag in fresh["tags"]] == ["Dessert"]
+
+    bad = client.get("/api/suggest", params={"prefix": "de", "types": "people"}, headers=headers)
+    assert bad.status_code == 400
+
+
+def test_item_writes_patch_the_indexes_without_rescanning_items(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    first = _create_item(client, headers, "One", "https://docs.example.com/1", ["Docs"])
+    _create_item(client, headers, "Two", "https://docs.example.com/2")
+    client.get("/api/suggest", params={"prefix": "do"}, headers=headers)
+
+    moved = _create_item(client, headers, "Three", "https://dogs.example/3", ["Dogs"])
+    client.put(f"/api/items/{first}/tags", json={"tags": ["Dogs", "Docs"]}, headers=headers)
+    assert client.delete(f"/api/items/{moved}", headers=headers).status_code == 204
+    _create_item(client, headers, "Four", "https://dogs.example/4")
+
+    with count_queries() as statements:
+        body = client.get("/api/suggest", params={"prefix": "do", "types": "tags,domains"}, headers=headers).json()
+    # The changed rows and the tags are re-read; the items are not scanned or grouped again.
+    assert [sql for sql in statements if "FROM items" in sql and " IN (" in sql]
+    assert not [sql for sql in statements if "GROUP BY" in sql or ("FROM items" in sql and " IN (" not in sql)]
+    assert [(tag["name"], tag["item_count"]) for tag in body["tags"]] == [("Docs", 1), ("Dogs", 1)]
+    assert [(domain["domain"], domain["item_count"]) for domain in body["domains"]] == [
+        ("docs.example.com", 2),
+        ("dogs.example", 1),
+    ]
+
+    suggest_service.reset_cache()
+    rebuilt = client.get("/api/suggest", params={"prefix": "do", "types": "tags,domains"}, headers=headers).json()
+    assert rebuilt == body
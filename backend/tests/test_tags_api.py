@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+from uuid import UUID
+
+import orjson
+
+from app.database import SessionLocal
+from app.services import tags_service
 from tests import utils
 
 
@@ -63,4 +69,109 @@ def test_delete_tag_and_get_item_tags_endpoint(app_client_factory) -> None:
 
     tag_list = client.get(f"/api/items/{item_id}/tags", headers=headers)
     assert tag_list.status_code == 200
-    assert tag_list.json() == []
\ No newline at end of file
+    assert tag_list.json() == []
+
+
+def test_rename_tag_and_reject_clashing_names(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    item_id = _create_item(client, headers, "Poster")
+    client.put(f"/api/items/{item_id}/tags", json={"tags": ["poster design", "Print"]}, headers=headers)
+    tags = {tag["name"]: tag["id"] for tag in client.get("/api/tags", headers=headers).json()}
+
+    renamed = client.patch(f"/api/tags/{tags['poster design']}", json={"name": "Poster Design"}, headers=headers)
+    assert renamed.status_code == 200, renamed.text
+    assert renamed.json() == {"id": tags["poster design"], "name": "Poster Design", "item_count": 1}
+    assert client.get("/api/items", headers=headers, params={"tag": "POSTER DESIGN"}).json()[0]["id"] == item_id
+
+    clash = client.patch(f"/api/tags/{tags['Print']}", json={"name": "poster design"}, headers=headers)
+    assert clash.status_code == 400
+    missing = client.patch("/api/tags/00000000-0000-0000-0000-000000000000", json={"name": "x"}, headers=headers)
+    assert missing.status_code == 404
+
+
+def test_merge_tags_moves_links_and_deletes_sources(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    both = _create_item(client, headers, "Both")
+    source_only = _create_item(client, headers, "Source only")
+    target_only = _create_item(client, headers, "Target only")
+    client.put(f"/api/items/{both}/tags", json={"tags": ["Posters", "poster-design", "Poster Design"]}, headers=headers)
+    client.put(f"/api/items/{source_only}/tags", json={"tags": ["Posters"]}, headers=headers)
+    client.put(f"/api/items/{target_only}/tags", json={"tags": ["Poster Design"]}, headers=headers)
+    tags = {tag["name"]: tag["id"] for tag in client.get("/api/tags", headers=headers).json()}
+
+    merged = client.post(
+        f"/api/tags/{tags['Poster Design']}/merge",
+        json={"source_ids": [tags["Posters"], tags["poster-design"]]},
+        headers=headers,
+    )
+    assert merged.status_code == 200, merged.text
+    assert merged.json()["item_count"] == 3
+    assert [tag["name"] for tag in client.get("/api/tags", headers=headers).json()] == ["Poster Design"]
+    for item_id in (both, source_only, target_only):
+        names = [tag["name"] for tag in client.get(f"/api/items/{item_id}/tags", headers=headers).json()]
+        assert names == ["Poster Design"]
+
+    again = client.post(
+        f"/api/tags/{tags['Poster Design']}/merge",
+        json={"source_ids": [tags["Posters"]]},
+        headers=headers,
+    )
+    assert again.status_code == 404
+    self_merge = client.post(
+        f"/api/tags/{tags['Poster Design']}/merge",
+        json={"source_ids": [tags["Poster Design"]]},
+        headers=headers,
+    )
+    assert self_merge.status_code == 400
+
+
+def _counts(client, headers) -> dict[str, int]:
+    return {tag["name"]: tag["item_count"] for tag in client.get("/api/tags", headers=headers).json()}
+
+
+def test_item_counts_follow_every_link_change(app_client_factory) -> None:
+    client, _ = app_client_factory()
+    headers = utils.auth_headers(client)
+    first = _create_item(client, headers, "Mood")
+    second = _create_item(client, headers, "Poster")
+
+    client.put(f"/api/items/{first}/tags", json={"tags": ["Design", "Print"]}, headers=headers)
+    client.put(f"/api/items/{second}/tags", json={"tags": ["design"]}, headers=headers)
+    assert _counts(client, headers) == {"Design": 2, "Print": 1}
+
+    client.put(f"/api/items/{first}/tags", json={"tags": ["Print", "Ink"]}, headers=headers)
+    assert _counts(client, headers) == {"Design": 1, "Ink": 1, "Print": 1}
+
+    client.post(
+        "/api/items/tags/batch",
+        json={"action": "add", "tags": ["Ink", "Paper"], "ids": [first, second]},
+        headers=headers,
+    )
+    client.post(
+        "/api/items/tags/batch",
+        json={"action": "replace", "tags": ["Ink"], "ids": [second]},
+        headers=headers,
+    )
+    assert _counts(client, headers) == {"Design": 0, "Ink": 2, "Paper": 1, "Print": 1}
+
+    client.post(
+        "/api/items/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content=orjson.dumps({"title": "Imported", "type": "note", "tags": ["paper", "Print", "PRINT"]}),
+    )
+    assert _counts(client, headers) == {"Design": 0, "Ink": 2, "Paper": 2, "Print": 2}
+
+    tags = {tag["name"]: tag["id"] for tag in client.get("/api/tags", headers=headers).json()}
+    merged = client.post(f"/api/tags/{tags['Ink']}/merge", json={"source_ids": [tags["Paper"]]}, headers=headers)
+    assert merged.json()["item_count"] == 3
+    client.delete(f"/api/items/{first}", headers=headers)
+    assert _counts(client, headers) == {"Design": 0, "Ink": 2, "Print": 1}
+
+    with SessionLocal() as session:
+        assert tags_service.recount_items(session) == 0
+        tags_service.adjust_item_counts(session, {UUID(tags["Print"]): 5})
+        assert tags_service.recount_items(session) == 1
+        session.commit()
+    assert _counts(client, headers)["Print"] == 1
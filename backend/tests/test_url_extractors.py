@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import logging
+import threading
+import time
 from pathlib import Path
 
 from app import models
-from app.services import url_extractors
+from app.services import ingestion_service, url_extractors
 
 FIXTURES = Path(__file__).parent / "fixtures"
 TWITTER_FIXTURES = FIXTURES / "twitter"
@@ -246,7 +249,7 @@ def test_twitter_vx_lookup_uses_quoted_media(monkeypatch):
         def json(self):
             return sample
 
-    monkeypatch.setattr(url_extractors.httpx, "get", lambda *args, **kwargs: FakeResp())
+    monkeypatch.setattr(url_extractors.http, "get", lambda *args, **kwargs: FakeResp())
 
     data = url_extractors._twitter_vx_lookup("1989712843256549601")
     assert data is not None
@@ -254,6 +257,111 @@ def test_twitter_vx_lookup_uses_quoted_media(monkeypatch):
     assert data["text"] == "Quote tweet with photos"
 
 
+EMBED_HTML = (
+    "<blockquote><p>embed text</p>"
+    "<a href='https://t.co/abc'>pic.twitter.com/abc</a>"
+    "<a href='https://twitter.com/u/status/1'>December 10, 2025</a></blockquote>"
+)
+
+
+def _slow(seconds, value):
+    def _call(*_args):
+        time.sleep(seconds)
+        return value
+
+    return _call
+
+
+def test_twitter_fallback_queries_sources_concurrently(monkeypatch):
+    vx = {
+        "text": "vx text",
+        "author": "vx_author",
+        "timestamp": None,
+        "image_url": "https://pbs.twimg.com/media/vx.jpg",
+    }
+    # Each fake returns only once the other has started: run one after the other, both break.
+    both_started = threading.Barrier(2, timeout=5)
+
+    def _meet(value):
+        def _call(*_args):
+            both_started.wait()
+            return value
+
+        return _call
+
+    monkeypatch.setattr(url_extractors, "_twitter_vx_lookup", _meet(vx))
+    monkeypatch.setattr(
+        url_extractors,
+        "_twitter_oembed_lookup",
+        _meet({"html": EMBED_HTML, "author_name": "embed_author"}),
+    )
+    monkeypatch.setattr(url_extractors, "_resolve_tco_image", _slow(0.0, "https://pbs.twimg.com/media/tco.jpg"))
+
+    fallback = url_extractors._twitter_oembed_fallback("https://x.com/u/status/1")
+
+    assert not both_started.broken
+    assert fallback == {
+        "text": "vx text",
+        "author": "embed_author",
+        "image_url": "https://pbs.twimg.com/media/vx.jpg",
+        "timestamp": "December 10, 2025",
+    }
+
+
+def test_twitter_fallback_logs_and_drops_late_lookups(monkeypatch, caplog):
+    release = threading.Event()
+
+    def _stuck(*_args):
+        release.wait(5)
+        return {"text": "too late", "image_url": "https://pbs.twimg.com/media/late.jpg"}
+
+    monkeypatch.setattr(url_extractors, "FALLBACK_WAIT_SECS", 0.2)
+    monkeypatch.setattr(url_extractors, "_twitter_vx_lookup", _stuck)
+    monkeypatch.setattr(url_extractors, "_twitter_oembed_lookup", _slow(0.0, {"html": EMBED_HTML}))
+    monkeypatch.setattr(url_extractors, "_resolve_tco_image", _slow(0.0, "https://pbs.twimg.com/media/tco.jpg"))
+
+    try:
+        with caplog.at_level(logging.WARNING, logger=url_extractors.__name__):
+            fallback = url_extractors._twitter_oembed_fallback("https://x.com/u/status/1")
+    finally:
+        release.set()
+
+    assert fallback["text"] == "embed text"
+    assert fallback["image_url"] == "https://pbs.twimg.com/media/tco.jpg"
+    assert "twitter_fallback_result_dropped source=vxtwitter reason=timeout" in caplog.text
+
+
+def test_twitter_fallback_uses_tco_media_when_vx_has_none(monkeypatch):
+    monkeypatch.setattr(url_extractors, "_twitter_vx_lookup", _slow(0.0, None))
+    monkeypatch.setattr(url_extractors, "_twitter_oembed_lookup", _slow(0.0, {"html": EMBED_HTML}))
+    monkeypatch.setattr(url_extractors, "_resolve_tco_image", _slow(0.0, "https://pbs.twimg.com/media/tco.jpg"))
+
+    fallback = url_extractors._twitter_oembed_fallback("https://x.com/u/status/1")
+
+    assert fallback["text"] == "embed text"
+    assert fallback["image_url"] == "https://pbs.twimg.com/media/tco.jpg"
+
+    monkeypatch.setattr(url_extractors, "_twitter_oembed_lookup", _slow(0.0, None))
+    assert url_extractors._twitter_oembed_fallback("https://x.com/u/status/1") is None
+
+
+def test_twitter_fallback_runs_once_per_ingest(monkeypatch):
+    calls = []
+
+    def _fake_oembed(url):
+        calls.append(url)
+        return {"text": "only text", "author": None, "image_url": None, "timestamp": None}
+
+    monkeypatch.setattr(url_extractors, "_twitter_oembed_fallback", _fake_oembed)
+    url = "https://x.com/user/status/123"
+    metadata = url_extractors.extract_for_domain("x.com", url, "<html><head></head></html>")
+    # Still no image, which is what makes refresh_url_item try the fallback.
+    ingestion_service._maybe_apply_twitter_fallback("x.com", url, metadata)
+
+    assert calls == [url]
+    assert metadata.title == "only text"
+
+
 def test_pinterest_extractor_handles_basic_meta():
     html = """
     <meta property='og:title' content='Pin Title'>
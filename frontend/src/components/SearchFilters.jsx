@@ -11,8 +11,33 @@ const ITEM_TYPES = [
   { value: 'other', label: 'Other' },
 ]
 
-export default function SearchFilters({ filters, onFiltersChange, onReset, availableTags }) {
+function countsByValue(entries) {
+  const counts = new Map()
+  for (const entry of entries || []) {
+    counts.set(entry.value, entry.count)
+  }
+  return counts
+}
+
+function withCount(label, count) {
+  return count === undefined ? label : `${label} (${count})`
+}
+
+export default function SearchFilters({ filters, onFiltersChange, onReset, availableTags, facets }) {
   const [dateHint, setDateHint] = useState('')
+  const typeCounts = countsByValue(facets?.type)
+  const tagCounts = countsByValue(facets?.tags)
+
+  const typeLabel = (option) => {
+    // Counts follow the active filters, so they only help while no type is picked.
+    if (!facets || filters.type) {
+      return option.label
+    }
+    if (!option.value) {
+      return withCount(option.label, [...typeCounts.values()].reduce((sum, count) => sum + count, 0))
+    }
+    return withCount(option.label, typeCounts.get(option.value) ?? 0)
+  }
 
   const normalizeDateRange = (nextFilters) => {
     const { createdFrom, createdTo } = nextFilters
@@ -67,7 +92,7 @@ export default function SearchFilters({ filters, onFiltersChange, onReset, avail
           <select name="type" value={filters.type} onChange={handleInputChange}>
             {ITEM_TYPES.map((option) => (
               <option key={option.value} value={option.value}>
-                {option.label}
+                {typeLabel(option)}
               </option>
             ))}
           </select>
@@ -77,7 +102,7 @@ export default function SearchFilters({ filters, onFiltersChange, onReset, avail
           <select multiple value={filters.tags} onChange={handleTagChange}>
             {availableTags.map((tag) => (
               <option key={tag.id} value={tag.name}>
-                {tag.name}
+                {withCount(tag.name, tagCounts.get(tag.name.toLowerCase()))}
               </option>
             ))}
           </select>
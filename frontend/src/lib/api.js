@@ -47,7 +47,7 @@ function buildQuery(params) {
 
 export async function request(
   path,
-  { method = 'GET', body, headers = {}, params, skipAuth = false, signal } = {}
+  { method = 'GET', body, headers = {}, params, skipAuth = false, signal, withHeaders = false } = {}
 ) {
   const url = `${API_BASE_URL}${path}${buildQuery(params)}`
   const requestInit = {
@@ -111,6 +111,9 @@ export async function request(
     throw new ApiError(message, response.status, payload)
   }
 
+  if (withHeaders) {
+    return { data: payload, headers: response.headers }
+  }
   return payload
 }
 
@@ -129,13 +132,50 @@ export const api = {
       ...options,
     })
   },
+  async getItemsPage(params, options) {
+    const { data, headers } = await request('/items/', {
+      method: 'GET',
+      params,
+      withHeaders: true,
+      ...options,
+    })
+    const total = headers.get('x-total-count')
+    return {
+      items: data || [],
+      nextCursor: headers.get('x-next-cursor'),
+      total: total === null ? null : Number(total),
+      totalIsEstimate: headers.get('x-total-count-kind') === 'estimate',
+    }
+  },
+  getItemFacets(params, options) {
+    return request('/items/facets', {
+      method: 'GET',
+      params,
+      ...options,
+    })
+  },
+  getItemsBatch(ids, options) {
+    return request('/items/batch', {
+      method: 'POST',
+      body: { ids },
+      ...options,
+    })
+  },
   getItem(id) {
     return request(`/items/${id}`)
   },
-  createItemFromUrl(payload) {
+  createItemFromUrl(payload, { async: queued } = {}) {
     return request('/items/url', {
       method: 'POST',
       body: payload,
+      params: queued === undefined ? undefined : { async: queued },
+    })
+  },
+  getIngestStatus(id, { wait, signal } = {}) {
+    return request(`/items/${id}/ingest`, {
+      method: 'GET',
+      params: { wait },
+      signal,
     })
   },
   uploadItem(payload) {
@@ -156,6 +196,12 @@ export const api = {
       body: { tags },
     })
   },
+  batchUpdateItemTags({ action, tags, ids, filter }) {
+    return request('/items/tags/batch', {
+      method: 'POST',
+      body: ids ? { action, tags, ids } : { action, tags, filter },
+    })
+  },
   deleteItem(id) {
     return request(`/items/${id}`, {
       method: 'DELETE',
@@ -167,4 +213,23 @@ export const api = {
       ...options,
     })
   },
+  suggest(prefix, { types, limit, signal } = {}) {
+    return request('/suggest', {
+      method: 'GET',
+      params: { prefix, types, limit },
+      signal,
+    })
+  },
+  renameTag(id, name) {
+    return request(`/tags/${id}`, {
+      method: 'PATCH',
+      body: { name },
+    })
+  },
+  mergeTags(targetId, sourceIds) {
+    return request(`/tags/${targetId}/merge`, {
+      method: 'POST',
+      body: { source_ids: sourceIds },
+    })
+  },
 }
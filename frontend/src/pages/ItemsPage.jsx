@@ -28,8 +28,11 @@ export default function ItemsPage() {
   const [loadMoreLoading, setLoadMoreLoading] = useState(false)
   const [error, setError] = useState(null)
   const [hasMore, setHasMore] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [total, setTotal] = useState(null)
   const [refreshToken, setRefreshToken] = useState(0)
   const [tags, setTags] = useState([])
+  const [facets, setFacets] = useState(null)
   const [settingsOpen, setSettingsOpen] = useState(false)
   const [toolsOpen, setToolsOpen] = useState(false)
   const { settings } = useSettings()
@@ -62,10 +65,12 @@ export default function ItemsPage() {
     setError(null)
 
     api
-      .getItems(buildQueryParams(filters, 0), { signal: controller.signal })
-      .then((data) => {
-        setItems(data)
-        setHasMore(data.length === PAGE_SIZE)
+      .getItemsPage(buildQueryParams(filters), { signal: controller.signal })
+      .then(({ items: page, nextCursor: cursor, total: count, totalIsEstimate }) => {
+        setItems(page)
+        setTotal(count === null ? null : { count, estimate: totalIsEstimate })
+        setNextCursor(cursor)
+        setHasMore(Boolean(cursor))
       })
       .catch((exc) => {
         if (exc.name === 'AbortError') {
@@ -83,6 +88,15 @@ export default function ItemsPage() {
     return () => controller.abort()
   }, [filtersKey, refreshToken])
 
+  useEffect(() => {
+    const controller = new AbortController()
+    api
+      .getItemFacets({ ...buildFilterParams(filters), top: 100 }, { signal: controller.signal })
+      .then(setFacets)
+      .catch(() => {})
+    return () => controller.abort()
+  }, [filtersKey, refreshToken])
+
   const handleFiltersChange = (nextFilters) => {
     setFilters({ ...nextFilters })
   }
@@ -97,15 +111,16 @@ export default function ItemsPage() {
   }
 
   const handleLoadMore = async () => {
-    if (loadMoreLoading) {
+    if (loadMoreLoading || !nextCursor) {
       return
     }
     setLoadMoreLoading(true)
     setError(null)
     try {
-      const data = await api.getItems(buildQueryParams(filters, items.length))
-      setItems((prev) => [...prev, ...data])
-      setHasMore(data.length === PAGE_SIZE)
+      const { items: page, nextCursor: cursor } = await api.getItemsPage(buildQueryParams(filters, nextCursor))
+      setItems((prev) => [...prev, ...page])
+      setNextCursor(cursor)
+      setHasMore(Boolean(cursor))
     } catch (exc) {
       if (exc?.status === 401) {
         return
@@ -173,6 +188,7 @@ export default function ItemsPage() {
                 onFiltersChange={handleFiltersChange}
                 onReset={handleResetFilters}
                 availableTags={tags}
+                facets={facets}
               />
               <SaveLinkForm onItemCreated={handleItemCreated} />
               <XImportForm onItemCreated={handleItemCreated} />
@@ -193,6 +209,12 @@ export default function ItemsPage() {
                 Imagery first. Adjust density, thumb scale, overlays, and motion to match your screen and pace.
               </p>
               <div className="board-meta">
+                {total && (
+                  <span className="pill subtle-pill">
+                    {total.estimate ? '~' : ''}
+                    {total.count.toLocaleString()} {total.count === 1 ? 'result' : 'results'}
+                  </span>
+                )}
                 <span className="pill subtle-pill">{settings.gridDensity} density</span>
                 <span className="pill subtle-pill">{settings.thumbSize} thumbs</span>
                 <span className="pill subtle-pill">
@@ -247,12 +269,23 @@ export default function ItemsPage() {
   )
 }
 
-function buildQueryParams(filters, offset) {
+function buildQueryParams(filters, cursor) {
   const params = {
+    ...buildFilterParams(filters),
     limit: PAGE_SIZE,
-    offset,
+    view: 'summary',
+  }
+
+  if (cursor) {
+    params.cursor = cursor
   }
 
+  return params
+}
+
+function buildFilterParams(filters) {
+  const params = {}
+
   if (filters.q) {
     params.q = filters.q
   }